@@ -0,0 +1,226 @@
+"""Analyse d'un grand nombre de positions en parallèle, résultats en JSONL au fil de l'eau.
+
+    python analyse.py positions.txt --output analysis.jsonl --time 0.5 --workers 8
+    zcat games.txt.gz | python analyse.py - --output analysis.jsonl --resume
+
+Une position par ligne, comme les ouvertures de tournament.py : chaîne d'init du Board, suivie de
+`w` ou `b` pour le trait (blancs par défaut), les lignes vides ou commençant par `#` sont ignorées.
+Chaque processus garde son MiniMax (et sa table de transposition) d'une position à l'autre.
+L'entrée est lue au fur et à mesure et seules `--max-pending` positions sont en cours à la fois :
+la mémoire ne dépend pas de la taille de l'entrée.
+
+Les résultats arrivent dans l'ordre où ils se terminent, chacun avec le rang de sa position. Un
+point de reprise (`<output>.checkpoint`) est écrit régulièrement ; avec `--resume`, les positions
+déjà analysées sont sautées et le fichier de sortie est complété. N'importe pas pygame.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from bitboard import SIDES, START_POSITION, Position
+from board import Board
+from config import GRID_SIZE
+from perft import move_notation
+from player import AI, Player
+from team import Team, other_team
+from tournament import make_strategy, parse_engine
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+CHECKPOINT_EVERY = 100
+
+
+class Progress:
+    """Positions terminées : toutes celles de rang inférieur à `next`, plus celles de `done`.
+
+    Les résultats arrivent presque dans l'ordre, `done` ne garde donc que quelques rangs au-delà
+    de `next`, au plus le nombre de positions en cours.
+    """
+
+    def __init__(self, next_index: int = 0, done: Iterable[int] = ()):
+        self.next = next_index
+        self.done = set(done)
+        self._advance()
+
+    def _advance(self) -> None:
+        while self.next in self.done:
+            self.done.remove(self.next)
+            self.next += 1
+
+    def add(self, index: int) -> None:
+        self.done.add(index)
+        self._advance()
+
+    def __contains__(self, index: int) -> bool:
+        return index < self.next or index in self.done
+
+
+def read_positions(lines: Iterable[str]) -> Iterator[tuple[int, str, str]]:
+    """(rang, chaîne d'init, camp au trait `w` ou `b`) de chaque position, lues à la demande."""
+    index = 0
+    for line in lines:
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        side = "b" if len(fields) > 1 and fields[1].lower() == "b" else "w"
+        yield index, fields[0], side
+        index += 1
+
+
+# état de chaque processus, créé par l'initialiseur du pool
+_strategy = None
+_board = None
+
+
+def _init_worker(engine: dict) -> None:
+    global _strategy, _board
+    _strategy = make_strategy(engine)
+    _board = Board(GRID_SIZE, START_POSITION)
+    # les processus du pool ne passent pas par atexit : les processus de playouts d'un MCTS sont
+    # arrêtés par un finaliseur de multiprocessing, avant ceux des files (priorité 10) qui les commandent
+    Finalize(_strategy, _strategy.close, exitpriority=20)
+
+
+def _analyse(task: tuple[int, str, str]) -> dict:
+    index, init_board, side = task
+    result = {"index": index, "init": init_board, "side": side}
+    team = Team.WHITE if side == "w" else Team.BLACK
+    try:
+        _board.load(Position.from_string(init_board, GRID_SIZE).encode(SIDES[team]))
+    except ValueError as error:
+        result["error"] = str(error)
+        return result
+
+    player = AI(0, "analyse", team, _strategy)
+    state = {"board": _board, "self_player": player, "enemy_player": Player(1, "", other_team(team)),
+             "current_player": player}
+    legal = [move for _, moves in _board.find_cases_who_can_play(player) for move in moves]
+    if not legal:
+        result["move"] = None
+        return result
+
+    start = perf_counter()
+    # MiniMax affiche son évaluation à chaque coup
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = _strategy.choose_move(state)
+    move = next(move for move in legal if (move["move_path"][0], move["move_path"][-1]) == best)
+    stats = _strategy.get_stats()
+    result.update(move=move_notation(_board, move), score=stats.score, depth=stats.depth, nodes=stats.nodes,
+                  time=round(perf_counter() - start, 4), pv=_strategy.format_pv(_board, team))
+    return result
+
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path + ".checkpoint"
+
+
+def save_checkpoint(path: str, progress: Progress, offset: int) -> None:
+    """`offset` : taille du fichier de sortie couverte par le point de reprise."""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump({"next": progress.next, "done": sorted(progress.done), "offset": offset}, file)
+    os.replace(temporary, path)
+
+
+def resume_progress(output_path: str) -> Progress:
+    """Progrès d'une analyse interrompue : le point de reprise, plus les résultats écrits après lui.
+
+    Une dernière ligne incomplète (arrêt en pleine écriture) est retirée du fichier de sortie.
+    """
+    progress, offset = Progress(), 0
+    if os.path.exists(checkpoint_path(output_path)):
+        with open(checkpoint_path(output_path)) as file:
+            data = json.load(file)
+        progress, offset = Progress(data["next"], data["done"]), data["offset"]
+    if not os.path.exists(output_path):
+        return progress
+
+    with open(output_path, "rb+") as file:
+        file.seek(offset)
+        end = offset
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            progress.add(json.loads(line)["index"])
+            end += len(line)
+        file.truncate(end)
+    return progress
+
+
+def analyse(lines: Iterable[str], output_path: str, engine: dict, workers: int = 1, max_pending: int | None = None,
+            resume: bool = False, checkpoint_every: int = CHECKPOINT_EVERY) -> int:
+    """Analyse les positions de `lines` et renvoie le nombre de résultats écrits par cet appel."""
+    progress = resume_progress(output_path) if resume else Progress()
+    max_pending = max_pending or 2 * workers
+    written = 0
+
+    with open(output_path, "a" if resume else "w") as output, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(engine,)) as pool:
+
+        def collect(futures) -> None:
+            nonlocal written
+            for future in futures:
+                result = future.result()
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                progress.add(result["index"])
+                written += 1
+                if written % checkpoint_every == 0:
+                    save_checkpoint(checkpoint_path(output_path), progress, output.tell())
+                    print(f"{written} positions analysed, all before #{progress.next} done", file=sys.stderr,
+                          flush=True)
+
+        pending = set()
+        for task in read_positions(lines):
+            if task[0] in progress:
+                continue
+            pending.add(pool.submit(_analyse, task))
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+        save_checkpoint(checkpoint_path(output_path), progress, output.tell())
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse many positions in parallel.")
+    parser.add_argument("input", help="positions file, or - for stdin")
+    parser.add_argument("--output", default="analysis.jsonl")
+    parser.add_argument("--engine", default="", type=parse_engine, help="MiniMax settings, as in tournament.py")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds per position")
+    parser.add_argument("--depth", type=int, default=100, help="maximum depth per position (MiniMax)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-pending", type=int, default=None, help="positions in flight (default: 2 per worker)")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY)
+    parser.add_argument("--resume", action="store_true", help="skip positions already in the output")
+    args = parser.parse_args()
+
+    engine = {"time_limit": args.time, **args.engine}
+    if engine.get("strategy", "minimax") == "minimax":
+        engine.setdefault("max_depth", args.depth)
+    start = perf_counter()
+    if args.input == "-":
+        written = analyse(sys.stdin, args.output, engine, args.workers, args.max_pending, args.resume,
+                          args.checkpoint_every)
+    else:
+        with open(args.input) as file:
+            written = analyse(file, args.output, engine, args.workers, args.max_pending, args.resume,
+                              args.checkpoint_every)
+    print(f"{written} positions written to {args.output} in {perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
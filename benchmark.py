@@ -0,0 +1,168 @@
+"""Banc d'essai de la recherche : noeuds, noeuds/s, temps par profondeur, mémoire et facteur de branchement.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --output new.json
+
+Chaque position est cherchée par MiniMax jusqu'à la profondeur donnée, sans limite de temps. Avec
+`--baseline`, les résultats sont comparés à un fichier JSON déjà enregistré : un nombre de noeuds
+différent signifie que la recherche a changé, un débit en baisse au-delà du seuil une régression.
+La mémoire mesurée est le pic pendant la recherche, hors table de transposition (allouée avant,
+taille fixe donnée par `--tt-size-mb`).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import sys
+import tracemalloc
+
+from bitboard import START_POSITION
+from board import Board
+from config import GRID_SIZE
+from player import AI, Player
+from strategy import MiniMax
+from team import Team, other_team
+
+# (nom, chaîne d'init du Board, camp au trait, profondeur)
+POSITIONS = [
+    ("start", START_POSITION, Team.WHITE, 7),
+    ("opening", "17b.2b.b7.9w.11w", Team.BLACK, 7),
+    ("early-middlegame", "11b.4b.b.3b4.w.w.2w.4w.3w.8w", Team.WHITE, 6),
+    ("middlegame", ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w.", Team.WHITE, 6),
+    ("king-vs-men", "3.b4.b3.2b.b5.w5.w2.w5.2w3.w2.w3.B.", Team.BLACK, 6),
+    ("kings-endgame", "5.W9.w10.b5.B9.b7.", Team.WHITE, 7),
+]
+
+# baisse de débit tolérée avant de parler de régression
+DEFAULT_THRESHOLD = 0.05
+
+
+def prepare(init_board: str, team: Team, depth: int, tt_size_mb: float) -> tuple[MiniMax, dict]:
+    board = Board(GRID_SIZE, init_board)
+    enemy = other_team(team)
+    strategy = MiniMax(max_depth=depth, tt_size_mb=tt_size_mb, timing=True)
+    ai = AI(0, "bench", team, strategy)
+    state = {"board": board, "self_player": ai, "enemy_player": Player(1, "enemy", enemy), "current_player": ai}
+    return strategy, state
+
+
+def search(init_board: str, team: Team, depth: int, tt_size_mb: float) -> MiniMax:
+    strategy, state = prepare(init_board, team, depth, tt_size_mb)
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy.choose_move(state)
+    return strategy
+
+
+def run_position(init_board: str, team: Team, depth: int, tt_size_mb: float, memory: bool = True) -> dict:
+    strategy = search(init_board, team, depth, tt_size_mb)
+    iterations = strategy.iterations
+    # temps de la recherche seule, sans l'allocation de la table de transposition
+    elapsed = iterations[-1]["time"] if iterations else 0.0
+    # facteur de branchement effectif : noeuds d'une itération / noeuds de la précédente
+    per_iteration = [iterations[0]["nodes"]] + [b["nodes"] - a["nodes"] for a, b in zip(iterations, iterations[1:])]
+    ratios = [b / a for a, b in zip(per_iteration, per_iteration[1:]) if a]
+    result = {
+        "depth": strategy.completed_depth,
+        "nodes": strategy.nodes,
+        "time": elapsed,
+        "nps": strategy.nodes / elapsed if elapsed else 0.0,
+        "time_to_depth": {str(it["depth"]): it["time"] for it in iterations},
+        "branching_factor": math.prod(ratios) ** (1 / len(ratios)) if ratios else 0.0,
+        "best_move": iterations[-1]["move"] if iterations else None,
+        "score": iterations[-1]["score"] if iterations else None,
+        # compteurs et temps par phase de la recherche (SearchStats)
+        "stats": {name: value for name, value in strategy.get_stats().to_dict().items()
+                  if name not in ("move", "profile", "memory")},
+    }
+    if memory:
+        # mesure à part : tracemalloc ralentit trop la recherche pour garder le chronométrage ; la
+        # table de transposition, de taille fixe, est allouée avant et n'est pas comptée
+        strategy, state = prepare(init_board, team, depth, tt_size_mb)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy.choose_move(state)
+        result["search_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run(positions=POSITIONS, tt_size_mb: float = 16, memory: bool = True, depth: int | None = None) -> dict:
+    # premier passage à vide : caches de géométrie et code encore froid fausseraient la première position
+    search(positions[0][1], positions[0][2], 2, tt_size_mb)
+    results = {}
+    for name, init_board, team, position_depth in positions:
+        results[name] = run_position(init_board, team, depth or position_depth, tt_size_mb, memory)
+        print(format_result(name, results[name]), flush=True)
+    nodes = sum(r["nodes"] for r in results.values())
+    elapsed = sum(r["time"] for r in results.values())
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "tt_size_mb": tt_size_mb,
+        "positions": results,
+        "total": {"nodes": nodes, "time": elapsed, "nps": nodes / elapsed if elapsed else 0.0},
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    line = (f"{name:18} depth {result['depth']:2}  nodes {result['nodes']:9}  {result['nps']:9.0f} n/s  "
+            f"{result['time']:7.2f}s  bf {result['branching_factor']:5.2f}")
+    if "search_memory" in result:
+        line += f"  peak {result['search_memory'] / 1024 / 1024:7.2f} MB (TT excluded)"
+    return line
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Affiche l'écart avec la référence et renvoie la liste des régressions."""
+    regressions = []
+    for name, result in current["positions"].items():
+        reference = baseline["positions"].get(name)
+        if reference is None:
+            print(f"{name:18} (absent de la référence)")
+            continue
+        change = result["nps"] / reference["nps"] - 1 if reference["nps"] else 0.0
+        line = f"{name:18} n/s {reference['nps']:9.0f} -> {result['nps']:9.0f} ({change:+.1%})"
+        if result["nodes"] != reference["nodes"] or result["depth"] != reference["depth"]:
+            line += f"  nodes {reference['nodes']} -> {result['nodes']} (search changed)"
+        if "search_memory" in result and "search_memory" in reference:
+            line += (f"  peak {reference['search_memory'] / 1048576:.2f} -> {result['search_memory'] / 1048576:.2f} MB"
+                     " (TT excluded)")
+        if change < -threshold:
+            regressions.append(name)
+            line += "  REGRESSION"
+        print(line)
+    total = current["total"]["nps"] / baseline["total"]["nps"] - 1 if baseline["total"]["nps"] else 0.0
+    print(f"{'total':18} n/s {baseline['total']['nps']:9.0f} -> {current['total']['nps']:9.0f} ({total:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search benchmark on a fixed set of positions.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--depth", type=int, help="search every position to this depth")
+    parser.add_argument("--tt-size-mb", type=float, default=16)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    print(f"transposition table: {args.tt_size_mb:g} MB, not counted in the peak memory")
+    results = run(tt_size_mb=args.tt_size_mb, memory=not args.no_memory, depth=args.depth)
+    print(f"{'total':18} nodes {results['total']['nodes']:9}  {results['total']['nps']:9.0f} n/s  "
+          f"{results['total']['time']:7.2f}s")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import groupby
+from random import Random
+
+from capture_solver import CaptureSolver
+from config import GRID_SIZE
+from team import Team
+
+# Indices des camps dans les bitboards
+WHITE, BLACK = 0, 1
+SIDES = {Team.WHITE: WHITE, Team.BLACK: BLACK}
+TEAMS = (Team.WHITE, Team.BLACK)
+
+# Codes des pièces : side * 2 + is_king
+WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING = 0, 1, 2, 3
+# Caractères de la chaîne d'init pour chaque code, '.' pour une case vide
+PIECE_CHARS = "wWbB"
+INIT_CODES = {"w": WHITE_MAN, "W": WHITE_KING, "b": BLACK_MAN, "B": BLACK_KING, ".": None}
+# chaîne d'init de la position de départ (10x10), blancs au trait
+START_POSITION = "20b10.20w"
+
+# (dx, dy) ; les blancs montent (dy = -1), les noirs descendent (dy = +1)
+DIRECTIONS = ((-1, -1), (1, -1), (-1, 1), (1, 1))
+FORWARD = ((0, 1), (2, 3))
+
+
+def opposite(direction: int) -> int:
+    return 3 - direction
+
+
+def notation(move: tuple[tuple[int, ...], tuple[int, ...]]) -> str:
+    """Official notation of `move`: squares numbered from 1, `x` between them for a capture."""
+    path, captured = move
+    return ("x" if captured else "-").join(str(square + 1) for square in path)
+
+
+def iter_bits(bitboard: int):
+    while bitboard:
+        low = bitboard & -bitboard
+        yield low.bit_length() - 1
+        bitboard ^= low
+
+
+def nearest(bitboard: int, direction: int) -> int:
+    """Square of the first set bit met when walking `direction` (rays going down grow with the square index)."""
+    if direction >= 2:
+        return (bitboard & -bitboard).bit_length() - 1
+    return bitboard.bit_length() - 1
+
+
+class Geometry:
+    """Precomputed tables for the playable squares of a size x size board.
+
+    Squares are numbered 0..n-1 in the order of the init string: row by row from the top,
+    `size // 2` squares per row.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.row_length = size // 2
+        self.squares = size * size // 2
+        self.full = (1 << self.squares) - 1
+
+        self.coordinates = [self._coordinates(square) for square in range(self.squares)]
+        self.neighbours = [[self.square_of((x + dx, y + dy)) for dx, dy in DIRECTIONS]
+                           for x, y in self.coordinates]
+
+        self.rays = [[self._ray(square, direction) for direction in range(4)] for square in range(self.squares)]
+        self.ray_masks = [[sum(1 << s for s in ray) for ray in rays] for rays in self.rays]
+
+        # step(bb, d) = OR des (bb & mask) décalés de shift, un couple par parité de ligne
+        self.steps = []
+        for direction in range(4):
+            masks = {}
+            for square, targets in enumerate(self.neighbours):
+                target = targets[direction]
+                if target is not None:
+                    masks[target - square] = masks.get(target - square, 0) | (1 << square)
+            self.steps.append(tuple(masks.items()))
+
+        # Clés de Zobrist : une par (case, code de pièce), plus une pour le trait aux noirs
+        rng = Random(size)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(4)] for _ in range(self.squares)]
+        self.zobrist_black_to_move = rng.getrandbits(64)
+
+        self.capture_solver = CaptureSolver(self)
+
+        # forme binaire d'une position : quatre bitboards et le camp au trait
+        self.packed_size = (4 * self.squares + 1 + 7) // 8
+
+        self.promotion_rows = (
+            sum(1 << s for s in range(self.row_length)),
+            sum(1 << s for s in range(self.squares - self.row_length, self.squares)),
+        )
+
+    def _coordinates(self, square: int) -> tuple[int, int]:
+        y, column = divmod(square, self.row_length)
+        return column * 2 + (1 if y % 2 == 0 else 0), y
+
+    def _ray(self, square: int, direction: int) -> tuple[int, ...]:
+        ray = []
+        target = self.neighbours[square][direction]
+        while target is not None:
+            ray.append(target)
+            target = self.neighbours[target][direction]
+        return tuple(ray)
+
+    def square_of(self, coordinates: tuple[int, int]) -> int | None:
+        x, y = coordinates
+        if not (0 <= x < self.size and 0 <= y < self.size) or (x + y) % 2 == 0:
+            return None
+        return y * self.row_length + x // 2
+
+    def step(self, bitboard: int, direction: int) -> int:
+        result = 0
+        for shift, mask in self.steps[direction]:
+            if shift > 0:
+                result |= (bitboard & mask) << shift
+            else:
+                result |= (bitboard & mask) >> -shift
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_geometry(size: int = GRID_SIZE) -> Geometry:
+    return Geometry(size)
+
+
+class Position:
+    """Bitboard position: men and kings of each side, one integer per set.
+
+    A move is a tuple `(path, captured)` of square indices: `path` holds the start square, every
+    landing square and the end square, `captured` the captured squares in capture order.
+    """
+
+    def __init__(self, size: int = GRID_SIZE):
+        self._geometry = get_geometry(size)
+        self._men = [0, 0]
+        self._kings = [0, 0]
+        self._hash = 0
+
+    def copy(self) -> Position:
+        position = Position.__new__(Position)
+        position._geometry = self._geometry
+        position._men = self._men.copy()
+        position._kings = self._kings.copy()
+        position._hash = self._hash
+        return position
+
+    def __deepcopy__(self, memo) -> Position:
+        # les tables de la géométrie sont partagées entre toutes les positions
+        return self.copy()
+
+    @classmethod
+    def from_string(cls, init_board: str, size: int = GRID_SIZE) -> Position:
+        """Position of a run-length init string such as `20b10.20w` (squares in init order)."""
+        position = cls(size)
+        squares = position._geometry.squares
+        bitboards = [0, 0, 0, 0]
+        square = count = 0
+        for char in init_board:
+            if "0" <= char <= "9":
+                count = count * 10 + ord(char) - 48
+                continue
+            if char not in INIT_CODES:
+                raise ValueError(f"Invalid character {char!r} in init string")
+            count = count or 1
+            code = INIT_CODES[char]
+            if code is not None:
+                bitboards[code] |= ((1 << count) - 1) << square
+            square += count
+            count = 0
+        if square != squares:
+            raise ValueError(f"Init string describes {square} squares instead of {squares}")
+        position._set_bitboards(bitboards)
+        return position
+
+    def to_string(self) -> str:
+        """Run-length init string, the inverse of from_string."""
+        chars = ["."] * self._geometry.squares
+        for code, bitboard in enumerate(self._bitboards()):
+            for square in iter_bits(bitboard):
+                chars[square] = PIECE_CHARS[code]
+        runs = []
+        for char, group in groupby(chars):
+            count = len(list(group))
+            runs.append(f"{count}{char}" if count > 1 else char)
+        return "".join(runs)
+
+    def encode(self, side: int) -> bytes:
+        """Fixed-size binary form: the four bitboards and the side to move, usable as a dict key."""
+        squares = self._geometry.squares
+        value = side
+        for bitboard in reversed(self._bitboards()):
+            value = value << squares | bitboard
+        return value.to_bytes(self._geometry.packed_size, "little")
+
+    @classmethod
+    def decode(cls, data: bytes, size: int = GRID_SIZE) -> tuple[Position, int]:
+        """Inverse of encode: (position, side to move)."""
+        position = cls(size)
+        return position, position.load(data)
+
+    def load(self, data: bytes) -> int:
+        """Replaces the pieces in place with the encoded position; returns the side to move."""
+        value = int.from_bytes(data, "little")
+        bitboards = []
+        for _ in range(4):
+            bitboards.append(value & self._geometry.full)
+            value >>= self._geometry.squares
+        self._set_bitboards(bitboards)
+        return value
+
+    def _bitboards(self) -> tuple[int, int, int, int]:
+        # dans l'ordre des codes de pièces
+        return self._men[WHITE], self._kings[WHITE], self._men[BLACK], self._kings[BLACK]
+
+    def _set_bitboards(self, bitboards) -> None:
+        self._men = [bitboards[WHITE_MAN], bitboards[BLACK_MAN]]
+        self._kings = [bitboards[WHITE_KING], bitboards[BLACK_KING]]
+        zobrist = self._geometry.zobrist
+        self._hash = 0
+        for code, bitboard in enumerate(bitboards):
+            for square in iter_bits(bitboard):
+                self._hash ^= zobrist[square][code]
+
+    def get_geometry(self) -> Geometry:
+        return self._geometry
+
+    def get_men(self, side: int) -> int:
+        return self._men[side]
+
+    def get_kings(self, side: int) -> int:
+        return self._kings[side]
+
+    def get_pieces(self, side: int) -> int:
+        return self._men[side] | self._kings[side]
+
+    def get_occupied(self) -> int:
+        return self._men[WHITE] | self._men[BLACK] | self._kings[WHITE] | self._kings[BLACK]
+
+    def get_hash(self) -> int:
+        """Zobrist hash of the pieces, updated by every set_piece."""
+        return self._hash
+
+    def hash_key(self, side: int) -> int:
+        """Zobrist hash of the position with `side` to move."""
+        return self._hash ^ self._geometry.zobrist_black_to_move if side == BLACK else self._hash
+
+    def count(self, side: int) -> int:
+        return (self._men[side] | self._kings[side]).bit_count()
+
+    def get_piece(self, square: int) -> int | None:
+        bit = 1 << square
+        for side in (WHITE, BLACK):
+            if self._men[side] & bit:
+                return side * 2
+            if self._kings[side] & bit:
+                return side * 2 + 1
+        return None
+
+    def set_piece(self, square: int, code: int | None) -> None:
+        previous = self.get_piece(square)
+        if previous == code:
+            return
+        keys = self._geometry.zobrist[square]
+        bit = 1 << square
+        if previous is not None:
+            self._hash ^= keys[previous]
+            side, is_king = divmod(previous, 2)
+            if is_king:
+                self._kings[side] &= ~bit
+            else:
+                self._men[side] &= ~bit
+        if code is not None:
+            self._hash ^= keys[code]
+            side, is_king = divmod(code, 2)
+            if is_king:
+                self._kings[side] |= bit
+            else:
+                self._men[side] |= bit
+
+    def play(self, move: tuple[tuple[int, ...], tuple[int, ...]]) -> Position:
+        """Copy of the position after `move`, promotion included."""
+        path, captured = move
+        position = self.copy()
+        code = position.get_piece(path[0])
+        position.set_piece(path[0], None)
+        for square in captured:
+            position.set_piece(square, None)
+        side, is_king = divmod(code, 2)
+        # un pion ne devient dame que s'il finit son coup sur la dernière ligne
+        if not is_king and (self._geometry.promotion_rows[side] >> path[-1]) & 1:
+            code += 1
+        position.set_piece(path[-1], code)
+        return position
+
+    def legal_moves(self, side: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """All legal moves of `side`: the captures taking the most pieces if any, else the quiet moves."""
+        captures = self.captures(side)
+        if captures:
+            return captures
+
+        result = []
+        g = self._geometry
+        empty = ~self.get_occupied() & g.full
+        for direction in FORWARD[side]:
+            back = opposite(direction)
+            for target in iter_bits(g.step(self._men[side], direction) & empty):
+                result.append(((g.neighbours[target][back], target), ()))
+        for square in iter_bits(self._kings[side]):
+            result += self.king_moves(square)
+        return result
+
+    def captures(self, side: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """The captures taking the most pieces, empty when `side` has no capture (quiet position)."""
+        return self._geometry.capture_solver.solve(self, side, self._capturing_candidates(side))
+
+    def man_moves(self, square: int, side: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        g = self._geometry
+        occupied = self.get_occupied()
+        result = []
+        for direction in FORWARD[side]:
+            target = g.neighbours[square][direction]
+            if target is not None and not (occupied >> target) & 1:
+                result.append(((square, target), ()))
+        return result
+
+    def king_moves(self, square: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        g = self._geometry
+        occupied = self.get_occupied()
+        result = []
+        for direction in range(4):
+            ray = g.ray_masks[square][direction]
+            blockers = ray & occupied
+            if blockers:
+                blocker = nearest(blockers, direction)
+                ray &= ~(g.ray_masks[blocker][direction] | (1 << blocker))
+            for target in g.rays[square][direction]:
+                if not (ray >> target) & 1:
+                    break
+                result.append(((square, target), ()))
+        return result
+
+    def _capturing_candidates(self, side: int) -> int:
+        # Pions ayant un adversaire adjacent suivi d'une case vide, plus toutes les dames
+        g = self._geometry
+        empty = ~self.get_occupied() & g.full
+        opponents = self.get_pieces(1 - side)
+        candidates = 0
+        for direction in range(4):
+            back = opposite(direction)
+            candidates |= g.step(opponents & g.step(empty, back), back)
+        return (candidates & self._men[side]) | self._kings[side]
+
+    def piece_captures(self, square: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """Longest capture sequences of the piece on `square`."""
+        return self._geometry.capture_solver.solve(self, self.get_piece(square) // 2, 1 << square)
@@ -1,95 +1,100 @@
-import re
+from __future__ import annotations
 
 import numpy as np
 
-from case import Case, PlayableCase
-from piece import Piece, Queen
+from bitboard import Position, SIDES, TEAMS, iter_bits
+from case import Case, CaseMarks, PlayableCase
+from config import GRID_SIZE
+from move_cache import LegalMovesCache
 from player import Player
 from team import Team
 
 
-def moddiv(a, b):
-    return a % b, a // b
-
-
-def factorize_string(string: str) -> str:
-    factorized = ""
-    count = 1
-    for i in range(1, len(string)):
-        if string[i] == string[i - 1]:
-            count += 1
-        else:
-            factorized += f"{count if count > 1 else ''}{string[i - 1]}"
-            count = 1
-    factorized += f"{count if count > 1 else ''}{string[-1]}"
-    return factorized
-
-
-def sign(a, b):
-    last_dir_x = (a[0] - b[0])
-    last_dir_y = (a[1] - b[1])
-    last_dir_x //= abs(last_dir_x)
-    last_dir_y //= abs(last_dir_y)
-    return last_dir_x, last_dir_y
-
-
 class Board:
     def __init__(self, size: int, init_board: str = None):
         if init_board is None:
             pions = ((size ** 2) // 2 - size) // 2
             init_board = f"{pions}b{size}.{pions}w"
             print(init_board)
-        self._size = size
-        self._board = np.zeros((size, size), dtype=Case)
-
-        self._init = [(int(num) if num else 1, char) for num, char in re.findall(r"(\d*)([wW]|[bB]|[.])", init_board)]
-        total = 0
-
+        self._init_cases(Position.from_string(init_board, size))
+
+    @classmethod
+    def from_position(cls, position: Position) -> Board:
+        """Plateau sur `position`, sans passer par la chaîne d'init ; la position n'est pas copiée."""
+        board = cls.__new__(cls)
+        board._init_cases(position)
+        return board
+
+    @classmethod
+    def from_bytes(cls, data: bytes, size: int = GRID_SIZE) -> tuple[Board, Team]:
+        """Inverse de encode : (plateau, camp au trait)."""
+        position, side = Position.decode(data, size)
+        return cls.from_position(position), TEAMS[side]
+
+    def encode(self, team: Team) -> bytes:
+        """Forme binaire de taille fixe de la position avec `team` au trait."""
+        return self._position.encode(SIDES[team])
+
+    def load(self, data: bytes) -> Team:
+        """Remplace la position par sa forme binaire `data` et renvoie le camp au trait."""
+        self.clear_cases_who_can_play()
+        return TEAMS[self._position.load(data)]
+
+    def _init_cases(self, position: Position) -> None:
+        geometry = position.get_geometry()
+        self._size = geometry.size
+        self._position = position
+        self._legal_moves_cache = LegalMovesCache()
         self._cases_who_can_play = []
-
-        def put_playable_case(coordinates, char):
-            match char:
-                case 'b':
-                    team = Team.BLACK
-                    piece_type = Piece
-                case 'w':
-                    team = Team.WHITE
-                    piece_type = Piece
-                case 'B':
-                    team = Team.BLACK
-                    piece_type = Queen
-                case 'W':
-                    team = Team.WHITE
-                    piece_type = Queen
-                case '.':
-                    team = None
-                    piece_type = None
-                case _:
-                    raise ValueError("Invalid character in init string")
-            if team is not None:
-                self._board[coordinates] = PlayableCase(coordinates, piece=piece_type(team))
-            else:
-                self._board[coordinates] = PlayableCase(coordinates)
-
-        for num, char in self._init:
-            for i in range(num):
-                i += total
-                x, y = moddiv(i * 2, size)
-                if (i // (size // 2)) % 2 == 0:
-                    self._board[x, y] = Case((x, y))
-                    x, y = moddiv(i * 2 + 1, size)
-                    put_playable_case((x, y), char)
-                else:
-                    put_playable_case((x, y), char)
-                    x, y = moddiv(i * 2 + 1, size)
-                    self._board[(x, y)] = Case((x, y))
-            total += num
+        # sélection et cases d'arrivée, tenues à jour par les cases : pas de parcours de la grille
+        self._marks = CaseMarks()
+
+        self._board = np.zeros((self._size, self._size), dtype=Case)
+        for x in range(self._size):
+            for y in range(x % 2, self._size, 2):
+                self._board[x, y] = Case((x, y))
+        self._playable_cases = [PlayableCase(coordinates, position, marks=self._marks)
+                                for coordinates in geometry.coordinates]
+        for case in self._playable_cases:
+            self._board[case.get_coordinates()] = case
 
     def get_board(self):
         return self._board
 
-    def get_selected_case(self):
-        return next(self.get_cases(lambda c: isinstance(c, PlayableCase) and c.is_selected()), None)
+    def copy(self) -> Board:
+        """Copie de la position seule, sans l'état d'affichage des cases."""
+        return Board.from_position(self._position.copy())
+
+    def get_position(self) -> Position:
+        return self._position
+
+    def get_case_of_square(self, square: int) -> PlayableCase:
+        return self._playable_cases[square]
+
+    def get_playable_cases(self) -> list[PlayableCase]:
+        return self._playable_cases
+
+    def get_pieces_of_team(self, team: Team) -> list[PlayableCase]:
+        """Cases occupées par `team`, lues sur le bitboard de ses pièces."""
+        return [self._playable_cases[square] for square in iter_bits(self._position.get_pieces(SIDES[team]))]
+
+    def count_pieces(self, team: Team) -> int:
+        return self._position.count(SIDES[team])
+
+    def count_men(self, team: Team) -> int:
+        return self._position.get_men(SIDES[team]).bit_count()
+
+    def count_kings(self, team: Team) -> int:
+        return self._position.get_kings(SIDES[team]).bit_count()
+
+    def to_paths(self, moves) -> list[dict[str, list[tuple[int, int]]]]:
+        """Convertit les coups du bitboard (cases 0..49) en chemins de coordonnées."""
+        coordinates = self._position.get_geometry().coordinates
+        return [{"move_path": [coordinates[s] for s in path], "eaten_pieces": [coordinates[s] for s in captured]}
+                for path, captured in moves]
+
+    def get_selected_case(self) -> PlayableCase | None:
+        return self._marks.selected
 
     def clear_cases_who_can_play(self):
         for case in self._cases_who_can_play:
@@ -114,9 +119,8 @@ class Board:
             return case
         raise TypeError(f"{case} is not a playable case")
 
-    def get_landing_cases(self):
-        return self.get_cases(
-            lambda c: isinstance(c, PlayableCase) and c.can_land())
+    def get_landing_cases(self) -> list[PlayableCase]:
+        return list(self._marks.landing)
 
     def get_cases(self, condition):
         return (case for case in self._board.flatten() if condition(case))
@@ -147,143 +151,66 @@ class Board:
             and 0 <= y < self._size
 
     def find_cases_who_can_play(self, current_player: Player):
-        # liste toutes les cases et leurs moves possibles
-        cases_data = []
-        for case in self.get_cases(
-                lambda c: isinstance(c, PlayableCase) and c.contains_piece_of_team(current_player.get_team())):
-            cases_data.append((case, case.get_piece().get_valid_paths(self, case.get_coordinates())))
-
-        cases_with_totals = [
-            (case_info[0], case_info[1], len(case_info[1][0]["eaten_pieces"]) if case_info[1] else 0)
-            for case_info in cases_data
-        ]
-
-        if not cases_with_totals:
-            return []
-
-        max_move = max(total for _, _, total in cases_with_totals)
-        if max_move == 0:
-            cases_with_totals = [
-                (case_info[0], case_info[1], len(case_info[1][0]["move_path"]) if case_info[1] else 0)
-                for case_info in cases_data
-            ]
-            max_move = max(total for _, _, total in cases_with_totals)
-            if max_move == 0:
-                return []
-        # building result
-        cases_who_can_play = []
+        """Cases qui peuvent jouer et leurs coups, prise maximale obligatoire.
+
+        Le résultat est partagé via le cache des coups légaux : il ne doit pas être modifié.
+        """
+        side = SIDES[current_player.get_team()]
+        key = self._position.hash_key(side)
+        result = self._legal_moves_cache.get(key)
+        if result is not None:
+            return result
+
+        moves_by_square = {}
+        for move in self._position.legal_moves(side):
+            moves_by_square.setdefault(move[0][0], []).append(move)
+
+        result = [(self._playable_cases[square], self.to_paths(moves)) for square, moves in moves_by_square.items()]
+        self._legal_moves_cache.put(key, result)
+        return result
+
+    def perft(self, player: Player, enemy: Player, depth: int, cache: dict | None = None) -> int:
+        """Nombre de positions atteintes en `depth` demi-coups, `player` au trait.
+
+        `cache` (position, profondeur) -> nombre de feuilles évite de recompter les transpositions.
+        """
+        if depth == 0:
+            return 1
+        if depth == 1:
+            # dernier niveau : compter les coups suffit, inutile de les jouer
+            return sum(len(moves) for _, moves in self.find_cases_who_can_play(player))
+        if cache is not None:
+            key = (self._position.hash_key(SIDES[player.get_team()]), depth)
+            nodes = cache.get(key)
+            if nodes is not None:
+                return nodes
+
+        cases_who_can_play = self.find_cases_who_can_play(player)
+        nodes = 0
+        for _, moves in cases_who_can_play:
+            for move in moves:
+                promoted = player.play_move(self, move)
+                nodes += self.perft(enemy, player, depth - 1, cache)
+                player.undo_move(self, move, promoted)
+        if cache is not None:
+            cache[key] = nodes
+        return nodes
+
+    def divide(self, player: Player, enemy: Player, depth: int, cache: dict | None = None) -> list[tuple[dict, int]]:
+        """perft détaillé par coup de la racine."""
         result = []
-        for case, move, total in cases_with_totals:
-            if total == max_move:
-                cases_who_can_play.append(case)
-                result.append((case, move))
-        self.set_cases_who_can_play(cases_who_can_play)
+        for _, moves in self.find_cases_who_can_play(player):
+            for move in moves:
+                promoted = player.play_move(self, move)
+                result.append((move, self.perft(enemy, player, depth - 1, cache)))
+                player.undo_move(self, move, promoted)
         return result
 
-    def simulate_move(self, start_pos, end_pos):
-        start_case = self.get_playable_case(start_pos)
-        end_case = self.get_playable_case(end_pos)
-
-        piece_to_move = start_case.get_piece()
-        start_case.set_piece(None)
-        end_case.set_piece(piece_to_move)
-
-    def simulate_eat(self, start_pos, end_pos):
-        start_case = self.get_playable_case(start_pos)
-        piece_team = start_case.get_piece().get_team()
-        end_case = self.get_playable_case(end_pos)
-
-        self.simulate_move(start_pos, end_pos)
-
-        cases_between = self.get_cases_between_start_and_end(start_case, end_case)
-        for case in cases_between:
-            opposite_team = Team.WHITE if piece_team == Team.BLACK else Team.BLACK
-            if case.contains_piece_of_team(opposite_team):
-                # print(f"adding {case} to marked !")
-                eaten_case = case.get_coordinates()
-                return eaten_case
-
-    def compute_eating_moves(self, playable_case: PlayableCase) -> list[list[tuple[int, int]]]:
-        all_paths = []
-
-        def explore_moves(current_case, path, eaten_pieces, visited_diagonals):
-            # Récupère les coordonnées actuelles
-            current_pos = current_case.get_coordinates()
-
-            # Cherche les mouvements possibles
-            possible_moves = current_case.get_piece().get_can_eat(self, current_pos, eaten_pieces)
-
-            # Si aucun mouvement n'est possible, ajoute le chemin actuel à la liste
-            if not possible_moves:
-                all_paths.append({"move_path": path, "eaten_pieces": eaten_pieces})
-                return
-
-            # Parcourt les diagonales possibles
-            for diagonal in possible_moves:
-                # Vérifie si cette diagonale a déjà été explorée pour ce point de départ
-                direction = sign(current_pos, diagonal[0])
-                if (diagonal, direction) in visited_diagonals:
-                    continue
-
-                visited_diagonals.append((diagonal, direction))  # Marque la diagonale comme visitée
-
-                for next_pos in diagonal:
-                    dead_end = True
-                    # Simule la capture
-                    eaten_piece = self.simulate_eat(current_pos, next_pos)
-                    # self.render()
-                    # sleep(0.2)
-                    next_case = self.get_playable_case(next_pos)
-
-                    # Si une autre capture est possible, explore cette position
-                    if next_case.get_piece().get_can_eat(self, next_pos, eaten_pieces + [eaten_piece]):
-                        dead_end = False
-                        explore_moves(
-                            next_case,
-                            path + [next_pos],
-                            eaten_pieces + [eaten_piece],
-                            visited_diagonals,
-                        )
-
-                    # Si c'est une extrémité ou aucune autre capture n'est possible, termine ici
-                    elif next_pos == diagonal[-1]:
-                        # Si toutes les case de la diagonale étaient des culs-de-sac
-                        if dead_end:
-                            for x in diagonal:
-                                all_paths.append(
-                                    {"move_path": path + [x], "eaten_pieces": eaten_pieces + [eaten_piece]})
-                        else:
-                            all_paths.append(
-                                {"move_path": path + [next_pos], "eaten_pieces": eaten_pieces + [eaten_piece]})
-
-                    # Rétablit l'état initial après la simulation
-                    self.simulate_move(next_pos, current_pos)
-                    # self.render()
-                    # sleep(0.4)
-
-        # Lance l'exploration depuis la case de départ
-        explore_moves(playable_case, [playable_case.get_coordinates()], [], [])
-
-        # Trouve les chemins maximaux
-        max_length = max(len(path["move_path"]) for path in all_paths) if all_paths else 0
-        if max_length == 1: return []
-        best_paths = [path for path in all_paths if len(path["move_path"]) == max_length]
-        # if len(best_paths) > 1: return [best_paths[0]]
-
-        return best_paths
+    def get_legal_moves_cache(self) -> LegalMovesCache:
+        return self._legal_moves_cache
+
+    def compute_eating_moves(self, playable_case: PlayableCase) -> list[dict[str, list[tuple[int, int]]]]:
+        return self.to_paths(self._position.piece_captures(playable_case.get_square()))
 
     def __repr__(self):
-        result = ""
-        for case in self._board.transpose().flatten():
-            if isinstance(case, PlayableCase):
-                lowercase = case.get_piece().__class__.__name__ == "Piece"
-                if case.get_piece() is None:
-                    result += '.'
-                    continue
-
-                match case.get_piece().get_team():
-                    case Team.WHITE:
-                        result += 'w' if lowercase else 'W'
-                    case Team.BLACK:
-                        result += 'b' if lowercase else 'B'
-        return factorize_string(result)
+        return self._position.to_string()
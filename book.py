@@ -0,0 +1,300 @@
+"""Bibliothèque d'ouvertures : pour chaque position (hash Zobrist, camp au trait), les coups joués,
+combien de parties et leur score pour le camp qui joue.
+
+    python book.py selfplay --engine max_depth=4 --games 400 --workers 8 --output book.bin
+    python book.py import games.pdn --output book.bin --merge
+
+Le fichier est une suite d'enregistrements de taille fixe triés par hash, ouvert en mmap et cherché
+par dichotomie : rien n'est lu au démarrage, seulement les quelques pages touchées par une recherche.
+Les parties de self-play commencent par quelques coups au hasard pour varier les lignes ; ces coups
+n'entrent pas dans la bibliothèque, seuls ceux choisis par le moteur y sont gardés. N'importe pas pygame.
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import random
+import re
+import struct
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from bitboard import SIDES, START_POSITION
+from board import Board
+from config import GRID_SIZE
+from player import Player
+from team import Team, other_team
+from tournament import parse_engine, play_game
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+MAGIC = b"DAMBOOK1"
+# hash de la position, coup (départ << 6 | arrivée), parties, demi-points du camp qui joue
+RECORD = struct.Struct("<QHII")
+BOOK_PLIES = 16
+
+
+class _Keys:
+    """Les hash du fichier vus comme une liste, pour bisect."""
+
+    def __init__(self, data: mmap.mmap, size: int):
+        self._data = data
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index: int) -> int:
+        return struct.unpack_from("<Q", self._data, len(MAGIC) + index * RECORD.size)[0]
+
+
+class OpeningBook:
+    """Lecture du fichier de la bibliothèque, ouvert à la première recherche.
+
+    Parmi les coups connus d'une position, seuls ceux joués au moins `min_games` fois et dont le
+    score est à moins de `margin` du meilleur sont gardés ; le choix est tiré au hasard, pondéré
+    par le nombre de parties.
+    """
+
+    def __init__(self, path: str, min_games: int = 1, margin: float = 0.1, rng: random.Random | None = None):
+        self._path = path
+        self.min_games = min_games
+        self.margin = margin
+        self._rng = rng or random.Random()
+        self._data: mmap.mmap | None = None
+        self._keys: _Keys | None = None
+        self._opened = False
+
+    def _open(self) -> None:
+        self._opened = True
+        if not os.path.exists(self._path) or os.path.getsize(self._path) <= len(MAGIC):
+            return
+        with open(self._path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(MAGIC)] != MAGIC:
+            data.close()
+            raise ValueError(f"{self._path} is not an opening book")
+        self._data = data
+        self._keys = _Keys(data, (len(data) - len(MAGIC)) // RECORD.size)
+
+    def get_size(self) -> int:
+        if not self._opened:
+            self._open()
+        return len(self._keys) if self._keys is not None else 0
+
+    def probe(self, key: int) -> list[tuple[int, int, float]]:
+        """Coups connus de la position : (coup, parties, score entre 0 et 1)."""
+        if not self._opened:
+            self._open()
+        if self._keys is None:
+            return []
+        result = []
+        for index in range(bisect_left(self._keys, key), len(self._keys)):
+            entry_key, move, games, points = RECORD.unpack_from(self._data, len(MAGIC) + index * RECORD.size)
+            if entry_key != key:
+                break
+            result.append((move, games, points / (2 * games)))
+        return result
+
+    def choose_move(self, board: Board, team: Team):
+        """Coup (départ, arrivée) de la bibliothèque pour `team` au trait, ou None."""
+        position = board.get_position()
+        entries = self.probe(position.hash_key(SIDES[team]))
+        if not entries:
+            return None
+
+        # une collision de hash donnerait un coup impossible : on ne garde que les coups légaux
+        coordinates = position.get_geometry().coordinates
+        legal = {(move["move_path"][0], move["move_path"][-1])
+                 for _, moves in board.find_cases_who_can_play(Player(0, "", team)) for move in moves}
+        candidates = [((coordinates[move >> 6], coordinates[move & 63]), games, score)
+                      for move, games, score in entries if games >= self.min_games]
+        candidates = [candidate for candidate in candidates if candidate[0] in legal]
+        if not candidates:
+            return None
+        best = max(score for _, _, score in candidates)
+        candidates = [candidate for candidate in candidates if candidate[2] >= best - self.margin]
+        return self._rng.choices([move for move, _, _ in candidates],
+                                 weights=[games for _, games, _ in candidates])[0]
+
+    def get_entries(self) -> Iterator[tuple[int, int, int, int]]:
+        """Tous les enregistrements : (hash, coup, parties, demi-points)."""
+        for index in range(self.get_size()):
+            yield RECORD.unpack_from(self._data, len(MAGIC) + index * RECORD.size)
+
+    def close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+        self._data = None
+        self._keys = None
+        self._opened = False
+
+
+class BookBuilder:
+    def __init__(self):
+        # (hash, coup) -> [parties, demi-points]
+        self._entries: dict[tuple[int, int], list[int]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key: int, move: int, points: int) -> None:
+        """`points` : 2 pour une victoire du camp qui joue, 1 pour une nulle, 0 pour une défaite."""
+        entry = self._entries.setdefault((key, move), [0, 0])
+        entry[0] += 1
+        entry[1] += points
+
+    def add_game(self, record: list[tuple[int, int, int]], white_score: float, book_plies: int = BOOK_PLIES,
+                 first_ply: int = 0) -> None:
+        """`record` au format de tournament.play_game : (hash, camp au trait, coup).
+
+        Les `first_ply` premiers demi-coups (ouverture tirée au hasard) ne sont pas ajoutés.
+        """
+        for key, side, move in record[first_ply:book_plies]:
+            score = white_score if side == SIDES[Team.WHITE] else 1.0 - white_score
+            self.add(key, move, round(2 * score))
+
+    def merge(self, path: str) -> None:
+        book = OpeningBook(path)
+        for key, move, games, points in book.get_entries():
+            entry = self._entries.setdefault((key, move), [0, 0])
+            entry[0] += games
+            entry[1] += points
+        book.close()
+
+    def write(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            for (key, move), (games, points) in sorted(self._entries.items()):
+                file.write(RECORD.pack(key, move, games, points))
+
+
+def _selfplay_game(task) -> tuple[list[tuple[int, int, int]], float, int]:
+    """(demi-coups joués, score des blancs, nombre de demi-coups tirés au hasard en tête de partie)."""
+    engine, random_plies, seed = task
+    rng = random.Random(seed)
+    board = Board(GRID_SIZE, START_POSITION)
+    team = Team.WHITE
+    record = []
+    square_of = board.get_position().get_geometry().square_of
+    for _ in range(random_plies):
+        player = Player(0, "", team)
+        moves = [move for _, case_moves in board.find_cases_who_can_play(player) for move in case_moves]
+        if not moves:
+            break
+        move = rng.choice(moves)
+        record.append((board.get_position().hash_key(SIDES[team]), SIDES[team],
+                       square_of(move["move_path"][0]) << 6 | square_of(move["move_path"][-1])))
+        player.play_move(board, move)
+        team = other_team(team)
+    random_count = len(record)
+    score, _, _ = play_game(engine, engine, str(board), team, record=record)
+    return record, score, random_count
+
+
+def build_from_selfplay(builder: BookBuilder, engine: dict, games: int, random_plies: int = 4,
+                        book_plies: int = BOOK_PLIES, workers: int = 1, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    tasks = [(engine, rng.randint(0, random_plies), rng.getrandbits(32)) for _ in range(games)]
+    with ProcessPoolExecutor(workers) as pool:
+        for index, (record, score, random_count) in enumerate(pool.map(_selfplay_game, tasks)):
+            # les coups tirés au hasard ne donnent que de la variété : seuls ceux du moteur entrent dans le livre
+            builder.add_game(record, score, book_plies, first_ply=random_count)
+            print(f"game {index + 1}/{games}: {score} ({len(record)} plies), {len(builder)} entries", flush=True)
+
+
+RESULTS = {"2-0": 1.0, "1-0": 1.0, "0-2": 0.0, "0-1": 0.0, "1-1": 0.5, "1/2-1/2": 0.5}
+MOVE = re.compile(r"\d+(?:[-x]\d+)+")
+
+
+def parse_pdn(text: str) -> Iterator[tuple[list[str], float]]:
+    """Parties d'un fichier PDN partant de la position initiale : (coups, score des blancs).
+
+    Les commentaires, variantes et parties sans résultat ou avec une position de départ (FEN)
+    sont ignorés.
+    """
+    text = re.sub(r"\{[^}]*\}", " ", text)
+    while re.search(r"\([^()]*\)", text):
+        text = re.sub(r"\([^()]*\)", " ", text)
+    moves, has_setup = [], False
+    for token in re.findall(r"\[[^\]]*\]|\S+", text):
+        if token.startswith("["):
+            has_setup = has_setup or token[1:].upper().startswith("FEN")
+        elif token in RESULTS or token == "*":
+            if token != "*" and moves and not has_setup:
+                yield moves, RESULTS[token]
+            moves, has_setup = [], False
+        elif MOVE.fullmatch(token.split(".")[-1]):
+            moves.append(token.split(".")[-1])
+
+
+def replay(moves: list[str]) -> list[tuple[int, int, int]]:
+    """Rejoue une partie notée depuis la position initiale, au format de tournament.play_game.
+
+    S'arrête au premier coup illégal ou ambigu.
+    """
+    board = Board(GRID_SIZE, START_POSITION)
+    square_of = board.get_position().get_geometry().square_of
+    team = Team.WHITE
+    record = []
+    for notation in moves:
+        squares = [int(square) - 1 for square in re.split("[-x]", notation)]
+        player = Player(0, "", team)
+        matching = []
+        for _, case_moves in board.find_cases_who_can_play(player):
+            for move in case_moves:
+                path = [square_of(coordinates) for coordinates in move["move_path"]]
+                if path[0] == squares[0] and path[-1] == squares[-1] and (len(squares) == 2 or path == squares):
+                    matching.append(move)
+        if len(matching) != 1:
+            break
+        move = matching[0]
+        record.append((board.get_position().hash_key(SIDES[team]), SIDES[team], squares[0] << 6 | squares[-1]))
+        player.play_move(board, move)
+        team = other_team(team)
+    return record
+
+
+def import_pdn(builder: BookBuilder, path: str, book_plies: int = BOOK_PLIES) -> int:
+    with open(path) as file:
+        text = file.read()
+    games = 0
+    for moves, white_score in parse_pdn(text):
+        builder.add_game(replay(moves[:book_plies]), white_score, book_plies)
+        games += 1
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the opening book.")
+    parser.add_argument("--output", default="book.bin")
+    parser.add_argument("--merge", action="store_true", help="add to the existing book instead of replacing it")
+    parser.add_argument("--book-plies", type=int, default=BOOK_PLIES)
+    commands = parser.add_subparsers(dest="command", required=True)
+    selfplay = commands.add_parser("selfplay", help="engine self-play games")
+    selfplay.add_argument("--engine", default="max_depth=4", type=parse_engine)
+    selfplay.add_argument("--games", type=int, default=100)
+    selfplay.add_argument("--random-plies", type=int, default=4, help="at most this many random plies per game")
+    selfplay.add_argument("--workers", type=int, default=os.cpu_count())
+    selfplay.add_argument("--seed", type=int, default=0)
+    imported = commands.add_parser("import", help="PDN game collection")
+    imported.add_argument("pdn")
+    args = parser.parse_args()
+
+    builder = BookBuilder()
+    if args.merge:
+        builder.merge(args.output)
+    if args.command == "selfplay":
+        build_from_selfplay(builder, args.engine, args.games, args.random_plies, args.book_plies, args.workers,
+                            args.seed)
+    else:
+        print(f"{import_pdn(builder, args.pdn, args.book_plies)} games imported")
+    builder.write(args.output)
+    print(f"{len(builder)} entries written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bitboard import Geometry, Position
+
+Move = tuple[tuple[int, ...], tuple[int, ...]]
+
+
+class CaptureSolver:
+    """Recherche des rafles maximales, prise maximale obligatoire.
+
+    - une pièce sur le bord ne peut jamais être prise (il n'y a pas de case derrière elle), le
+      nombre de pièces adverses hors du bord borne donc la longueur de toute rafle ;
+    - un pion saute de deux colonnes à chaque prise : il ne prend que des pièces sur les colonnes
+      de l'autre parité que la sienne, ce qui borne ses rafles plus serré que pour une dame ;
+    - une pièce dont la borne n'atteint pas la meilleure rafle trouvée n'est pas explorée, une
+      branche dont les prises faites plus les pièces encore prenables ne l'atteignent pas non plus ;
+    - deux rafles de même départ, même arrivée et mêmes pièces prises ne sont gardées qu'une fois,
+      quel que soit l'ordre des cases d'atterrissage ;
+    - les pièces prises sont un masque de bits, le chemin une pile qu'on empile et dépile.
+    """
+
+    def __init__(self, geometry: Geometry):
+        self._neighbours = geometry.neighbours
+        self._rays = geometry.rays
+        self._ray_masks = geometry.ray_masks
+        self._capturable = sum(1 << square for square, neighbours in enumerate(geometry.neighbours)
+                               if None not in neighbours)
+        # cases de chaque parité de colonne
+        self._columns = [sum(1 << square for square, (x, _) in enumerate(geometry.coordinates) if x % 2 == parity)
+                         for parity in (0, 1)]
+        self._column_of = [x % 2 for x, _ in geometry.coordinates]
+        # noeuds explorés, comptés par thread : le solveur est partagé par tous les plateaux de la taille
+        self._counter = threading.local()
+
+    def get_expansions(self) -> int:
+        """Noeuds explorés par les recherches de rafles du thread appelant."""
+        return getattr(self._counter, "expansions", 0)
+
+    def _reachable(self, opponents: int, square: int, is_king: bool) -> int:
+        """Pièces adverses que la pièce de `square` pourrait prendre dans une rafle."""
+        reachable = opponents & self._capturable
+        return reachable if is_king else reachable & self._columns[1 - self._column_of[square]]
+
+    def upper_bound(self, position: Position, side: int, square: int | None = None) -> int:
+        """Nombre maximal de pièces que `side` (ou sa pièce de `square`) peut prendre en une rafle."""
+        opponents = position.get_pieces(1 - side)
+        if square is None:
+            return (opponents & self._capturable).bit_count()
+        return self._reachable(opponents, square, bool((position.get_kings(side) >> square) & 1)).bit_count()
+
+    def solve(self, position: Position, side: int, candidates: int) -> list[Move]:
+        """Rafles maximales de `side` parmi les pièces de `candidates` (masque de cases)."""
+        opponents = position.get_pieces(1 - side)
+        capturable = opponents & self._capturable
+        if not capturable or not candidates:
+            return []
+
+        neighbours, rays, ray_masks = self._neighbours, self._rays, self._ray_masks
+        occupied_all = position.get_occupied()
+        kings = position.get_kings(side)
+        found: dict[tuple[int, int, int], Move] = {}
+        best = 1
+        expansions = 0
+        path: list[int] = []
+        captured: list[int] = []
+        # pièces prenables par la pièce en cours d'exploration
+        reachable = capturable
+
+        def explore(current, is_king, occupied, captured_mask, count):
+            nonlocal best, expansions
+            expansions += 1
+            extended = False
+            for direction in range(4):
+                if is_king:
+                    ray = ray_masks[current][direction] & occupied
+                    if not ray:
+                        continue
+                    # première pièce rencontrée sur la diagonale
+                    victim = (ray & -ray).bit_length() - 1 if direction >= 2 else ray.bit_length() - 1
+                else:
+                    victim = neighbours[current][direction]
+                    if victim is None:
+                        continue
+                victim_bit = 1 << victim
+                if not opponents & victim_bit or captured_mask & victim_bit:
+                    continue
+                remaining = (reachable & ~(captured_mask | victim_bit)).bit_count()
+                for landing in rays[victim][direction]:
+                    if (occupied >> landing) & 1:
+                        break
+                    # la rafle continue forcément : ce noeud n'est pas une fin de rafle, même élagué
+                    extended = True
+                    if count + 1 + remaining >= best:
+                        path.append(landing)
+                        captured.append(victim)
+                        explore(landing, is_king, occupied, captured_mask | victim_bit, count + 1)
+                        path.pop()
+                        captured.pop()
+                    if not is_king:
+                        break
+            if not extended and count >= best:
+                if count > best:
+                    best = count
+                    found.clear()
+                key = (path[0], current, captured_mask)
+                if key not in found:
+                    found[key] = (tuple(path), tuple(captured))
+
+        # les dames d'abord : leurs rafles sont souvent les plus longues et élaguent le reste
+        for group in (candidates & kings, candidates & ~kings):
+            while group:
+                low = group & -group
+                group ^= low
+                square = low.bit_length() - 1
+                is_king = bool(kings & low)
+                reachable = self._reachable(opponents, square, is_king)
+                if reachable.bit_count() < best:
+                    continue
+                path.append(square)
+                # la pièce quitte sa case de départ, les pièces prises restent jusqu'à la fin de la rafle
+                explore(square, is_king, occupied_all & ~low, 0, 0)
+                path.pop()
+        self._counter.expansions = self.get_expansions() + expansions
+        return list(found.values())
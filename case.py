@@ -2,14 +2,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import pygame as pg
-
 from colors_constants import *
 from config import GRID_SIZE
+from piece import Piece, Queen, get_piece_of_code
 from team import Team
 
 if TYPE_CHECKING:
-    from piece import Piece
+    import pygame as pg
+
+    from bitboard import Position
 
 
 class Case:
@@ -20,21 +21,43 @@ class Case:
     def get_coordinates(self) -> tuple[int, int]:
         return self._x, self._y
 
+    def get_state(self):
+        """Ce qui détermine l'image de la case : elle n'est redessinée que s'il change."""
+        return self._color
+
     def draw(self, surface: pg.Surface, size: int, offset: int = 0) -> None:
-        pg.draw.rect(surface, self._color, pg.Rect(self._x * (size + offset), self._y * (size + offset), size, size))
+        # pygame n'est chargé que pour l'affichage : le moteur tourne sans lui
+        import pygame as pg
+        surface.fill(self._color, pg.Rect(self._x * (size + offset), self._y * (size + offset), size, size))
 
     def __repr__(self) -> str:
         return f"({self.__class__.__name__}({self._x}, {self._y}))"
 
 
+class CaseMarks:
+    """Case sélectionnée et cases d'arrivée d'un plateau, tenues à jour par les cases elles-mêmes."""
+
+    def __init__(self):
+        self.selected: PlayableCase | None = None
+        # dict pour garder l'ordre de marquage
+        self.landing: dict[PlayableCase, None] = {}
+
+
 class PlayableCase(Case):
-    def __init__(self, coordinates: tuple[int, int], piece: Piece = None):
+    """Vue sur une case du bitboard : la pièce est lue et écrite dans la `Position`."""
+
+    def __init__(self, coordinates: tuple[int, int], position: Position, piece: Piece = None,
+                 marks: CaseMarks | None = None):
         super().__init__(coordinates)
         self._is_selected = False
         self._can_land = False
+        self._marks = marks if marks is not None else CaseMarks()
         self._color = DEFAULT_PLAYABLE_COLOR
-        self._piece = piece
+        self._position = position
+        self._square = position.get_geometry().square_of(coordinates)
         self._move = []
+        if piece is not None:
+            self.set_piece(piece)
 
     def get_move(self):
         return self._move
@@ -46,21 +69,36 @@ class PlayableCase(Case):
         self._move = can_play
         self.update_color()
 
-    def get_piece(self) -> Piece:
-        return self._piece
+    def get_state(self):
+        return self._color, self._position.get_piece(self._square), self._can_land
+
+    def get_square(self) -> int:
+        return self._square
+
+    def get_piece(self) -> Piece | None:
+        return get_piece_of_code(self._position.get_piece(self._square))
 
     def set_piece(self, content: Piece | None) -> None:
-        self._piece = content
+        self._position.set_piece(self._square, None if content is None else content.get_code())
 
     def set_selected(self, param: bool) -> None:
         self._is_selected = param
+        if param:
+            self._marks.selected = self
+        elif self._marks.selected is self:
+            self._marks.selected = None
         self.update_color()
 
     def set_can_land(self, param: bool) -> None:
         self._can_land = param
+        if param:
+            self._marks.landing[self] = None
+        else:
+            self._marks.landing.pop(self, None)
 
     def contains_piece_of_team(self, team: Team) -> bool:
-        return self._piece is not None and self._piece.get_team() == team
+        piece = self.get_piece()
+        return piece is not None and piece.get_team() == team
 
     def is_selected(self) -> bool:
         return self._is_selected
@@ -69,26 +107,30 @@ class PlayableCase(Case):
         return self._can_land
 
     def try_promotion(self) -> bool:
-        from piece import Queen
-        if self._y == 0 and self._piece.get_team() is Team.WHITE:
-            self._piece = Queen(self._piece.get_team())
+        piece = self.get_piece()
+        if isinstance(piece, Queen):
+            return False
+        if self._y == 0 and piece.get_team() is Team.WHITE:
+            self.set_piece(Queen(piece.get_team()))
             return True
-        elif self._y == GRID_SIZE - 1 and self._piece.get_team() is Team.BLACK:
-            self._piece = Queen(self._piece.get_team())
+        elif self._y == GRID_SIZE - 1 and piece.get_team() is Team.BLACK:
+            self.set_piece(Queen(piece.get_team()))
             return True
         return False
 
     def draw(self, surface: pg.Surface, size: int, offset: int = 0) -> None:
+        import pygame as pg
         super().draw(surface, size, offset)
-        if self._piece is not None:
-            self._piece.draw(surface, self.get_coordinates(), size, offset)
+        piece = self.get_piece()
+        if piece is not None:
+            piece.draw(surface, self.get_coordinates(), size, offset)
         elif self._can_land:
             pg.draw.circle(surface, ARROWS_COLOR,
                            (self._x * (size + offset) + size / 2, self._y * (size + offset) + size / 2), size / 6)
 
 
     def __repr__(self) -> str:
-        return f"{super().__repr__()} {self._piece}"
+        return f"{super().__repr__()} {self.get_piece()}"
 
     def update_color(self):
         if self.is_selected():
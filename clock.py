@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+
+class GameClock:
+    """Temps de réflexion d'un joueur sur toute la partie.
+
+    `allocate` partage le temps restant entre les coups qu'il reste probablement à jouer,
+    `consume` décompte le temps réellement passé après chaque coup.
+    """
+
+    def __init__(self, total_time: float, increment: float = 0.0, moves_to_go: int | None = None,
+                 expected_moves: int = 50, min_moves_left: int = 15, min_time: float = 0.05):
+        self._remaining = total_time
+        self._increment = increment
+        self._moves_to_go = moves_to_go
+        self._expected_moves = expected_moves
+        self._min_moves_left = min_moves_left
+        self._min_time = min_time
+        self._moves_played = 0
+
+    def get_remaining(self) -> float:
+        return self._remaining
+
+    def get_moves_played(self) -> int:
+        return self._moves_played
+
+    def allocate(self) -> float:
+        """Budget in seconds for the next move."""
+        if self._moves_to_go:
+            moves_left = self._moves_to_go
+        else:
+            moves_left = max(self._expected_moves - self._moves_played, self._min_moves_left)
+        budget = self._remaining / moves_left + self._increment * 0.8
+        # ne jamais engager plus de la moitié de la pendule sur un seul coup
+        return max(min(budget, self._remaining / 2), self._min_time)
+
+    def consume(self, elapsed: float) -> None:
+        self._remaining = max(self._remaining - elapsed, 0.0) + self._increment
+        self._moves_played += 1
+        if self._moves_to_go:
+            self._moves_to_go -= 1
@@ -1,5 +1,29 @@
+import os
+
 GRID_SIZE = 10
 SCREEN_SIZE = (900, 900)
 OFFSET = 2
 CELL_SIZE = (SCREEN_SIZE[1] - OFFSET * GRID_SIZE) // GRID_SIZE
 LINES_INDICATOR_WIDTH = 6
+TT_SIZE_MB = 16
+AI_MAX_DEPTH = 20
+# temps de réflexion de l'IA pour toute la partie, en secondes
+AI_GAME_TIME = 300
+AI_INCREMENT = 0
+# l'IA réfléchit pendant le tour du joueur sur le coup qu'elle lui prête
+AI_PONDER = True
+# positions gardées dans le cache des coups légaux de chaque plateau ; une entrée garde les chemins
+# en coordonnées (quelques Ko)
+LEGAL_MOVES_CACHE_SIZE = 2048
+# bibliothèque d'ouvertures de l'IA (construite par book.py), ignorée si le fichier n'existe pas
+BOOK_PATH = "book.bin"
+# tables de finales (construites par tablebase.py), ignorées si le dossier n'existe pas
+TABLEBASE_PATH = "tablebases"
+# position complète gardée dans l'historique de la partie tous les N demi-coups
+HISTORY_CHECKPOINT_INTERVAL = 20
+# poids de l'évaluation (réglés par tune.py), poids par défaut si le fichier n'existe pas
+WEIGHTS_PATH = "weights.json"
+# profilage de chaque recherche de l'IA (cprofile ou tracemalloc) et fichier JSONL de ses statistiques,
+# réglables sans toucher au code
+SEARCH_PROFILE = os.environ.get("DAMES_SEARCH_PROFILE") or None
+SEARCH_TRACE = os.environ.get("DAMES_SEARCH_TRACE") or None
@@ -0,0 +1,232 @@
+"""Moteur sans interface, piloté ligne par ligne sur l'entrée standard (dans l'esprit des protocoles
+Hub et DXP des moteurs de dames).
+
+    python engine.py
+    python main.py --engine
+
+Commandes, une par ligne, arguments `clé=valeur` :
+
+    hub                              identification, répond `id ...` puis `wait`
+    pos init=20b10.20w side=w        position (chaîne d'init du Board) et camp au trait
+    pos start                        position de départ, blancs au trait
+    move 32-28                       joue un coup en notation officielle (cases 1 à 50, `x` pour une prise)
+    go depth=8 | time=2.5 | nodes=100000 | infinite
+                                     cherche en arrière-plan ; une ligne `info` par profondeur
+                                     terminée, puis `done move=... score=...`
+    stop                             arrête la recherche en cours, qui répond `done` avec son meilleur coup
+    new-game                         vide la table de transposition
+    board                            affiche la position : `board init=... side=...`
+    ping                             répond `pong` tout de suite, même pendant une recherche
+    quit
+
+Le moteur reste en mémoire entre les commandes : table de transposition, historique des coups et
+caches de coups légaux servent d'une analyse à la suivante. Seul le protocole est écrit sur la
+sortie standard, les affichages du moteur partent sur la sortie d'erreur.
+"""
+from __future__ import annotations
+
+import sys
+from threading import Lock, Thread
+from typing import TextIO
+
+from bitboard import SIDES, START_POSITION, Position
+from board import Board
+from config import GRID_SIZE
+from perft import move_notation
+from player import AI, Player
+from strategy import MiniMax
+from team import Team, other_team
+from worker import stop_search
+
+NAME = "jeu-de-dames"
+# profondeur d'une recherche sans limite (`go infinite`), arrêtée par `stop`
+INFINITE_DEPTH = 100
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def parse_arguments(words: list[str]) -> dict[str, str]:
+    arguments = {}
+    for word in words:
+        name, _, value = word.partition("=")
+        arguments[name] = value
+    return arguments
+
+
+def find_move(board: Board, team: Team, notation: str) -> dict:
+    """Coup de `team` noté `notation` ; le chemin complet départage deux rafles de mêmes extrémités."""
+    try:
+        squares = [int(square) - 1 for square in notation.replace("x", "-").split("-")]
+    except ValueError:
+        raise ProtocolError(f"invalid move {notation!r}") from None
+    square_of = board.get_position().get_geometry().square_of
+    matching = []
+    for _, moves in board.find_cases_who_can_play(Player(0, "", team)):
+        for move in moves:
+            path = [square_of(coordinates) for coordinates in move["move_path"]]
+            if path[0] == squares[0] and path[-1] == squares[-1] and (len(squares) == 2 or path == squares):
+                matching.append(move)
+    if len(matching) != 1:
+        raise ProtocolError(f"{'ambiguous' if matching else 'illegal'} move {notation!r}")
+    return matching[0]
+
+
+class Engine:
+    def __init__(self, output: TextIO, strategy: MiniMax | None = None):
+        self._output = output
+        self._output_lock = Lock()
+        self.strategy = strategy if strategy is not None else MiniMax(max_depth=INFINITE_DEPTH)
+        self.strategy.on_iteration = self._send_info
+        self._board = Board(GRID_SIZE, START_POSITION)
+        self._team = Team.WHITE
+        # plateau de la recherche, gardé d'une recherche à l'autre avec son cache de coups légaux ;
+        # `board` reste lisible pendant qu'elle joue et annule ses coups
+        self._search_board = self._board.copy()
+        self._search: Thread | None = None
+
+    def send(self, line: str) -> None:
+        with self._output_lock:
+            self._output.write(line + "\n")
+            self._output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Exécute une commande ; renvoie False pour `quit`."""
+        words = line.split()
+        if not words:
+            return True
+        command, arguments = words[0], words[1:]
+        if command == "quit":
+            self.stop()
+            return False
+        handler = getattr(self, "command_" + command.replace("-", "_"), None)
+        if handler is None:
+            self.send(f"error unknown command {command}")
+            return True
+        try:
+            handler(arguments)
+        except ProtocolError as error:
+            self.send(f"error {error}")
+        return True
+
+    def _require_idle(self) -> None:
+        if self._search is not None and self._search.is_alive():
+            raise ProtocolError("search in progress, send stop first")
+
+    def command_hub(self, arguments: list[str]) -> None:
+        self.send(f'id name={NAME} size={GRID_SIZE}')
+        self.send("wait")
+
+    def command_ping(self, arguments: list[str]) -> None:
+        # pas d'attente : après `go infinite`, seul un `stop` lu ensuite termine la recherche
+        self.send("pong")
+
+    def command_new_game(self, arguments: list[str]) -> None:
+        self._require_idle()
+        self.strategy.transposition_table.clear()
+
+    def command_pos(self, arguments: list[str]) -> None:
+        self._require_idle()
+        values = parse_arguments(arguments)
+        init_board = START_POSITION if "start" in values else values.get("init", START_POSITION)
+        side = values.get("side", "w")
+        if side not in ("w", "b"):
+            raise ProtocolError(f"invalid side {side!r}")
+        team = Team.WHITE if side == "w" else Team.BLACK
+        # une position refusée laisse le plateau et le camp au trait inchangés
+        try:
+            data = Position.from_string(init_board, GRID_SIZE).encode(SIDES[team])
+        except ValueError as error:
+            raise ProtocolError(str(error)) from None
+        self._board.load(data)
+        self._team = team
+
+    def command_move(self, arguments: list[str]) -> None:
+        self._require_idle()
+        if not arguments:
+            raise ProtocolError("move needs a move")
+        # tous les coups sont vérifiés sur une copie : un coup illégal ne laisse pas la suite à moitié jouée
+        board, team = self._board.copy(), self._team
+        for notation in arguments:
+            move = find_move(board, team, notation)
+            Player(0, "", team).play_move(board, move)
+            team = other_team(team)
+        self._board.load(board.encode(team))
+        self._team = team
+
+    def command_board(self, arguments: list[str]) -> None:
+        self.send(f"board init={self._board} side={'w' if self._team is Team.WHITE else 'b'}")
+
+    def command_go(self, arguments: list[str]) -> None:
+        self._require_idle()
+        values = parse_arguments(arguments)
+        strategy = self.strategy
+        try:
+            strategy.max_depth = int(values.get("depth", INFINITE_DEPTH))
+            strategy.time_limit = float(values["time"]) if "time" in values else None
+            strategy.node_limit = int(values["nodes"]) if "nodes" in values else None
+        except ValueError as error:
+            raise ProtocolError(str(error)) from None
+        if not self._board.find_cases_who_can_play(Player(0, "", self._team)):
+            self.send("done move=none")
+            return
+
+        board = self._search_board
+        board.load(self._board.encode(self._team))
+        player = AI(0, NAME, self._team, strategy)
+        enemy = Player(1, "", other_team(self._team))
+        state = {"board": board, "self_player": player, "enemy_player": enemy, "current_player": player}
+        self._search = Thread(target=self._run_search, args=(state,), daemon=True)
+        self._search.start()
+
+    def _run_search(self, state: dict) -> None:
+        board: Board = state["board"]
+        start, end = self.strategy.choose_move(state)
+        team = state["current_player"].get_team()
+        move = next(move for _, moves in board.find_cases_who_can_play(Player(0, "", team)) for move in moves
+                    if move["move_path"][0] == start and move["move_path"][-1] == end)
+        stats = self.strategy.get_stats()
+        score = "none" if stats.score is None else f"{stats.score:g}"
+        self.send(f"done move={move_notation(board, move)} score={score} depth={stats.depth} nodes={stats.nodes}")
+
+    def _send_info(self, iteration: dict) -> None:
+        pv = self.strategy.format_pv(self._search_board, self._team, iteration["pv"])
+        elapsed = iteration["time"]
+        nps = iteration["nodes"] / elapsed if elapsed else 0.0
+        self.send(f'info depth={iteration["depth"]} score={iteration["score"]:g} nodes={iteration["nodes"]} '
+                  f'nps={nps:.0f} time={elapsed:.3f} pv="{pv}"')
+
+    def command_stop(self, arguments: list[str]) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        if self._search is not None:
+            stop_search(self.strategy, self._search)
+        self.wait()
+
+    def wait(self) -> None:
+        if self._search is not None:
+            self._search.join()
+            self._search = None
+
+
+def run(input_stream: TextIO = sys.stdin, output: TextIO = sys.stdout) -> None:
+    engine = Engine(output)
+    # les print du moteur (évaluation, init du Board) ne doivent pas se mêler au protocole
+    sys.stdout = sys.stderr
+    try:
+        for line in input_stream:
+            if not engine.handle(line):
+                break
+        engine.stop()
+    finally:
+        sys.stdout = output
+
+
+def main():
+    run()
+
+
+if __name__ == "__main__":
+    main()
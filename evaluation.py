@@ -0,0 +1,128 @@
+"""Évaluation vectorisée : les positions d'un lot sont empilées en tableaux NumPy et toutes leurs
+caractéristiques sont calculées d'un coup, sans boucle Python par position.
+
+Une position devient quatre plans int8 de 0/1 (pions blancs, dames blanches, pions noirs, dames
+noires, dans l'ordre des codes de pièces), lus directement dans sa forme binaire (Position.encode).
+Les caractéristiques sont comptées pour chaque camp ; l'évaluation est la différence blancs moins
+noirs, pondérée par des poids lus dans un fichier JSON (réglés par tune.py).
+"""
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from bitboard import FORWARD, WHITE, get_geometry
+
+if TYPE_CHECKING:
+    from bitboard import Position
+
+FEATURES = ("material", "kings", "advancement", "back_rank", "centre", "mobility")
+MATERIAL, KINGS, ADVANCEMENT, BACK_RANK, CENTRE, MOBILITY = range(len(FEATURES))
+# en centièmes de pion ; une dame compte pour le matériel et pour `kings`
+DEFAULT_WEIGHTS = np.array([100, 200, 2, 5, 3, 1], dtype=np.int64)
+
+
+class _Tables:
+    """Masques par case de la géométrie, indexés par camp quand ils en dépendent."""
+
+    def __init__(self, size: int):
+        geometry = get_geometry(size)
+        self.squares = geometry.squares
+        columns = np.array([x for x, _ in geometry.coordinates])
+        rows = np.array([y for _, y in geometry.coordinates])
+        # les pions blancs montent vers la ligne 0
+        self.advancement = np.stack([size - 1 - rows, rows]).astype(np.int32)
+        self.back_rank = np.stack([rows == size - 1, rows == 0]).astype(np.int32)
+        self.centre = ((columns >= 2) & (columns <= size - 3) & (rows >= 3) & (rows <= size - 4)).astype(np.int32)
+        # voisine dans chaque direction ; hors du plateau, une case fictive toujours occupée
+        self.neighbours = np.array([[geometry.squares if target is None else target for target in targets]
+                                    for targets in geometry.neighbours]).T
+
+
+@lru_cache(maxsize=None)
+def _get_tables(size: int) -> _Tables:
+    return _Tables(size)
+
+
+def load_weights(path: str) -> np.ndarray:
+    """Poids d'un fichier JSON {caractéristique: poids} ; les poids absents gardent leur valeur par défaut.
+
+    Sans fichier, les poids par défaut.
+    """
+    weights = DEFAULT_WEIGHTS.astype(float)
+    if not os.path.exists(path):
+        return weights
+    with open(path) as file:
+        values = json.load(file)
+    for name, value in values.items():
+        if name not in FEATURES:
+            raise ValueError(f"Unknown feature {name!r} in {path}")
+        weights[FEATURES.index(name)] = value
+    return weights
+
+
+def save_weights(path: str, weights: np.ndarray) -> None:
+    with open(path, "w") as file:
+        json.dump({name: round(float(weight), 2) for name, weight in zip(FEATURES, weights)}, file, indent=2)
+        file.write("\n")
+
+
+def planes(positions: list[Position]) -> np.ndarray:
+    """Plans (n, 4, cases) en int8 des positions."""
+    data = np.frombuffer(b"".join(position.encode(WHITE) for position in positions), dtype=np.uint8)
+    return planes_of_bytes(data.reshape(len(positions), -1), positions[0].get_geometry().squares)
+
+
+def planes_of_bytes(data: np.ndarray, squares: int) -> np.ndarray:
+    """Plans (n, 4, cases) d'un tableau (n, octets) de formes binaires (Position.encode)."""
+    bits = np.unpackbits(data, axis=1, bitorder="little")
+    return bits[:, :4 * squares].reshape(len(data), 4, squares).view(np.int8)
+
+
+def side_features(stacked: np.ndarray) -> np.ndarray:
+    """Caractéristiques de chaque camp : tableau (n, 2, len(FEATURES)).
+
+    La mobilité est une estimation sans génération de coups : pions ayant une case libre devant
+    eux et dames ayant une case libre à côté, comptés par direction, prises ignorées.
+    """
+    count, _, squares = stacked.shape
+    tables = _get_tables(get_size(squares))
+    men = stacked[:, 0::2].astype(np.int32)
+    kings = stacked[:, 1::2].astype(np.int32)
+    pieces = men + kings
+
+    empty = np.zeros((count, squares + 1), dtype=np.int32)
+    empty[:, :squares] = 1 - pieces.sum(axis=1)
+    free = [empty[:, tables.neighbours[direction]] for direction in range(4)]
+
+    result = np.empty((count, 2, len(FEATURES)), dtype=np.int64)
+    result[:, :, MATERIAL] = pieces.sum(axis=2)
+    result[:, :, KINGS] = kings.sum(axis=2)
+    result[:, :, ADVANCEMENT] = (men * tables.advancement).sum(axis=2)
+    result[:, :, BACK_RANK] = (men * tables.back_rank).sum(axis=2)
+    result[:, :, CENTRE] = (pieces * tables.centre).sum(axis=2)
+    all_free = sum(free)
+    for side in range(2):
+        forward_free = sum(free[direction] for direction in FORWARD[side])
+        result[:, side, MOBILITY] = (men[:, side] * forward_free + kings[:, side] * all_free).sum(axis=1)
+    return result
+
+
+def features(stacked: np.ndarray) -> np.ndarray:
+    """Caractéristiques des blancs moins celles des noirs : tableau (n, len(FEATURES))."""
+    per_side = side_features(stacked)
+    return per_side[:, 0] - per_side[:, 1]
+
+
+def evaluate_batch(stacked: np.ndarray, weights: np.ndarray = DEFAULT_WEIGHTS) -> np.ndarray:
+    """Évaluation de chaque position du lot, du point de vue des blancs."""
+    return features(stacked) @ weights
+
+
+def get_size(squares: int) -> int:
+    # cases jouables = taille² / 2
+    return int(round((2 * squares) ** 0.5))
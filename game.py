@@ -1,18 +1,24 @@
-from copy import deepcopy
-
 import pygame as pg
 
 from board import Board
-from case import PlayableCase
+from book import OpeningBook
+from case import Case, PlayableCase
+from clock import GameClock
+from history import GameHistory
 from colors_constants import ARROWS_COLOR
-from config import SCREEN_SIZE, GRID_SIZE, CELL_SIZE, OFFSET, LINES_INDICATOR_WIDTH
+from config import SCREEN_SIZE, GRID_SIZE, CELL_SIZE, OFFSET, LINES_INDICATOR_WIDTH, AI_MAX_DEPTH, AI_GAME_TIME, \
+    AI_INCREMENT, AI_PONDER, BOOK_PATH, TABLEBASE_PATH, WEIGHTS_PATH
+from evaluation import load_weights
 from player import Player, AI
 from strategy import MiniMax
+from tablebase import Tablebase
 from team import Team
+from worker import SearchWorker
 
 
 class Game:
-    def __init__(self, init_board: str = None, player1: str = "Player1", player2: str = "Player 2"):
+    def __init__(self, init_board: str = None, player1: str = "Player1", player2: str = "Player 2",
+                 ponder: bool = AI_PONDER):
         pg.init()
         self._screen = pg.display.set_mode(SCREEN_SIZE)
         self._clock = pg.time.Clock()
@@ -22,14 +28,32 @@ class Game:
         self._size = CELL_SIZE
         self._offset = OFFSET
 
-        self._history = []
-
         self._is_edit_mode = False
 
         self._winner = None
         self._player1 = Player(0, player1, Team.WHITE)
-        self._player2 = AI(1, player2, Team.BLACK, MiniMax(max_depth=7))
+        self._player2 = AI(1, player2, Team.BLACK, MiniMax(max_depth=AI_MAX_DEPTH,
+                                                                clock=GameClock(AI_GAME_TIME, AI_INCREMENT),
+                                                                tablebase=Tablebase(TABLEBASE_PATH),
+                                                                weights=load_weights(WEIGHTS_PATH)),
+                           book=OpeningBook(BOOK_PATH))
         self._current_player = self._player1
+        # journal des coups : annuler et rejouer sans copier le plateau
+        self._history = GameHistory(self._board, self._current_player.get_team())
+        # position au début du mode édition, pour l'inscrire dans l'historique en sortant
+        self._edit_start = None
+
+        # la recherche de l'IA tourne dans un thread, la boucle run continue d'afficher ; l'événement
+        # posté à la fin de la recherche réveille la boucle, qui attend sinon les actions du joueur
+        self._ai_done_event = pg.event.custom_type()
+        self._worker = SearchWorker(on_done=lambda: pg.event.post(pg.event.Event(self._ai_done_event)))
+        self._ponder = ponder
+
+        # affichage : fond statique dessiné une fois, puis seules les cases qui changent sont redessinées
+        self._background = self._draw_background()
+        self._drawn = None
+        self._drawn_arrows = []
+        self._drawn_winner = None
 
     def get_player1(self):
         return self._player1
@@ -37,42 +61,56 @@ class Game:
     def get_player2(self):
         return self._player2
     def save_board_state(self):
-        board = deepcopy(self._board)
-
-        player1 = deepcopy(self._player1)
-        player1.clear_possible_moves(self._board)
-        player1.deselect_case()
-        player2 = deepcopy(self._player2)
-        player2.clear_possible_moves(self._board)
-        player2.deselect_case()
-
-        current_player = True if self._current_player == self._player1 else False
-        winner = None if self._winner is None else True if self._winner == self._player1 else False
-        state = {
-            "board": board,
-            "player1": player1,
-            "player2": player2,
-            "current_player": current_player,
-            "winner": winner,
-        }
-        self._history.append(state)
-        # print("state saved!")
-        # print(self.history)
+        """Point de reprise explicite de l'historique sur la position actuelle."""
+        self._history.checkpoint(self._board, self._current_player.get_team())
+
+    def record_move(self, player: Player):
+        move, promoted, captured_codes = player.get_last_move()
+        self._history.record_move(self._board, player, move, promoted, captured_codes)
+
+    def _clear_selection(self):
+        for player in (self._player1, self._player2):
+            player.deselect_case()
+            player.clear_possible_moves(self._board)
+        self._board.clear_cases_who_can_play()
+
+    def _set_current_team(self, team: Team):
+        self._current_player = self._player1 if team == self._player1.get_team() else self._player2
 
     def undo(self):
-        if len(self._history) <= 1:
+        """Annule jusqu'au tour précédent du joueur (son coup et la réponse de l'IA)."""
+        self._worker.cancel()
+        if not self._history.can_undo():
             print("No more history to undo")
-            print(self._history)
             return
-        print(self._history)
-        self._history.pop()
-        self._board = deepcopy(self._history[-1]["board"])
-        self._player1 = deepcopy(self._history[-1]["player1"])
-        self._player2 = deepcopy(self._history[-1]["player2"])
-        self._current_player = self._player1 if self._history[-1]["current_player"] == True else self._player2
-        self._winner = None if self._history[-1]["winner"] is None else self._player1 if self._history[-1][
-                                                                                             "winner"] == True else self._player2
+        self._clear_selection()
+        self._set_current_team(self._history.undo(self._board))
+        while isinstance(self._current_player, AI) and self._history.can_undo():
+            self._set_current_team(self._history.undo(self._board))
+        if self._winner is not None:
+            # on revient avant la fin de la partie : les points de declare_winner sont repris
+            loser = self._player1 if self._winner is self._player2 else self._player2
+            self._winner.win(False)
+            loser.win(True)
+        self._winner = None
+        self.render()
+        if isinstance(self._current_player, AI):
+            self.start_ai_turn()
+
+    def redo(self):
+        """Rejoue l'historique annulé jusqu'au prochain tour du joueur."""
+        self._worker.cancel()
+        if not self._history.can_redo():
+            print("Nothing to redo")
+            return
+        self._clear_selection()
+        self._set_current_team(self._history.redo(self._board))
+        while isinstance(self._current_player, AI) and self._history.can_redo():
+            self._set_current_team(self._history.redo(self._board))
         self.render()
+        # render a pu déclarer la partie finie : plus de coup à chercher
+        if isinstance(self._current_player, AI) and self._winner is None:
+            self.start_ai_turn()
 
     def get_board(self):
         return self._board
@@ -89,13 +127,15 @@ class Game:
         if not case_who_can_play:
             self.declare_winner(self._player1 if self._current_player == self._player2 else self._player2)
             return
+        self._board.set_cases_who_can_play([case for case, _ in case_who_can_play])
         for case, move in case_who_can_play:
             case.set_can_play(move)
 
-    def handle_events(self):
+    def handle_events(self, events):
         mouse_x, mouse_y = pg.mouse.get_pos()
-        for event in pg.event.get():
+        for event in events:
             if event.type == pg.QUIT:
+                self._worker.cancel()
                 self._running = False
                 return
             if self._is_edit_mode:
@@ -103,11 +143,13 @@ class Game:
                     if event.key == pg.K_TAB:
                         self._is_edit_mode = False
                         print("edit mode: False")
+                        self._history.record_setup(self._board, self._current_player.get_team(), self._edit_start)
                         return
                     if event.key == pg.K_c:
                         print("clear")
-                        for case in self._board.get_cases(lambda c: isinstance(c, PlayableCase)):
-                            case.set_piece(None)
+                        for team in (Team.WHITE, Team.BLACK):
+                            for case in self._board.get_pieces_of_team(team):
+                                case.set_piece(None)
 
                         return
 
@@ -130,23 +172,25 @@ class Game:
 
             if event.type == pg.MOUSEBUTTONDOWN:
                 if self._winner is not None: return
+                if isinstance(self._current_player, AI): return
                 x = mouse_x // (self._size + self._offset)
                 y = mouse_y // (self._size + self._offset)
                 has_played = self._current_player.on_click(self._board, (x, y))
                 print(f"({self._player1}) Clicked on {self._board.get_case((x, y))}")
                 if has_played:
+                    self.record_move(self._current_player)
                     self.switch_current_player()
                     self.render()
                     # tester
                     if isinstance(self._current_player, AI) and self._winner is None:
-                        self._current_player.play(self)
-                        self.switch_current_player()
-                        self.save_board_state()
+                        self.start_ai_turn()
                 return
 
             if event.type == pg.KEYDOWN:
                 if event.key == pg.K_TAB:
+                    self._worker.cancel()
                     self._is_edit_mode = True
+                    self._edit_start = self._board.encode(self._current_player.get_team())
                     print(f"edit mode: {self._is_edit_mode}")
                     self._board.clear_cases_who_can_play()
                 if event.key == pg.K_a:
@@ -156,45 +200,141 @@ class Game:
                 elif event.key == pg.K_z:
                     print("Undoing...")
                     self.undo()
+                elif event.key == pg.K_r:
+                    print("Redoing...")
+                    self.redo()
                 elif event.key == pg.K_s:
                     print("Saving...")
                     self.save_board_state()
                 return
 
+    def _draw_background(self) -> pg.Surface:
+        """Couche statique : espaces entre les cases et toutes les cases vides, dans leur couleur de départ."""
+        background = pg.Surface(SCREEN_SIZE)
+        background.fill("black")
+        for row in self._board.get_board():
+            for case in row:
+                Case.draw(case, background, self._size, self._offset)
+        return background
+
+    def _cell_rect(self, start, end=None) -> pg.Rect:
+        """Rectangle des cases entre `start` et `end` (coins opposés)."""
+        end = end or start
+        step = self._size + self._offset
+        left, top = min(start[0], end[0]), min(start[1], end[1])
+        right, bottom = max(start[0], end[0]), max(start[1], end[1])
+        return pg.Rect(left * step, top * step, (right - left) * step + self._size, (bottom - top) * step + self._size)
+
     def render(self):
-        self._screen.fill("black")
-        self.draw()
-        pg.display.flip()
+        """Redessine les cases dont l'état a changé depuis l'image précédente et n'envoie que ces zones à l'écran."""
+        self.highlight_moves()
+        self.highlight_cases_who_can_play()
+        arrows = self.get_arrows()
+
+        full = self._drawn is None or self._winner is not self._drawn_winner
+        if full:
+            self._screen.blit(self._background, (0, 0))
+            self._drawn = {}
+        # sous une flèche qui apparaît ou disparaît, tout est repeint, cases injouables comprises
+        repainted = []
+        if arrows != self._drawn_arrows:
+            repainted = [self._cell_rect(start, end) for start, end in self._drawn_arrows + arrows]
+            for rect in repainted:
+                self._screen.blit(self._background, rect, rect)
+        dirty = list(repainted)
+        for case in self._board.get_playable_cases():
+            coordinates = case.get_coordinates()
+            state = case.get_state()
+            rect = self._cell_rect(coordinates)
+            if self._drawn.get(coordinates) != state or rect.collidelist(repainted) != -1:
+                case.draw(self._screen, self._size, self._offset)
+                self._drawn[coordinates] = state
+                dirty.append(rect)
+
+        if dirty or full:
+            for start, end in arrows:
+                self.draw_arrows(start, end)
+        self._drawn_arrows = arrows
+        if full and self._winner is not None:
+            self.end()
+        self._drawn_winner = self._winner
+
+        if full:
+            pg.display.flip()
+        elif dirty:
+            pg.display.update(dirty)
 
     def run(self):
-        self.save_board_state()
+        # rien ne dépend de la position de la souris entre deux clics
+        pg.event.set_blocked(pg.MOUSEMOTION)
+        self.render()
         while self._running:
-            if self._winner:
-                self.end()
-            self.handle_events()
+            # attend une action du joueur ou la fin de la recherche de l'IA, sans occuper le processeur
+            self.handle_events([pg.event.wait()] + pg.event.get())
+            self.poll_ai()
             self.render()
             self._clock.tick(60)
+        self._worker.cancel()
+        for player in (self._player1, self._player2):
+            if isinstance(player, AI):
+                player.strategy.close()
         pg.quit()
 
-    def draw(self):
-        for row in self._board.get_board():
-            for case in row:
-                case.draw(self._screen, self._size, self._offset)
+    def start_ai_turn(self):
+        ai = self._current_player
+        book_move = ai.get_book_move(self._board)
+        if book_move is not None:
+            # coup de la bibliothèque : pas de recherche
+            self._worker.cancel()
+            self.play_ai_move(ai, book_move)
+            return
+        if self._worker.is_ponder_hit(self._board):
+            print("Ponder hit")
+            self._worker.ponderhit()
+            return
+        ai.strategy.update(ai.get_state(self))
+        self._worker.start(ai, self._player1, self._board)
 
-        self.highlight_moves()
-        self.highlight_cases_who_can_play()
+    def poll_ai(self):
+        """Joue le coup de l'IA dès que le thread de recherche l'a trouvé."""
+        move = self._worker.poll()
+        if move is None:
+            return
+        self.play_ai_move(self._current_player, move)
+
+    def play_ai_move(self, ai: AI, move):
+        ai.play_chosen_move(self, move)
+        self.record_move(ai)
+        self.switch_current_player()
+        if self._ponder:
+            self.start_pondering(ai)
+
+    def start_pondering(self, ai: AI):
+        if not isinstance(ai.strategy, MiniMax) or self._winner is not None:
+            return
+        predicted = ai.strategy.get_hash_move(self._board, self._player1.get_team())
+        for _, moves in self._board.find_cases_who_can_play(self._player1):
+            for move in moves:
+                if (move["move_path"][0], move["move_path"][-1]) == predicted:
+                    self._worker.start(ai, self._player1, self._board, ponder_move=move)
+                    return
 
     def highlight_moves(self):
         """Met en évidence les cases accessibles."""
-
         for path in self._current_player.get_possible_moves():
-            last_case = self._board.get_playable_case(path[-1])
-            last_case.set_can_land(True)
-
-            case = self._board.get_selected_case()
-            self.draw_arrows(case.get_coordinates(), path[0])
-            for i in range(len(path) - 1):
-                self.draw_arrows(path[i], path[i + 1])
+            self._board.get_playable_case(path[-1]).set_can_land(True)
+
+    def get_arrows(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """Segments des chemins possibles de la pièce sélectionnée."""
+        paths = self._current_player.get_possible_moves()
+        if not paths:
+            return []
+        start = self._current_player.get_selected_case().get_coordinates()
+        arrows = []
+        for path in paths:
+            arrows.append((start, path[0]))
+            arrows += zip(path, path[1:])
+        return arrows
 
     def draw_arrows(self, start_coord, end_coord):
         start_pos = add(mult(start_coord, (self._size + self._offset)), int(self._size // 2))
@@ -205,7 +345,6 @@ class Game:
         self._winner = param
         self._winner.win(True)
         self._current_player.win(False)
-        self.end()
 
     def end(self):
         game_font = pg.font.SysFont("Arial", 50)
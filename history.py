@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from bitboard import SIDES, TEAMS, Position
+from config import HISTORY_CHECKPOINT_INTERVAL
+
+if TYPE_CHECKING:
+    from board import Board
+    from player import Player
+    from team import Team
+
+
+class Ply(NamedTuple):
+    """Un demi-coup : cases de départ et d'arrivée, cases et codes des pièces prises, promotion."""
+    side: int
+    start: int
+    end: int
+    captured: bytes
+    captured_codes: bytes
+    promoted: bool
+
+
+class Setup(NamedTuple):
+    """Position modifiée à la main (mode édition) : formes binaires avant et après."""
+    before: bytes
+    after: bytes
+
+
+class GameHistory:
+    """Journal de la partie, quelques octets par demi-coup au lieu d'une copie du plateau.
+
+    Annuler et rejouer appliquent le journal à l'envers ou à l'endroit sur le bitboard, en temps
+    constant : les pièces prises sont rendues d'après le journal, pas d'après les joueurs. Une
+    position complète (Position.encode) est gardée tous les `checkpoint_interval` demi-coups pour
+    retrouver n'importe quelle position de la partie sans tout rejouer depuis le début.
+    """
+
+    def __init__(self, board: Board, team: Team, checkpoint_interval: int = HISTORY_CHECKPOINT_INTERVAL):
+        self._entries: list[Ply | Setup] = []
+        self._cursor = 0
+        self._checkpoint_interval = checkpoint_interval
+        self._size = board.get_position().get_geometry().size
+        self._checkpoints = {0: board.encode(team)}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_cursor(self) -> int:
+        """Nombre d'entrées appliquées ; les suivantes peuvent être rejouées."""
+        return self._cursor
+
+    def can_undo(self) -> bool:
+        return self._cursor > 0
+
+    def can_redo(self) -> bool:
+        return self._cursor < len(self._entries)
+
+    def _append(self, entry: Ply | Setup, board: Board, team: Team) -> None:
+        # un nouveau coup après des annulations efface la suite
+        del self._entries[self._cursor:]
+        for ply in [ply for ply in self._checkpoints if ply > self._cursor]:
+            del self._checkpoints[ply]
+        self._entries.append(entry)
+        self._cursor += 1
+        if isinstance(entry, Setup) or self._cursor % self._checkpoint_interval == 0:
+            self._checkpoints[self._cursor] = board.encode(team)
+
+    def record_move(self, board: Board, player: Player, move: dict, promoted: bool, captured_codes) -> None:
+        """À appeler juste après le coup de `player` : son adversaire a alors le trait."""
+        square_of = board.get_position().get_geometry().square_of
+        side = SIDES[player.get_team()]
+        entry = Ply(side, square_of(move["move_path"][0]), square_of(move["move_path"][-1]),
+                    bytes(square_of(coordinates) for coordinates in move["eaten_pieces"]),
+                    bytes(captured_codes), promoted)
+        self._append(entry, board, TEAMS[1 - side])
+
+    def record_setup(self, board: Board, team: Team, before: bytes) -> None:
+        """Position modifiée à la main depuis `before`, `team` au trait."""
+        after = board.encode(team)
+        if after != before:
+            self._append(Setup(before, after), board, team)
+
+    def checkpoint(self, board: Board, team: Team) -> None:
+        self._checkpoints[self._cursor] = board.encode(team)
+
+    def undo(self, board: Board) -> Team | None:
+        """Annule la dernière entrée et renvoie le camp qui a alors le trait, ou None."""
+        if not self.can_undo():
+            return None
+        self._cursor -= 1
+        entry = self._entries[self._cursor]
+        if isinstance(entry, Setup):
+            return board.load(entry.before)
+        unplay(board.get_position(), entry)
+        board.clear_cases_who_can_play()
+        return TEAMS[entry.side]
+
+    def redo(self, board: Board) -> Team | None:
+        """Rejoue l'entrée suivante et renvoie le camp qui a alors le trait, ou None."""
+        if not self.can_redo():
+            return None
+        entry = self._entries[self._cursor]
+        self._cursor += 1
+        if isinstance(entry, Setup):
+            return board.load(entry.after)
+        replay(board.get_position(), entry)
+        board.clear_cases_who_can_play()
+        return TEAMS[1 - entry.side]
+
+    def position_at(self, index: int) -> tuple[Position, int]:
+        """(position, camp au trait) après `index` entrées, depuis le point de reprise le plus proche.
+
+        Avant un point de reprise, les entrées sont rejouées ; après, elles sont annulées d'après les
+        codes des pièces prises.
+        """
+        before = max(ply for ply in self._checkpoints if ply <= index)
+        after = min((ply for ply in self._checkpoints if ply >= index), default=None)
+        if after is not None and after - index < index - before:
+            position, side = Position.decode(self._checkpoints[after], self._size)
+            for entry in reversed(self._entries[index:after]):
+                if isinstance(entry, Setup):
+                    position, side = Position.decode(entry.before, self._size)
+                    continue
+                unplay(position, entry)
+                side = entry.side
+            return position, side
+
+        position, side = Position.decode(self._checkpoints[before], self._size)
+        for entry in self._entries[before:index]:
+            if isinstance(entry, Setup):
+                position, side = Position.decode(entry.after, self._size)
+                continue
+            replay(position, entry)
+            side = 1 - entry.side
+        return position, side
+
+
+def replay(position: Position, ply: Ply) -> None:
+    """Rejoue `ply` sur le bitboard : la pièce avance, promue si besoin, les pièces prises sont retirées."""
+    code = position.get_piece(ply.start)
+    position.set_piece(ply.start, None)
+    for square in ply.captured:
+        position.set_piece(square, None)
+    position.set_piece(ply.end, code + 1 if ply.promoted else code)
+
+
+def unplay(position: Position, ply: Ply) -> None:
+    """Annule `ply` sur le bitboard : la pièce revient, démue si besoin, les pièces prises sont rendues."""
+    code = position.get_piece(ply.end)
+    position.set_piece(ply.end, None)
+    position.set_piece(ply.start, code - 1 if ply.promoted else code)
+    for square, captured_code in zip(ply.captured, ply.captured_codes):
+        position.set_piece(square, captured_code)
@@ -1,4 +1,11 @@
-from game import Game
+import sys
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    if "--engine" in sys.argv[1:]:
+        # moteur sans fenêtre, piloté sur l'entrée standard (voir engine.py)
+        from engine import main
+        main()
+    else:
+        from game import Game
+        game = Game()
+        game.run()
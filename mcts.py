@@ -0,0 +1,303 @@
+"""Recherche arborescente Monte-Carlo (UCT) : une autre famille de moteur que l'alpha-beta.
+
+Chaque partie simulée (playout) descend dans l'arbre en choisissant l'enfant de meilleure borne
+UCT, développe un coup pas encore essayé, puis finit la partie au hasard sur le bitboard. Le
+résultat remonte jusqu'à la racine ; le coup joué est le plus visité.
+
+L'arbre est gardé d'un coup à l'autre : la recherche suivante repart du sous-arbre de la position
+atteinte s'il l'a déjà vue. Avec `workers` > 1, la racine est parallélisée : d'autres processus
+construisent chacun leur propre arbre depuis la même position et leurs statistiques de racine
+sont ajoutées à celles de l'arbre principal.
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
+from time import perf_counter, time
+from typing import TYPE_CHECKING
+
+from bitboard import SIDES, Position
+from search_stats import SearchStats
+from strategy import Strategy
+
+if TYPE_CHECKING:
+    from board import Board
+    from clock import GameClock
+    from strategy import State
+
+# constante d'exploration d'UCT (√2 pour des résultats entre 0 et 1)
+EXPLORATION = 1.4
+# demi-coups au hasard avant de départager un playout au matériel
+ROLLOUT_PLIES = 80
+# une dame vaut trois pions pour départager un playout trop long
+KING_VALUE = 3
+DEFAULT_PLAYOUTS = 2000
+
+
+class Node:
+    """Position de l'arbre ; `wins` compte les victoires du camp qui vient de jouer `move`."""
+
+    __slots__ = ("position", "side", "move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, position: Position, side: int, move=None, parent: Node | None = None):
+        self.position = position
+        self.side = side
+        self.move = move
+        self.parent = parent
+        self.children: list[Node] = []
+        # coups pas encore développés, générés à la première visite
+        self.untried: list | None = None
+        self.visits = 0
+        self.wins = 0.0
+
+    def expand(self, rng: random.Random) -> Node:
+        move = self.untried.pop(rng.randrange(len(self.untried)))
+        child = Node(self.position.play(move), 1 - self.side, move, self)
+        self.children.append(child)
+        return child
+
+    def select(self, exploration: float) -> Node:
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def get_child(self, position: Position, side: int) -> Node | None:
+        key = position.hash_key(side)
+        return next((child for child in self.children if child.position.hash_key(child.side) == key), None)
+
+
+def rollout(position: Position, side: int, rng: random.Random, plies: int = ROLLOUT_PLIES) -> int | None:
+    """Camp gagnant d'une fin de partie au hasard, None pour une nulle.
+
+    Au-delà de `plies` demi-coups, le camp qui a le plus de matériel l'emporte.
+    """
+    for _ in range(plies):
+        moves = position.legal_moves(side)
+        if not moves:
+            return 1 - side
+        position = position.play(moves[rng.randrange(len(moves))])
+        side = 1 - side
+    balance = [position.count(camp) + (KING_VALUE - 1) * position.get_kings(camp).bit_count() for camp in (0, 1)]
+    if balance[0] == balance[1]:
+        return None
+    return 0 if balance[0] > balance[1] else 1
+
+
+def run_playouts(root: Node, rng: random.Random, deadline: float | None = None, playouts: int | None = None,
+                 exploration: float = EXPLORATION, stop_event: Event | None = None) -> tuple[int, int]:
+    """Playouts depuis `root` jusqu'à la première limite atteinte ; renvoie (playouts, profondeur max)."""
+    count = max_depth = 0
+    while (playouts is None or count < playouts) and (deadline is None or perf_counter() < deadline) \
+            and not (stop_event is not None and stop_event.is_set()):
+        node, depth = root, 0
+        while node.untried == [] and node.children:
+            node = node.select(exploration)
+            depth += 1
+        if node.untried is None:
+            node.untried = node.position.legal_moves(node.side)
+        if node.untried:
+            node = node.expand(rng)
+            depth += 1
+            winner = rollout(node.position, node.side, rng)
+        else:
+            # plus de coup : le camp au trait a perdu
+            winner = 1 - node.side
+
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner != node.side:
+                node.wins += 1
+            node = node.parent
+        count += 1
+        max_depth = max(max_depth, depth)
+    return count, max_depth
+
+
+# drapeau d'arrêt partagé avec le processus principal, posé par l'initialiseur du pool
+_stop_event = None
+
+
+def _init_worker(stop_event) -> None:
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_root(task) -> list[tuple[bytes, int, float]]:
+    """Arbre indépendant d'un processus : (forme binaire, visites, victoires) de chaque enfant de la racine.
+
+    La limite de temps est une heure absolue (time()) : le démarrage du processus est décompté.
+    """
+    data, size, end_time, playouts, exploration, seed = task
+    position, side = Position.decode(data, size)
+    root = Node(position, side)
+    deadline = None if end_time is None else perf_counter() + end_time - time()
+    run_playouts(root, random.Random(seed), deadline, playouts, exploration, _stop_event)
+    return [(child.position.encode(child.side), child.visits, child.wins) for child in root.children]
+
+
+class MCTS(Strategy):
+    """Monte-Carlo UCT, limité par `time_limit` (secondes par coup), `clock` (prioritaire) et
+    `playouts` ; sans aucune limite, DEFAULT_PLAYOUTS playouts. Les playouts se partagent entre
+    les `workers` processus, le processus principal compris.
+
+    Chaque recherche remplit `stats` : `playouts` et get_pps() (playouts par seconde, tous
+    processus compris), `depth` (profondeur maximale de l'arbre principal), `score` (taux de
+    victoire du coup choisi).
+    """
+
+    def __init__(self, time_limit: float | None = None, playouts: int | None = None,
+                 clock: GameClock | None = None, workers: int = 1, exploration: float = EXPLORATION,
+                 reuse_tree: bool = True, seed: int | None = None, stop_event: Event | None = None):
+        super().__init__()
+        self.time_limit = time_limit
+        self.playouts = playouts if playouts is not None or time_limit is not None or clock is not None \
+            else DEFAULT_PLAYOUTS
+        self.clock = clock
+        self.workers = workers
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.stop_event = stop_event if stop_event is not None else Event()
+        self.stats = SearchStats()
+        self._rng = random.Random(seed)
+        self._root: Node | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        # drapeau d'arrêt des processus du pool, un threading.Event ne les atteint pas
+        self._workers_stop = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self._workers_stop is not None:
+            self._workers_stop.set()
+
+    def close(self) -> None:
+        """Arrête les processus des playouts parallèles ; ils sont relancés au besoin."""
+        if self._pool is not None:
+            self._workers_stop.set()
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._workers_stop = None
+
+    def choose_move(self, state: State):
+        self.stats = stats = SearchStats()
+        # un stop() arrivé après la recherche précédente ne doit pas interrompre celle-ci
+        self.stop_event.clear()
+        start = perf_counter()
+        board: Board = state["board"]
+        team = state["current_player"].get_team()
+        root = self._get_root(board, SIDES[team])
+        if root.untried is None:
+            root.untried = self._root_moves(board, state)
+
+        budget = self.clock.allocate() if self.clock is not None else self.time_limit
+        deadline = None if budget is None else start + budget
+        playouts = self.playouts
+        futures = []
+        if self.workers > 1 and (root.untried or root.children):
+            if self._pool is None:
+                # spawn : la recherche tourne souvent dans un thread (jeu, moteur) ou dans un processus
+                # d'un autre pool, d'où un fork peut rester bloqué sur un verrou pris par un autre thread
+                context = multiprocessing.get_context("spawn")
+                self._workers_stop = context.Event()
+                self._pool = ProcessPoolExecutor(self.workers - 1, mp_context=context, initializer=_init_worker,
+                                                 initargs=(self._workers_stop,))
+            self._workers_stop.clear()
+            share = None if playouts is None else -(-playouts // self.workers)
+            data, size = root.position.encode(root.side), root.position.get_geometry().size
+            # heure de fin commune à tous les processus, le temps de les lancer compris
+            end_time = None if deadline is None else time() + deadline - perf_counter()
+            futures = [self._pool.submit(_search_root, (data, size, end_time, share, self.exploration,
+                                                        self._rng.getrandbits(32)))
+                       for _ in range(self.workers - 1)]
+            playouts = share
+        stats.playouts, stats.depth = run_playouts(root, self._rng, deadline, playouts, self.exploration,
+                                                   self.stop_event)
+        if self.stop_event.is_set() and futures:
+            # arrêt : les processus lancés rendent ce qu'ils ont, ceux pas encore partis sont annulés
+            self._workers_stop.set()
+            for future in futures:
+                future.cancel()
+        for future in futures:
+            if not future.cancelled():
+                stats.playouts += self._merge(root, future.result())
+
+        elapsed = perf_counter() - start
+        stats.nodes = stats.playouts
+        stats.total_time = elapsed
+        if self.clock is not None:
+            self.clock.consume(elapsed)
+        if not root.children:
+            return self._first_move(state)
+
+        best = max(root.children, key=lambda child: child.visits)
+        coordinates = root.position.get_geometry().coordinates
+        stats.move = coordinates[best.move[0][0]], coordinates[best.move[0][-1]]
+        stats.score = round(best.wins / best.visits, 4)
+        self.principal_variation = self._best_line(root)
+        self._root = best if self.reuse_tree else None
+        print(f"MCTS: {stats.score:.1%} ({stats.playouts} playouts, {stats.get_pps():.0f}/s, depth {stats.depth})"
+              f" pv {self.format_pv(board, team)}")
+        return stats.move
+
+    def _get_root(self, board: Board, side: int) -> Node:
+        """Noeud de la position à jouer dans l'arbre gardé (le coup adverse sous notre dernier coup), sinon neuf."""
+        position = board.get_position()
+        key = position.hash_key(side)
+        root = self._root
+        if root is not None:
+            if root.position.hash_key(root.side) != key:
+                root = root.get_child(position, side)
+            if root is not None:
+                root.parent = None
+                return root
+        return Node(position.copy(), side)
+
+    @staticmethod
+    def _root_moves(board: Board, state: State) -> list:
+        """Coups de la racine en forme bitboard, tirés de find_cases_who_can_play."""
+        square_of = board.get_position().get_geometry().square_of
+        return [(tuple(square_of(coordinates) for coordinates in move["move_path"]),
+                 tuple(square_of(coordinates) for coordinates in move["eaten_pieces"]))
+                for _, moves in board.find_cases_who_can_play(state["current_player"]) for move in moves]
+
+    def _merge(self, root: Node, children: list[tuple[bytes, int, float]]) -> int:
+        """Ajoute les statistiques de racine d'un autre processus ; renvoie ses playouts."""
+        size = root.position.get_geometry().size
+        total = 0
+        for data, visits, wins in children:
+            position, side = Position.decode(data, size)
+            child = root.get_child(position, side)
+            if child is None:
+                move = next((move for move in root.untried
+                             if root.position.play(move).get_hash() == position.get_hash()), None)
+                if move is None:
+                    # coup inconnu de la racine (rafle en double écartée par find_cases_who_can_play) : ignoré
+                    continue
+                root.untried.remove(move)
+                child = Node(position, side, move, root)
+                root.children.append(child)
+            child.visits += visits
+            child.wins += wins
+            root.visits += visits
+            root.wins += visits - wins
+            total += visits
+        return total
+
+    def _best_line(self, root: Node) -> list:
+        coordinates = root.position.get_geometry().coordinates
+        line = []
+        node = root
+        while node.children:
+            node = max(node.children, key=lambda child: child.visits)
+            line.append((coordinates[node.move[0][0]], coordinates[node.move[0][-1]]))
+        return line
+
+    def _first_move(self, state: State):
+        for _, moves in state["board"].find_cases_who_can_play(state["current_player"]):
+            for move in moves:
+                return move["move_path"][0], move["move_path"][-1]
+        return None
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from config import LEGAL_MOVES_CACHE_SIZE
+
+
+class LegalMovesCache:
+    """LRU des coups légaux, clé = hash de Zobrist de la position avec le camp au trait.
+
+    Jouer un coup change le hash, donc la clé : une entrée ne sert que pour sa position exacte
+    et reste juste quand la recherche y revient après avoir annulé le coup.
+    """
+
+    def __init__(self, max_size: int = LEGAL_MOVES_CACHE_SIZE):
+        self._max_size = max_size
+        self._entries: OrderedDict[int, list] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __deepcopy__(self, memo) -> LegalMovesCache:
+        # données dérivées de la position : une copie repart d'un cache vide
+        return LegalMovesCache(self._max_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int) -> list | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: int, moves: list) -> None:
+        self._entries[key] = moves
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
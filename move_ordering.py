@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from bitboard import SIDES, WHITE
+
+if TYPE_CHECKING:
+    from board import Board
+    from team import Team
+
+Move = dict
+MoveKey = tuple[tuple[int, int], tuple[int, int]]
+
+# Classes de priorité, de la plus forte à la plus faible
+HASH_MOVE, CAPTURE, PROMOTION, KILLER, QUIET = 4, 3, 2, 1, 0
+KILLERS_PER_PLY = 2
+
+
+def move_key(move: Move) -> MoveKey:
+    return move["move_path"][0], move["move_path"][-1]
+
+
+class MoveOrderer:
+    """Coup de la table, prises (les plus longues d'abord), promotions, killers, puis historique.
+
+    Compte les coupures beta, et celles sur le premier coup essayé.
+    """
+
+    def __init__(self):
+        self._killers: list[list[MoveKey | None]] = []
+        self._history: tuple[dict[MoveKey, int], dict[MoveKey, int]] = ({}, {})
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._cutoff_index_sum = 0
+
+    def new_search(self) -> None:
+        self._killers.clear()
+        # l'historique vieillit plutôt que d'être oublié d'un coup à l'autre
+        for history in self._history:
+            for key in list(history):
+                history[key] //= 2
+                if not history[key]:
+                    del history[key]
+        self.reset_stats()
+
+    def get_killers(self, ply: int) -> list[MoveKey | None]:
+        while len(self._killers) <= ply:
+            self._killers.append([None] * KILLERS_PER_PLY)
+        return self._killers[ply]
+
+    def order(self, board: Board, team: Team, moves: list[Move], hash_move: MoveKey | None = None,
+              ply: int = 0) -> list[Move]:
+        side = SIDES[team]
+        killers = self.get_killers(ply)
+        history = self._history[side]
+        position = board.get_position()
+        square_of = position.get_geometry().square_of
+        men = position.get_men(side)
+        promotion_row = 0 if side == WHITE else position.get_geometry().size - 1
+
+        def priority(move):
+            key = move_key(move)
+            if key == hash_move:
+                return HASH_MOVE, 0
+            if move["eaten_pieces"]:
+                return CAPTURE, len(move["eaten_pieces"])
+            if key[1][1] == promotion_row and (men >> square_of(key[0])) & 1:
+                return PROMOTION, 0
+            if key in killers:
+                return KILLER, KILLERS_PER_PLY - killers.index(key)
+            return QUIET, history.get(key, 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, team: Team, move: Move, index: int, depth: int, ply: int) -> None:
+        """`index` est le rang du coup dans l'ordre proposé (0 pour le premier)."""
+        self.cutoffs += 1
+        self._cutoff_index_sum += index
+        if index == 0:
+            self.first_move_cutoffs += 1
+        self.record_refutation(team, move, depth, ply)
+
+    def record_refutation(self, team: Team, move: Move, depth: int, ply: int) -> None:
+        """Killers et historique seuls, pour une coupure trouvée sans ordre de coups (évaluation par lot)."""
+        # les prises sont déjà classées en tête, killers et historique ne servent qu'aux coups calmes
+        if move["eaten_pieces"]:
+            return
+        key = move_key(move)
+        killers = self.get_killers(ply)
+        if killers[0] != key:
+            killers[1:] = killers[:-1]
+            killers[0] = key
+        history = self._history[SIDES[team]]
+        history[key] = history.get(key, 0) + depth * depth
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "average_cutoff_index": self._cutoff_index_sum / self.cutoffs if self.cutoffs else 0.0,
+        }
@@ -0,0 +1,94 @@
+"""perft : nombre de positions atteintes en N demi-coups, pour mesurer la génération de coups et vérifier les règles.
+
+    python perft.py --depth 6
+    python perft.py --init 3.b4.b3.2b.b5.w5.w2.w5.2w3.w2.w3.B. --side b --depth 5 --divide
+    python perft.py --depth 8 --hashed --workers 8
+
+`--divide` détaille le compte par coup de la racine (cases numérotées de 1 à 50, notation officielle),
+`--hashed` garde le compte des sous-arbres déjà vus, `--workers` répartit les coups de la racine sur
+plusieurs processus. Les comptes de la position de départ sont vérifiés quand ils sont connus.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from bitboard import START_POSITION, notation
+from board import Board
+from config import GRID_SIZE
+from player import Player
+from team import Team, other_team
+
+# comptes de référence depuis la position de départ, blancs au trait
+START_PERFT = {1: 9, 2: 81, 3: 658, 4: 4265, 5: 27117, 6: 167140, 7: 1049442}
+
+
+def move_notation(board: Board, move: dict) -> str:
+    square_of = board.get_position().get_geometry().square_of
+    return notation((tuple(square_of(coordinates) for coordinates in move["move_path"]), move["eaten_pieces"]))
+
+
+def _perft_task(task) -> int:
+    init_board, team, depth, hashed = task
+    board = Board(GRID_SIZE, init_board)
+    return board.perft(Player(0, "", team), Player(1, "", other_team(team)), depth, {} if hashed else None)
+
+
+def divide(init_board: str, team: Team, depth: int, hashed: bool = False, workers: int = 1) -> list[tuple[str, int]]:
+    """perft par coup de la racine, les sous-arbres répartis sur `workers` processus."""
+    board = Board(GRID_SIZE, init_board)
+    player, enemy = Player(0, "", team), Player(1, "", other_team(team))
+    if workers <= 1:
+        return [(move_notation(board, move), nodes)
+                for move, nodes in board.divide(player, enemy, depth, {} if hashed else None)]
+
+    notations, tasks = [], []
+    for _, moves in board.find_cases_who_can_play(player):
+        for move in moves:
+            notations.append(move_notation(board, move))
+            promoted = player.play_move(board, move)
+            tasks.append((str(board), other_team(team), depth - 1, hashed))
+            player.undo_move(board, move, promoted)
+    with ProcessPoolExecutor(workers) as pool:
+        return list(zip(notations, pool.map(_perft_task, tasks)))
+
+
+def perft(init_board: str, team: Team, depth: int, hashed: bool = False, workers: int = 1) -> int:
+    if workers <= 1 or depth <= 1:
+        return _perft_task((init_board, team, depth, hashed))
+    return sum(nodes for _, nodes in divide(init_board, team, depth, hashed, workers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count leaf nodes of the move tree.")
+    parser.add_argument("--init", default=START_POSITION, help="Board init string")
+    parser.add_argument("--side", choices=("w", "b"), default="w", help="side to move")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--divide", action="store_true", help="break the count down per root move")
+    parser.add_argument("--hashed", action="store_true", help="cache subtree counts")
+    parser.add_argument("--workers", type=int, default=1, help="split root moves over processes (0: all cores)")
+    args = parser.parse_args()
+
+    team = Team.BLACK if args.side == "b" else Team.WHITE
+    workers = args.workers or os.cpu_count()
+    start = perf_counter()
+    if args.divide:
+        results = divide(args.init, team, args.depth, args.hashed, workers)
+        for notation, nodes in results:
+            print(f"{notation:12} {nodes}")
+        nodes = sum(nodes for _, nodes in results)
+        print(f"moves {len(results)}")
+    else:
+        nodes = perft(args.init, team, args.depth, args.hashed, workers)
+    elapsed = perf_counter() - start
+    print(f"perft({args.depth}) = {nodes}  {elapsed:.2f}s  {nodes / elapsed if elapsed else 0:.0f} leaves/s")
+
+    expected = START_PERFT.get(args.depth) if args.init == START_POSITION and team is Team.WHITE else None
+    if expected is not None and nodes != expected:
+        raise SystemExit(f"perft({args.depth}) = {nodes}, expected {expected}")
+
+
+if __name__ == "__main__":
+    main()
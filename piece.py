@@ -2,17 +2,20 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import pygame as pg
-
-from case import PlayableCase
+from bitboard import SIDES, TEAMS
 from colors_constants import *
-from config import GRID_SIZE
 from team import Team
 
 if TYPE_CHECKING:
+    import pygame as pg
+
     from board import Board
 
 
+# images des pièces par (code, taille), rendues à la première utilisation
+SPRITES: dict[tuple[int, int], pg.Surface] = {}
+
+
 class Piece:
     def __init__(self, team: Team):
         self._team = team
@@ -28,83 +31,38 @@ class Piece:
     def get_team(self):
         return self._team
 
-    def get_valid_paths(self, board: Board, current_position: tuple[int, int]) -> list[list[tuple[int, int]]]:
-        # result += self.get_can_eat(game, current_position)
+    def get_code(self) -> int:
+        return SIDES[self._team] * 2
+
+    def get_valid_paths(self, board: Board, current_position: tuple[int, int]) -> list[dict[str, list[tuple[int, int]]]]:
         result = board.compute_eating_moves(board.get_case(current_position))
         if result:
             return result
 
-        result += self.get_can_move(board, current_position)
-
-        return result
-
-    def get_can_move(self, board: Board, current_position: tuple[int, int]):
-        result = []
-        if self._team is Team.WHITE:
-            result += self.get_valid_moves_for_diagonal(board, current_position, (-1, -1))
-            result += self.get_valid_moves_for_diagonal(board, current_position, (1, -1))
-        else:
-            result += self.get_valid_moves_for_diagonal(board, current_position, (-1, 1))
-            result += self.get_valid_moves_for_diagonal(board, current_position, (1, 1))
-        return result
-
-    def get_can_eat(self, board: Board, current_position: tuple[int, int], eaten_pieces, ignore=None) -> list[
-        list[tuple[int, int]]]:
-        result = []
-        diagonals = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
-        if ignore is not None:
-            diagonals = [x for x in diagonals if x not in ignore]
-
-        for diagonal in diagonals:
-            moves = self.get_can_eat_for_diagonal(board, current_position, diagonal, eaten_pieces)
-            if moves:
-                result += [moves]
-        return result
-
-    def get_valid_moves_for_diagonal(self, board: Board, current_position: tuple[int, int],
-                                     diagonal: tuple[int, int]) -> list[dict[list[tuple[int, int]]]]:
-        result = []
-        dir_x, dir_y = diagonal
-        x, y = current_position
-        x, y = x + 1 * dir_x, y + 1 * dir_y
-
-        case = board.get_case((x, y))
-        if not board.is_valid_move((x, y)):
-            return result
-        if isinstance(case, PlayableCase):
-            if case.get_piece() is None:
-                result.append({"move_path": [current_position, (x, y)], "eaten_pieces": []})
-                return result
-            elif case.get_piece().get_team() == self._team:
-                return []
-
-        return result
-
-    def get_can_eat_for_diagonal(self, board: Board, current_position: tuple[int, int],
-                                 diagonal: tuple[int, int], eaten_pieces) -> list[tuple[int, int]]:
-        dir_x, dir_y = diagonal
-        x, y = current_position
-        x, y = x + 1 * dir_x, y + 1 * dir_y
-        case = board.get_case((x, y))
-        if not board.is_valid_move((x, y)):
-            return []
-        if (x, y) in eaten_pieces:
-            return []
-        if isinstance(case, PlayableCase):
-            if case.get_piece() is None:
-                return []
-            if case.get_piece().get_team() != self._team:
-                x, y = x + 1 * dir_x, y + 1 * dir_y
-                if board.is_valid_move((x, y)) and board.get_playable_case((x, y)).get_piece() is None:
-                    return [(x, y)]
-        return []
+        return self.get_can_move(board, current_position)
 
-    def draw(self, surface: pg.Surface, location: tuple[int, int], size: int, offset: int = 0) -> None:
+    def get_can_move(self, board: Board, current_position: tuple[int, int]) -> list[dict[str, list[tuple[int, int]]]]:
+        position = board.get_position()
+        square = position.get_geometry().square_of(current_position)
+        return board.to_paths(position.man_moves(square, SIDES[self._team]))
 
-        pg.draw.circle(surface, self._color_out,
-                       (location[0] * (size + offset) + size / 2, location[1] * (size + offset) + size / 2), size / 2.1)
-        pg.draw.circle(surface, self._color_in,
-                       (location[0] * (size + offset) + size / 2, location[1] * (size + offset) + size / 2), size / 2.3)
+    def draw(self, surface: pg.Surface, location: tuple[int, int], size: int, offset: int = 0) -> None:
+        surface.blit(self.get_sprite(size), (location[0] * (size + offset), location[1] * (size + offset)))
+
+    def get_sprite(self, size: int) -> pg.Surface:
+        """Image de la pièce, dessinée une seule fois par code et par taille."""
+        key = self.get_code(), size
+        sprite = SPRITES.get(key)
+        if sprite is None:
+            sprite = SPRITES[key] = self._render(size)
+        return sprite
+
+    def _render(self, size: int) -> pg.Surface:
+        import pygame as pg
+        sprite = pg.Surface((size, size), pg.SRCALPHA)
+        pg.draw.circle(sprite, self._color_out, (size / 2, size / 2), size / 2.1)
+        pg.draw.circle(sprite, self._color_in, (size / 2, size / 2), size / 2.3)
+        return sprite
 
     def __repr__(self):
         if self._team is not None:
@@ -115,70 +73,28 @@ class Queen(Piece):
     def __init__(self, team: Team):
         super().__init__(team)
 
-    def get_valid_paths(self, board: Board, current_position: tuple[int, int]) -> list[tuple[int, int]]:
-        result = []
-        # result += self.get_can_eat(game, current_position)
-        result += board.compute_eating_moves(board.get_case(current_position))
-        if result:
-            return result
+    def get_code(self) -> int:
+        return SIDES[self._team] * 2 + 1
 
-        result += self.get_valid_moves_for_diagonal(board, current_position, (1, 1))
-        result += self.get_valid_moves_for_diagonal(board, current_position, (1, -1))
-        result += self.get_valid_moves_for_diagonal(board, current_position, (-1, -1))
-        result += self.get_valid_moves_for_diagonal(board, current_position, (-1, 1))
-
-        return result
-
-    def get_can_eat_for_diagonal(self, board: Board, current_position: tuple[int, int],
-                                 diagonal: tuple[int, int], eaten_pieces) -> list[tuple[int, int]]:
-        dir_x, dir_y = diagonal
-        x, y = current_position
-
-        result = []
-        has_met_opponent = False
-        for i in range(1, GRID_SIZE):
-            x, y = x + 1 * dir_x, y + 1 * dir_y
-            case = board.get_case((x, y))
-            if not board.is_valid_move((x, y)):
-                break
-            if (x, y) in eaten_pieces:
-                break
-            if isinstance(case, PlayableCase):
-                if case.get_piece() is None:
-                    if not has_met_opponent:
-                        continue
-                    result.append((x, y))
-                elif case.get_piece().get_team() == self._team:
-                    break
-                else:
-                    if has_met_opponent:
-                        break
-                    has_met_opponent = True
-        return result
-
-    def get_valid_moves_for_diagonal(self, board: Board, current_position: tuple[int, int],
-                                     diagonal: tuple[int, int]) -> list[list[tuple[int, int]]]:
-        dir_x, dir_y = diagonal
-        x, y = current_position
-        result = []
-        for i in range(1, GRID_SIZE):
-            x, y = x + 1 * dir_x, y + 1 * dir_y
-            case = board.get_case((x, y))
-            if not board.is_valid_move((x, y)):
-                break
-            if isinstance(case, PlayableCase):
-                if case.get_piece() is None:
-                    result.append({"move_path": [current_position, (x, y)], "eaten_pieces": []})
-                else:
-                    break
-
-        return result
+    def get_can_move(self, board: Board, current_position: tuple[int, int]) -> list[dict[str, list[tuple[int, int]]]]:
+        position = board.get_position()
+        square = position.get_geometry().square_of(current_position)
+        return board.to_paths(position.king_moves(square))
 
-    def draw(self, surface: pg.Surface, location: tuple[int, int], size: int, offset: int = 0) -> None:
-        super().draw(surface, location, size, offset)
-        pg.draw.circle(surface, self._color_out,
-                       (location[0] * (size + offset) + size / 2, location[1] * (size + offset) + size / 2), size / 6)
+    def _render(self, size: int) -> pg.Surface:
+        import pygame as pg
+        sprite = super()._render(size)
+        pg.draw.circle(sprite, self._color_out, (size / 2, size / 2), size / 6)
+        return sprite
 
     def __repr__(self):
         if self._team is not None:
-            return f"{self._team.value} Queen"
\ No newline at end of file
+            return f"{self._team.value} Queen"
+
+
+# Les pièces n'ont pas d'état propre : une instance par code suffit pour les vues du bitboard
+PIECES = [piece_type(team) for team in TEAMS for piece_type in (Piece, Queen)]
+
+
+def get_piece_of_code(code: int | None) -> Piece | None:
+    return None if code is None else PIECES[code]
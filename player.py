@@ -10,6 +10,7 @@ from team import Team
 
 if TYPE_CHECKING:
     from board import Board
+    from book import OpeningBook
     from game import Game
 
 OptionalPlayableCase = Optional[PlayableCase]
@@ -26,6 +27,8 @@ class Player:
         self._possible_moves: list[PlayableCase] = []
 
         self._move_paths = []
+        # dernier coup joué par on_click : (coup, promotion, codes des pièces prises)
+        self._last_move = None
 
     def get_player_id(self) -> int:
         return self._id
@@ -36,6 +39,12 @@ class Player:
     def get_team(self) -> Team:
         return self._team
 
+    def get_selected_case(self) -> OptionalPlayableCase:
+        return self._last_selected_case
+
+    def get_last_move(self):
+        return self._last_move
+
     def get_possible_moves(self):
         return self._possible_moves
 
@@ -53,7 +62,10 @@ class Player:
                     for move in self._move_paths:
                         if move["move_path"][-1] == case.get_coordinates():
                             if move["move_path"][0] == self._last_selected_case.get_coordinates():
-                                self.play_move(board, move)
+                                captured_codes = [board.get_case(coordinates).get_piece().get_code()
+                                                  for coordinates in move["eaten_pieces"]]
+                                self._last_move = move, self.play_move(board, move), captured_codes
+                                break
 
 
 
@@ -118,39 +130,70 @@ class Player:
         return promoted
 
     def undo_move(self, board, move, unpromote=False):
+        """Inverse de play_move ; `unpromote` est la valeur renvoyée par play_move."""
+        end_case = board.get_case(move["move_path"][-1])
         if unpromote:
-            board.get_case(move["move_path"][-1]).set_piece(Piece(self.get_team()))
-        self._move_piece(board.get_case(move["move_path"][-1]), board.get_case(move["move_path"][0]))
+            end_case.set_piece(Piece(self.get_team()))
+        piece = end_case.get_piece()
+        end_case.set_piece(None)
+        board.get_case(move["move_path"][0]).set_piece(piece)
         self._vomit_pieces(board, move["eaten_pieces"])
 
     def _vomit_pieces(self, board, eating_list):
-        for coord in eating_list:
+        # les pièces sont dépilées dans l'ordre inverse de leur capture
+        for coord in reversed(eating_list):
             case = board.get_playable_case(coord)
             case.set_piece(self._eaten_pieces.pop())
 
 
 class AI(Player):
-    def __init__(self, player_id, name, team: Team, strategy: Strategy):
+    def __init__(self, player_id, name, team: Team, strategy: Strategy, book: OpeningBook | None = None):
         super().__init__(player_id, name, team)
         self.strategy = strategy
+        self.book = book
 
-    def play(self, game: Game):
-        state = {
+    def get_state(self, game: Game) -> dict:
+        return {
             "board": game.get_board(),
             "self_player": self,
             "enemy_player": game.get_player1(),
             "current_player": self,
         }
+
+    def get_book_move(self, board: Board):
+        """Coup (départ, arrivée) de la bibliothèque d'ouvertures, ou None hors bibliothèque."""
+        if self.book is None:
+            return None
+        return self.book.choose_move(board, self.get_team())
+
+    def play(self, game: Game):
+        book_move = self.get_book_move(game.get_board())
+        if book_move is not None:
+            return self.play_chosen_move(game, book_move)
+        state = self.get_state(game)
         self.strategy.update(state)
         game.render()
-        start, end = self.strategy.choose_move(deepcopy(state))
+        return self.play_chosen_move(game, self.strategy.choose_move(state))
 
+    def play_chosen_move(self, game: Game, move) -> bool:
+        start, end = move
         # time.sleep(1)
         self.on_click(game.get_board(), start)
-        game.draw()
+        game.render()
         self.on_click(game.get_board(), end)
         print(f"{self} plays {start} -> {end}")
         return True
 
+    def __deepcopy__(self, memo):
+        # la stratégie (table de transposition, pendule, drapeau d'arrêt) et la bibliothèque (mmap)
+        # sont partagées entre les copies
+        memo[id(self.strategy)] = self.strategy
+        memo[id(self.book)] = self.book
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        for name, value in self.__dict__.items():
+            setattr(result, name, deepcopy(value, memo))
+        return result
+
     def __repr__(self):
         return f"{self._name} ({self._team.value}) (Start: {self.strategy.__class__.__name__})"
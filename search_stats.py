@@ -0,0 +1,130 @@
+"""Statistiques d'une recherche, profilage optionnel et journal JSONL.
+
+    DAMES_SEARCH_PROFILE=cprofile DAMES_SEARCH_TRACE=searches.jsonl python main.py
+
+Chaque recherche de MiniMax remplit un SearchStats, lisible par Strategy.get_stats(). Avec un mode
+de profilage (`cprofile` : fonctions où la recherche passe le plus de temps ; `tracemalloc` : pic
+mémoire et lignes qui allouent le plus), le résultat s'ajoute aux statistiques. Avec un fichier de
+trace, chaque recherche y ajoute une ligne JSON. Les deux se règlent par variables d'environnement
+(voir config.py), sans toucher au code.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from threading import Lock
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+# lignes gardées dans le rapport de profilage
+PROFILE_TOP = 25
+
+
+class SearchStats:
+    """Compteurs et temps d'une recherche ; les temps par phase sont en secondes."""
+
+    def __init__(self):
+        self.depth = 0
+        self.score = None
+        self.move = None
+        self.nodes = 0
+        # noeuds ajoutés par la recherche de quiescence, compris dans `nodes`
+        self.quiescence_nodes = 0
+        self.evals = 0
+        self.movegen_calls = 0
+        # noeuds explorés par le CaptureSolver pour trouver les rafles
+        self.capture_expansions = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.cutoffs = 0
+        self.pvs_re_searches = 0
+        self.aspiration_fails = 0
+        # parties simulées par MCTS
+        self.playouts = 0
+        self.movegen_time = 0.0
+        self.apply_time = 0.0
+        self.eval_time = 0.0
+        self.total_time = 0.0
+        self.profile: list[dict] | None = None
+        self.memory: dict | None = None
+
+    def get_nps(self) -> float:
+        return self.nodes / self.total_time if self.total_time else 0.0
+
+    def get_pps(self) -> float:
+        return self.playouts / self.total_time if self.total_time else 0.0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self), nps=self.get_nps(), pps=self.get_pps())
+
+    def __repr__(self):
+        return (f"SearchStats(depth={self.depth}, nodes={self.nodes}, evals={self.evals}, "
+                f"movegen={self.movegen_calls}, tt_hits={self.tt_hits}/{self.tt_probes}, cutoffs={self.cutoffs}, "
+                f"time={self.total_time:.3f}s)")
+
+
+@contextmanager
+def profiled(mode: str | None, stats: SearchStats, top: int = PROFILE_TOP):
+    """Profile le bloc selon `mode` (None : rien) et range le rapport dans `stats`."""
+    if mode is None:
+        yield
+    elif mode == "cprofile":
+        # le profileur ne suit que le thread qui l'active : celui de la recherche
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stats.profile = _top_functions(profiler, top)
+    elif mode == "tracemalloc":
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            stats.memory = {
+                "current": current,
+                "peak": peak,
+                "top": [{"line": str(stat.traceback[0]), "size": stat.size, "count": stat.count}
+                        for stat in snapshot.statistics("lineno")[:top]],
+            }
+    else:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+
+
+def _top_functions(profiler: cProfile.Profile, top: int) -> list[dict]:
+    entries = pstats.Stats(profiler).stats
+    rows = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [{"function": f"{os.path.basename(file)}:{line}({name})", "calls": calls, "tottime": tottime,
+             "cumtime": cumtime}
+            for (file, line, name), (_, calls, tottime, cumtime, _) in rows]
+
+
+class TraceSink:
+    """Ajoute une ligne JSON par recherche à `path`, depuis plusieurs threads ou processus."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = Lock()
+
+    def get_path(self) -> str:
+        return self._path
+
+    def write(self, stats: SearchStats, **context) -> None:
+        record = {"timestamp": time.time(), "pid": os.getpid(), **context, **stats.to_dict()}
+        # une seule écriture en mode ajout par ligne : les lignes de processus différents ne se mélangent pas
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock, open(self._path, "a") as file:
+            file.write(line)
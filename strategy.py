@@ -1,35 +1,115 @@
 from __future__ import annotations
 
+from contextlib import closing
+from threading import Event
+from time import perf_counter
 from typing import TYPE_CHECKING
 
+import numpy as np
+
+from bitboard import SIDES, notation
 from case import PlayableCase
-from config import GRID_SIZE
+from clock import GameClock
+from config import SEARCH_PROFILE, SEARCH_TRACE, TT_SIZE_MB
+from evaluation import DEFAULT_WEIGHTS, MATERIAL, MOBILITY, planes, side_features
+from move_ordering import MoveOrderer, move_key
+from search_stats import PROFILE_MODES, SearchStats, TraceSink, profiled
+from tablebase import LOSS, WIN, Tablebase
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from board import Board
     from player import AI
+    from team import Team
 
 State = dict
 
 INF = 1e10
+# camp au trait sans coup (plus de pièce ou bloqué) : perdu, compté ply - INF pour qu'un gain plus
+# court soit préféré ; toute valeur au-delà de WIN_SCORE est une fin de partie trouvée par la recherche
+MAX_PLY = 1000
+WIN_SCORE = INF - MAX_PLY
+# gain exact donné par les tables de finales, moins la distance : le plus court est préféré
+TABLEBASE_WIN = INF / 2
+
+# nombre de noeuds entre deux lectures de l'horloge et du drapeau d'arrêt
+CHECK_INTERVAL = 256
+# demi-largeur de la fenêtre d'aspiration autour du score de l'itération précédente, élargie par
+# ASPIRATION_GROWTH à chaque échec
+ASPIRATION_WINDOW = 50
+ASPIRATION_GROWTH = 4
+
+
+class SearchAborted(Exception):
+    pass
+
+
+def to_table(value: float, ply: int) -> float:
+    """Fin de partie comptée depuis le noeud et non depuis la racine, pour la table de transposition."""
+    if value >= WIN_SCORE:
+        return value + ply
+    if value <= -WIN_SCORE:
+        return value - ply
+    return value
+
+
+def from_table(value: float, ply: int) -> float:
+    if value >= WIN_SCORE:
+        return value - ply
+    if value <= -WIN_SCORE:
+        return value + ply
+    return value
 
 
 class Strategy:
     def __init__(self):
         self._start_cases: list[PlayableCase] = []
         self._moves: list[PlayableCase] = []
+        # statistiques de la dernière recherche, pour les stratégies qui en tiennent
+        self.stats: SearchStats | None = None
+        # suite de coups (départ, arrivée) attendue après la dernière recherche
+        self.principal_variation: list = []
 
     def update(self, state: State):
-        board = state["board"]
-        self._start_cases = board.get_cases_who_can_play()
+        cases_who_can_play = state["board"].find_cases_who_can_play(state["current_player"])
+        self._start_cases = [case for case, _ in cases_who_can_play]
         self._moves = []
-        for case in self._start_cases:
-            for move in case.get_piece().get_valid_paths(board, case.get_coordinates()):
+        for case, moves in cases_who_can_play:
+            for move in moves:
                 self._moves += [(case.get_coordinates(), move["move_path"][-1])]
 
     def choose_move(self, state: State):
         raise NotImplementedError
 
+    def stop(self) -> None:
+        """Interrompt une recherche lancée dans un autre thread ; sans effet par défaut."""
+
+    def close(self) -> None:
+        """Libère ce que la stratégie garde entre deux coups (processus...) ; sans effet par défaut."""
+
+    def get_stats(self) -> SearchStats | None:
+        return self.stats
+
+    def format_pv(self, board: Board, team: Team, line: list | None = None) -> str:
+        """Variation principale (ou `line`) jouée par `team` depuis `board`, en notation officielle.
+
+        Les coups sont rejoués sur le bitboard pour retrouver les prises et le chemin des rafles.
+        """
+        position, side = board.get_position(), SIDES[team]
+        square_of = position.get_geometry().square_of
+        moves = []
+        for start, end in self.principal_variation if line is None else line:
+            start, end = square_of(start), square_of(end)
+            move = next((move for move in position.legal_moves(side) if move[0][0] == start and move[0][-1] == end),
+                        None)
+            if move is None:
+                break
+            moves.append(notation(move))
+            position, side = position.play(move), 1 - side
+        return " ".join(moves)
+
 
 class RandomStrategy(Strategy):
     def __init__(self):
@@ -43,106 +123,521 @@ class RandomStrategy(Strategy):
 
 
 class MiniMax(Strategy):
-    def __init__(self, max_depth: int = 3):
+    """Négamax alpha-beta en approfondissement itératif.
+
+    Sans limite, chaque recherche va jusqu'à `max_depth`. `time_limit` (secondes par coup),
+    `clock` (pendule de la partie, prioritaire sur `time_limit`) et `node_limit` bornent la
+    recherche, `stop_event` ou `stop()` l'interrompent de l'extérieur : le coup renvoyé est celui
+    de la dernière itération terminée. Un stop() demandé hors recherche est sans effet : le drapeau
+    est remis à zéro au début de chaque recherche.
+    Avec `tablebase`, les positions couvertes par les tables de finales ont leur valeur exacte.
+
+    L'évaluation pondère les caractéristiques de evaluation.FEATURES par `weights`. Avec
+    `batch_leaves`, un noeud à profondeur 1 évalue tous ses enfants en un seul lot NumPy au lieu
+    de descendre dans chacun. Avec `quiescence`, une feuille où une prise est à jouer n'est pas
+    évaluée : les prises sont prolongées jusqu'à une position calme.
+
+    Chaque recherche remplit `stats` (SearchStats). `profile` (cprofile ou tracemalloc) y ajoute
+    un rapport de profilage, `trace` est un fichier JSONL qui reçoit une ligne par recherche ; les
+    valeurs par défaut viennent de l'environnement (config.py). Les temps par phase (génération des
+    coups, coups joués, évaluation) ne sont mesurés qu'avec `timing`, actif par défaut avec `profile`
+    ou `trace` : ailleurs, les appels à l'horloge autour de chaque noeud coûtent pour rien.
+
+    Recherche à variation principale : seul le premier coup d'un noeud a la fenêtre complète, les
+    suivants une fenêtre nulle, et ne sont recherchés à nouveau que s'ils la dépassent. Chaque
+    itération part d'une fenêtre d'aspiration autour du score précédent. La variation principale
+    de la dernière itération est dans `principal_variation`.
+    """
+
+    def __init__(self, max_depth: int = 3, tt_size_mb: float = TT_SIZE_MB, time_limit: float | None = None,
+                 node_limit: int | None = None, clock: GameClock | None = None, stop_event: Event | None = None,
+                 tablebase: Tablebase | None = None, weights: np.ndarray | None = None, batch_leaves: bool = True,
+                 quiescence: bool = True, profile: str | None = SEARCH_PROFILE, trace: str | None = SEARCH_TRACE,
+                 timing: bool | None = None):
         super().__init__()
         self.max_depth = max_depth
+        self.transposition_table = TranspositionTable(tt_size_mb)
+        self.move_ordering = MoveOrderer()
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.clock = clock
+        self.stop_event = stop_event if stop_event is not None else Event()
+        self.tablebase = tablebase
+        self.weights = DEFAULT_WEIGHTS if weights is None else np.asarray(weights)
+        self.batch_leaves = batch_leaves
+        self.quiescence = quiescence
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {profile!r}, expected one of {PROFILE_MODES}")
+        self.profile = profile
+        self.trace = TraceSink(trace) if trace is not None else None
+        self.timing = timing if timing is not None else profile is not None or trace is not None
+        self.stats = SearchStats()
+
+        self.nodes = 0
+        self.completed_depth = 0
+        # une entrée par itération terminée de la dernière recherche (noeuds et temps cumulés)
+        self.iterations: list[dict] = []
+        # appelé avec l'entrée de chaque itération terminée, depuis le thread de la recherche
+        self.on_iteration: Callable[[dict], None] | None = None
+        # variation principale trouvée sous chaque ply pendant la recherche
+        self._pv_table: list[list] = []
+        self._pondering = False
+        self._search_start = 0.0
+        self._budget = None
+        self._deadline = None
+        self._next_check = 0
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def _check_limits(self) -> None:
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted
+        # un lot compte plusieurs noeuds d'un coup : on ne peut pas attendre un multiple exact
+        if self.nodes >= self._next_check:
+            self._next_check = self.nodes + CHECK_INTERVAL
+            if self.stop_event.is_set() or (self._deadline is not None and perf_counter() >= self._deadline):
+                raise SearchAborted
+
+    def _set_pv(self, ply: int, line: list) -> None:
+        while len(self._pv_table) <= ply + 1:
+            self._pv_table.append([])
+        self._pv_table[ply] = line
+        # la ligne du ply suivant ne vaut que pour l'enfant qui vient d'être cherché
+        self._pv_table[ply + 1] = []
+
+    def neg_alpha_beta(self, state: State, depth: int, alpha, beta, color: int, ply: int = 0):
+        self.nodes += 1
+        self._check_limits()
+        self._set_pv(ply, [])
+        board: Board = state["board"]
+        position = board.get_position()
+        side = SIDES[state["current_player"].get_team()]
+        if self.tablebase is not None and ply > 0:
+            value = self.probe_tablebase(position, side)
+            if value is not None:
+                return value, None
+        if depth == 0:
+            if self.quiescence:
+                return self.quiesce(position, side, alpha, beta, ply=ply), "Terminal"
+            return color * self.evaluate(state, ply), "Terminal"
+
+        key = position.hash_key(side)
+        alpha_orig = alpha
+        hash_move = None
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            entry_depth, bound, score, hash_move = entry
+            score = from_table(score, ply)
+            # à la racine il faut un coup : on ne coupe pas sur la table
+            if ply > 0 and entry_depth >= depth:
+                if bound == EXACT:
+                    self.stats.tt_cutoffs += 1
+                    return score, None
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    self.stats.tt_cutoffs += 1
+                    return score, None
 
-    def neg_alpha_beta(self, state: State, depth: int, alpha, beta, color: int):
-        if self.is_leaf(state) or depth == 0:
-            return color * self.evaluate(state), state, "Terminal"
+        if self.is_leaf(state):
+            return ply - INF, "Terminal"
 
-        best_value = -INF - 1
-        best_state = None
-        best_move = None
-        for new_state, new_move in self.get_childs(state):
-            value, _, _ = self.neg_alpha_beta(new_state, depth - 1, -beta, -alpha, -color)
-            value = -value
-            if value > best_value:
-                best_value = value
-                best_state = new_state
-                best_move = new_move
+        if hash_move is not None:
+            coordinates = position.get_geometry().coordinates
+            hash_move = coordinates[hash_move >> 6], coordinates[hash_move & 63]
 
-            alpha = max(alpha, value)
-            if alpha >= beta:
-                return alpha, best_state, best_move
-        return best_value, best_state, best_move
+        if depth == 1 and self.batch_leaves:
+            best_value, best_move = self._search_frontier(state, alpha, beta, color, ply)
+            self._set_pv(ply, [best_move])
+        else:
+            best_value = -INF - 1
+            best_move = None
+            with closing(self.get_childs(state, hash_move, ply)) as childs:
+                for index, (new_state, move) in enumerate(childs):
+                    if index == 0:
+                        value, _ = self.neg_alpha_beta(new_state, depth - 1, -beta, -alpha, -color, ply + 1)
+                        value = -value
+                    else:
+                        # fenêtre nulle : on vérifie seulement que le coup ne fait pas mieux que alpha
+                        value, _ = self.neg_alpha_beta(new_state, depth - 1, -alpha - 1, -alpha, -color, ply + 1)
+                        value = -value
+                        if alpha < value < beta:
+                            self.stats.pvs_re_searches += 1
+                            value, _ = self.neg_alpha_beta(new_state, depth - 1, -beta, -alpha, -color, ply + 1)
+                            value = -value
+                    if value > best_value:
+                        best_value = value
+                        best_move = move_key(move)
+                        if value > alpha:
+                            self._set_pv(ply, [best_move] + self._pv_table[ply + 1])
+
+                    alpha = max(alpha, value)
+                    if alpha >= beta:
+                        self.stats.cutoffs += 1
+                        self.move_ordering.record_cutoff(state["current_player"].get_team(), move, index, depth,
+                                                         ply)
+                        break
+
+        if best_value <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        square_of = position.get_geometry().square_of
+        self.transposition_table.store(key, depth, bound, to_table(best_value, ply),
+                                       square_of(best_move[0]) << 6 | square_of(best_move[1]))
+        return best_value, best_move
+
+    def choose_move(self, state: State, ponder: bool = False):
+        """Le stop_event est remis à zéro au début de chaque recherche.
+
+        Avec `ponder`, la recherche n'a ni limite de temps ni pendule jusqu'à `ponderhit()` :
+        elle réfléchit pendant le tour de l'adversaire sur la réponse qu'on lui prête.
+        Les statistiques de la recherche sont ensuite dans `stats` (get_stats()).
+        """
+        self.stats = stats = SearchStats()
+        table = self.transposition_table
+        solver = state["board"].get_position().get_geometry().capture_solver
+        tt_hits, tt_misses, expansions = table.hits, table.misses, solver.get_expansions()
+        with profiled(self.profile, stats):
+            best_move = self._search(state, ponder)
+        stats.tt_hits = table.hits - tt_hits
+        stats.tt_probes = stats.tt_hits + table.misses - tt_misses
+        stats.capture_expansions = solver.get_expansions() - expansions
+        if self.trace is not None:
+            self.trace.write(stats, ponder=ponder, position=str(state["board"]),
+                             team=state["current_player"].get_team().value, pv=self.format_pv(state["board"], state["current_player"].get_team()))
+        return best_move
 
-    def choose_move(self, state: State):
-        val, new_state, best_move = self.neg_alpha_beta(state, self.max_depth, -INF, +INF, color=1)
-        print(f"AI eval: {-val}")
-        if val == INF:
+    def _search(self, state: State, ponder: bool):
+        stats = self.stats
+        # un stop() arrivé après la recherche précédente ne doit pas interrompre celle-ci
+        self.stop_event.clear()
+        self._pondering = ponder
+        self._search_start = perf_counter()
+        self._budget = None if ponder else self._allocate()
+        self._deadline = None if self._budget is None else self._search_start + self._budget
+        self.transposition_table.new_search()
+        self.move_ordering.new_search()
+        self.nodes = 0
+        self._next_check = 0
+        self.completed_depth = 0
+        self.iterations = []
+        self.principal_variation = []
+
+        val, best_move = -INF, None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                val, best_move = self._aspiration_search(state, depth, val)
+                stats.depth, stats.score, stats.move = depth, val, best_move
+            except SearchAborted:
+                break
+            self.completed_depth = depth
+            self.principal_variation = self._complete_pv(state, self._pv_table[0], depth)
+            self.iterations.append({"depth": depth, "score": val, "move": best_move, "nodes": self.nodes,
+                                    "time": perf_counter() - self._search_start,
+                                    "pv": self.principal_variation})
+            if self.on_iteration is not None:
+                self.on_iteration(self.iterations[-1])
+            if abs(val) >= WIN_SCORE:
+                break
+            # l'itération suivante coûte plusieurs fois la précédente : inutile de la commencer
+            if self._budget is not None and perf_counter() - self._search_start > self._budget / 2:
+                break
+
+        if best_move is None:
+            best_move = self._first_move(state)
+        elapsed = perf_counter() - self._search_start
+        stats.nodes = self.nodes
+        stats.total_time = elapsed
+        if self.clock is not None and not self._pondering:
+            self.clock.consume(elapsed)
+
+        print(f"AI eval: {-val} (depth {self.completed_depth}, {self.nodes} nodes, {elapsed:.2f}s)"
+              f" pv {self.format_pv(state['board'], state['current_player'].get_team())}")
+        if val >= WIN_SCORE:
             print("Winning ! :D")
-        elif val == -INF:
+        elif val <= -WIN_SCORE:
             print("Loosing ! :(")
         return best_move
 
-    def is_leaf(self, state: State):
-        return not state["board"].find_cases_who_can_play(state["current_player"])
-
-    def evaluate(self, state):
-        board: Board = state["board"]
-        self_player = state["self_player"]
-        if self.is_leaf(state):
-            return self.score(state)
+    def _aspiration_search(self, state: State, depth: int, previous):
+        """Racine cherchée dans une fenêtre autour de `previous`, élargie tant que le score en sort."""
+        if depth == 1 or abs(previous) >= TABLEBASE_WIN / 2:
+            return self.neg_alpha_beta(state, depth, -INF, +INF, color=1)
+        delta = ASPIRATION_WINDOW
+        alpha, beta = previous - delta, previous + delta
+        while True:
+            value, best_move = self.neg_alpha_beta(state, depth, alpha, beta, color=1)
+            if value <= alpha and alpha > -INF:
+                alpha = max(value - delta, -INF)
+            elif value >= beta and beta < INF:
+                beta = min(value + delta, INF)
+            else:
+                return value, best_move
+            self.stats.aspiration_fails += 1
+            delta *= ASPIRATION_GROWTH
+
+    def _complete_pv(self, state: State, line: list, depth: int) -> list:
+        """Prolonge jusqu'à `depth` coups une ligne coupée par la table, avec les coups qu'elle a gardés."""
+        position = state["board"].get_position()
+        side = SIDES[state["current_player"].get_team()]
+        coordinates = position.get_geometry().coordinates
+        result = []
+        seen = set()
+        for index in range(depth):
+            key = position.hash_key(side)
+            if index < len(line):
+                wanted = line[index]
+            else:
+                entry = self.transposition_table.probe(key)
+                if entry is None or entry[3] is None or key in seen:
+                    break
+                wanted = coordinates[entry[3] >> 6], coordinates[entry[3] & 63]
+            seen.add(key)
+            move = next((move for move in position.legal_moves(side)
+                         if (coordinates[move[0][0]], coordinates[move[0][-1]]) == wanted), None)
+            if move is None:
+                break
+            result.append(wanted)
+            position = position.play(move)
+            side = 1 - side
+        return result
 
-        value = 0
-        for feature in self.features(state):
-            value += feature
+    def _allocate(self) -> float | None:
+        return self.clock.allocate() if self.clock is not None else self.time_limit
+
+    def ponderhit(self) -> None:
+        """L'adversaire a joué le coup prévu : la recherche en cours passe sous limite de temps."""
+        self._search_start = perf_counter()
+        self._budget = self._allocate()
+        self._deadline = None if self._budget is None else self._search_start + self._budget
+        self._pondering = False
+
+    def probe_tablebase(self, position, side: int) -> float | None:
+        """Valeur exacte pour `side` au trait si les tables couvrent la position."""
+        if position.count(0) + position.count(1) > self.tablebase.get_max_pieces():
+            return None
+        entry = self.tablebase.probe(position, side)
+        if entry is None:
+            return None
+        result, distance = entry
+        if result == WIN:
+            return TABLEBASE_WIN - distance
+        if result == LOSS:
+            return distance - TABLEBASE_WIN
+        return 0
+
+    def get_hash_move(self, board: Board, team: Team):
+        """Meilleur coup (départ, arrivée) connu de la table pour `team` au trait, ou None."""
+        position = board.get_position()
+        entry = self.transposition_table.probe(position.hash_key(SIDES[team]))
+        if entry is None or entry[3] is None:
+            return None
+        coordinates = position.get_geometry().coordinates
+        return coordinates[entry[3] >> 6], coordinates[entry[3] & 63]
+
+    def _first_move(self, state: State):
+        # recherche interrompue avant la fin de la profondeur 1
+        for _, moves in state["board"].find_cases_who_can_play(state["current_player"]):
+            for move in moves:
+                return move["move_path"][0], move["move_path"][-1]
+        return None
 
-        return value
+    def get_tt_stats(self) -> dict[str, int]:
+        return self.transposition_table.get_stats()
 
-    def get_childs(self, state):
-        from board import Board
-        board: Board = state["board"]
-        current_player: AI = state["current_player"]
-        enemy_player = state["enemy_player"]
-        self_player = state["self_player"]
-        result = []
-        cases_who_can_play = board.find_cases_who_can_play(current_player)
-        if not cases_who_can_play:
-            print("No cases who can play")
+    def get_ordering_stats(self) -> dict[str, float]:
+        return self.move_ordering.get_stats()
 
-        for _, moves in cases_who_can_play:
-            for move in moves:
-                new_board = Board(GRID_SIZE, board.__str__())
-                current_player.play_move(new_board, move)
-                result.append([{
-                    "board": new_board,
-                    "self_player": self_player,
-                    "enemy_player": enemy_player,
-                    "current_player": self_player if current_player != self_player else enemy_player,
-                }, (move["move_path"][0], move["move_path"][-1])])
-        return result
+    def _search_frontier(self, state: State, alpha, beta, color: int, ply: int):
+        """Noeud à profondeur 1 : les enfants sont joués sur des copies du bitboard et évalués en un lot.
 
-    def score(self, state):
+        Renvoie (meilleure valeur, meilleur coup) comme la boucle de neg_alpha_beta ; tous les enfants
+        sont comptés, il n'y a pas de coupure à l'intérieur du lot. Avec la recherche de quiescence,
+        les enfants où une prise est à jouer sont ensuite repris un par un, fenêtre resserrée par
+        les valeurs des enfants calmes.
+        """
         board: Board = state["board"]
-        current_player: AI = state["current_player"]
-        enemy_player = state["enemy_player"]
-        self_player = state["self_player"]
+        team = state["current_player"].get_team()
+        side = SIDES[team]
+        position = board.get_position()
+        stats = self.stats
+        start = perf_counter() if self.timing else 0.0
+        moves = position.legal_moves(side)
+        stats.movegen_calls += 1
+        if self.timing:
+            stats.movegen_time += perf_counter() - start
+        start = perf_counter() if self.timing else 0.0
+        children = [position.play(move) for move in moves]
+        if self.timing:
+            stats.apply_time += perf_counter() - start
+        self.nodes += len(children)
+        self._check_limits()
+
+        values = color * self.evaluate_positions(children, 1 - side, SIDES[state["self_player"].get_team()], ply + 1)
+        exact = set()
+        if self.tablebase is not None:
+            for index, child in enumerate(children):
+                value = self.probe_tablebase(child, 1 - side)
+                if value is not None:
+                    values[index] = -value
+                    exact.add(index)
+
+        if self.quiescence:
+            pending = []
+            start = perf_counter() if self.timing else 0.0
+            for index, child in enumerate(children):
+                captures = [] if index in exact else child.captures(1 - side)
+                if captures:
+                    pending.append((index, captures))
+            stats.movegen_calls += len(children) - len(exact)
+            if self.timing:
+                stats.movegen_time += perf_counter() - start
+            pending_indexes = {index for index, _ in pending}
+            quiet_values = [value for index, value in enumerate(values) if index not in pending_indexes]
+            alpha = max([alpha] + quiet_values)
+            for index, captures in pending:
+                if alpha >= beta:
+                    # coupure : les enfants restants ne peuvent plus être choisis
+                    values[index] = -INF - 1
+                    continue
+                values[index] = -self.quiesce(children[index], 1 - side, -beta, -alpha, captures, ply + 1)
+                alpha = max(alpha, values[index])
+
+        index = int(np.argmax(values))
+        best_value = float(values[index])
+        coordinates = position.get_geometry().coordinates
+        path = moves[index][0]
+        if best_value >= beta:
+            stats.cutoffs += 1
+            self.move_ordering.record_refutation(team, board.to_paths([moves[index]])[0], 1, ply)
+        return best_value, (coordinates[path[0]], coordinates[path[-1]])
+
+    def quiesce(self, position, side: int, alpha, beta, captures: list | None = None, ply: int = 0) -> float:
+        """Valeur pour `side` au trait en ne prolongeant que les prises, jusqu'à une position calme.
+
+        Les prises étant obligatoires, `side` ne peut s'arrêter sur la valeur statique (stand pat)
+        que s'il n'a aucune prise à jouer : il choisirait alors un coup calme.
+        """
+        stats = self.stats
+        if captures is None:
+            start = perf_counter() if self.timing else 0.0
+            captures = position.captures(side)
+            stats.movegen_calls += 1
+            if self.timing:
+                stats.movegen_time += perf_counter() - start
+        if not captures:
+            return float(self.evaluate_positions([position], side, side, ply)[0])
 
-        number_of_self_pieces = count_number_of_pieces_of_team(board, self_player.get_team())
+        best_value = -INF - 1
+        for move in captures:
+            self.nodes += 1
+            stats.quiescence_nodes += 1
+            self._check_limits()
+            start = perf_counter() if self.timing else 0.0
+            child = position.play(move)
+            if self.timing:
+                stats.apply_time += perf_counter() - start
+            value = self.probe_tablebase(child, 1 - side) if self.tablebase is not None else None
+            if value is None:
+                value = self.quiesce(child, 1 - side, -beta, -max(alpha, best_value), ply=ply + 1)
+            value = -value
+            if value > best_value:
+                best_value = value
+                if best_value >= beta:
+                    stats.cutoffs += 1
+                    break
+        return best_value
+
+    def evaluate_positions(self, positions: list, side: int, self_side: int, ply: int = 0) -> np.ndarray:
+        """evaluate de chaque position, `side` au trait, du point de vue de `self_side`, en un lot."""
+        start = perf_counter() if self.timing else 0.0
+        per_side = side_features(planes(positions))
+        # valeurs entières : la fenêtre nulle de la recherche à variation principale a une largeur de 1
+        values = np.rint((per_side[:, 0] - per_side[:, 1]) @ self.weights)
+        values = values if self_side == 0 else -values
+
+        # fin de partie : camp au trait sans pièce, ou bloqué (vérifié seulement sans mobilité estimée) ;
+        # dans les deux cas il a perdu, comme dans les tables de finales
+        loss = ply - INF if side == self_side else INF - ply
+        for index in np.flatnonzero(per_side[:, side, MOBILITY] == 0):
+            if per_side[index, side, MATERIAL] == 0 or not positions[index].legal_moves(side):
+                values[index] = loss
+        self.stats.evals += len(positions)
+        if self.timing:
+            self.stats.eval_time += perf_counter() - start
+        return values
+
+    def is_leaf(self, state: State):
+        start = perf_counter() if self.timing else 0.0
+        result = not state["board"].find_cases_who_can_play(state["current_player"])
+        self.stats.movegen_calls += 1
+        if self.timing:
+            self.stats.movegen_time += perf_counter() - start
+        return result
 
-        number_of_enemy_pieces = count_number_of_pieces_of_team(board, enemy_player.get_team())
+    def evaluate(self, state, ply: int = 0):
+        if self.is_leaf(state):
+            return self.score(state, ply)
+        start = perf_counter() if self.timing else 0.0
+        value = int(np.rint(np.dot(self.features(state), self.weights)))
+        self.stats.evals += 1
+        if self.timing:
+            self.stats.eval_time += perf_counter() - start
+        return value
 
-        if number_of_self_pieces == 0:
-            return -INF
-        elif number_of_enemy_pieces == 0:
-            return INF
-        else:
-            return 0
+    def get_childs(self, state, hash_move=None, ply: int = 0):
+        """Joue chaque coup sur le plateau de `state` le temps de l'explorer, puis l'annule.
 
-    def features(self, state):
+        Les enfants sont produits à la demande, dans l'ordre du MoveOrderer : une coupure
+        alpha-beta ferme le générateur et les coups suivants ne sont jamais joués.
+        """
         board: Board = state["board"]
         current_player: AI = state["current_player"]
         enemy_player = state["enemy_player"]
         self_player = state["self_player"]
-        features = []
-        features.append(1 * count_number_of_pieces_of_team(board, self_player.get_team()))
-        features.append(-1 * count_number_of_pieces_of_team(board, enemy_player.get_team()))
-        return features
+        child = {
+            "board": board,
+            "self_player": self_player,
+            "enemy_player": enemy_player,
+            "current_player": self_player if current_player != self_player else enemy_player,
+        }
+
+        stats = self.stats
+        start = perf_counter() if self.timing else 0.0
+        moves = [move for _, case_moves in board.find_cases_who_can_play(current_player) for move in case_moves]
+        stats.movegen_calls += 1
+        if self.timing:
+            stats.movegen_time += perf_counter() - start
+        for move in self.move_ordering.order(board, current_player.get_team(), moves, hash_move, ply):
+            start = perf_counter() if self.timing else 0.0
+            promoted = current_player.play_move(board, move)
+            if self.timing:
+                stats.apply_time += perf_counter() - start
+            try:
+                yield child, move
+            finally:
+                start = perf_counter() if self.timing else 0.0
+                current_player.undo_move(board, move, promoted)
+                if self.timing:
+                    stats.apply_time += perf_counter() - start
+
+    def score(self, state, ply: int = 0):
+        """Position sans coup (plus de pièce ou bloqué) : perdue pour le camp au trait, vue de `self_player`."""
+        loss = ply - INF
+        return loss if state["current_player"] == state["self_player"] else -loss
+
+    def features(self, state):
+        """Caractéristiques de evaluation.FEATURES, celles de `self_player` moins celles de son adversaire."""
+        per_side = side_features(planes([state["board"].get_position()]))[0]
+        self_side = SIDES[state["self_player"].get_team()]
+        return per_side[self_side] - per_side[1 - self_side]
 
 
 def count_number_of_pieces_of_team(board: Board, team):
-    return len(list(board.get_cases(
-        lambda c: isinstance(c, PlayableCase) and c.contains_piece_of_team(team)
-    )))
+    return board.count_pieces(team)
@@ -0,0 +1,359 @@
+"""Tables de finales : gain, nulle ou perte et distance en demi-coups, pour toutes les positions
+d'au plus N pièces (pions et dames).
+
+    python tablebase.py --pieces 3 --workers 8
+
+Une table par matériel, toujours avec le camp au trait joué par les blancs : une position avec les
+noirs au trait est tournée de 180 degrés, couleurs échangées, ce qui divise la place par deux. Une
+table est un octet par position, indexé par combinaisons de cases, et ouverte en mmap à la première
+lecture. Les tables sont résolues par analyse rétrograde dans l'ordre des dépendances (prises et
+promotions mènent à des tables déjà faites) : la génération des coups est répartie sur plusieurs
+processus, la propagation des résultats se fait par couches de distance avec NumPy. Les règles
+de nulle par répétition ou par absence de progrès ne sont pas prises en compte.
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import comb
+from time import perf_counter
+
+import numpy as np
+
+from bitboard import BLACK, WHITE, Position, get_geometry, iter_bits
+from config import GRID_SIZE, TABLEBASE_PATH
+
+WIN, DRAW, LOSS = 1, 0, -1
+
+# octet d'une position : 0 nulle (ou position impossible), 1..127 gain en d, 128 + d perte en d ;
+# une distance de plus de 127 demi-coups est écrite 127 (le résultat reste exact, la distance n'est
+# plus qu'une borne inférieure, y compris pour les tables qui y mènent par une prise ou une promotion)
+MAX_DISTANCE = 127
+LOSS_FLAG = 128
+
+Signature = tuple[int, int, int, int]  # pions et dames du camp au trait, puis de l'adversaire
+
+
+def encode(result: int, distance: int) -> int:
+    if result == DRAW:
+        return 0
+    distance = min(distance, MAX_DISTANCE)
+    return distance if result == WIN else LOSS_FLAG + distance
+
+
+def decode(value: int) -> tuple[int, int]:
+    if value == 0:
+        return DRAW, 0
+    if value & LOSS_FLAG:
+        return LOSS, value - LOSS_FLAG
+    return WIN, value
+
+
+def flip(signature: Signature) -> Signature:
+    return signature[2], signature[3], signature[0], signature[1]
+
+
+def table_name(signature: Signature) -> str:
+    return "{}{}{}{}.egtb".format(*signature)
+
+
+def groups_of(position: Position, side: int) -> list[list[int]]:
+    """Cases des pions et dames du camp au trait puis de l'adversaire, vues depuis les blancs."""
+    if side == WHITE:
+        bitboards = position.get_men(WHITE), position.get_kings(WHITE), position.get_men(BLACK), position.get_kings(BLACK)
+        return [list(iter_bits(bitboard)) for bitboard in bitboards]
+    last = position.get_geometry().squares - 1
+    bitboards = position.get_men(BLACK), position.get_kings(BLACK), position.get_men(WHITE), position.get_kings(WHITE)
+    return [sorted(last - square for square in iter_bits(bitboard)) for bitboard in bitboards]
+
+
+class Indexer:
+    """Numérotation des positions d'un matériel, camp au trait en blanc.
+
+    Chaque groupe (pions blancs, dames blanches, pions noirs, dames noires) est une combinaison de
+    cases numérotée dans le système combinatoire ; les pions n'ont que les cases hors de leur ligne
+    de promotion. Les index où deux pièces se superposent sont des positions impossibles.
+    """
+
+    def __init__(self, signature: Signature, size: int = GRID_SIZE):
+        geometry = get_geometry(size)
+        self.signature = signature
+        self._row_length = geometry.row_length
+        men_squares = geometry.squares - geometry.row_length
+        self._domains = (men_squares, geometry.squares, men_squares, geometry.squares)
+        self._radices = [comb(domain, count) for domain, count in zip(self._domains, signature)]
+        self.size = self._radices[0] * self._radices[1] * self._radices[2] * self._radices[3]
+
+    def index(self, groups: list[list[int]]) -> int:
+        index = 0
+        for group, (number, squares) in enumerate(zip(self._radices, groups)):
+            # les pions blancs ne sont jamais sur la première ligne : leurs cases sont décalées
+            offset = self._row_length if group == 0 else 0
+            rank = 0
+            for i, square in enumerate(squares):
+                rank += comb(square - offset, i + 1)
+            index = index * number + rank
+        return index
+
+    def groups(self, index: int) -> list[list[int]]:
+        ranks = []
+        for number in reversed(self._radices):
+            index, rank = divmod(index, number)
+            ranks.append(rank)
+        result = []
+        for group, (rank, count, domain) in enumerate(zip(reversed(ranks), self.signature, self._domains)):
+            squares = []
+            for i in range(count, 0, -1):
+                square = i - 1
+                while square + 1 < domain and comb(square + 1, i) <= rank:
+                    square += 1
+                rank -= comb(square, i)
+                squares.append(square)
+            offset = self._row_length if group == 0 else 0
+            result.append(sorted(square + offset for square in squares))
+        return result
+
+    def position(self, index: int, size: int = GRID_SIZE) -> Position | None:
+        """Position de l'index, blancs au trait, ou None si deux pièces se superposent."""
+        position = Position(size)
+        for code, squares in zip((0, 1, 2, 3), self.groups(index)):
+            for square in squares:
+                if position.get_piece(square) is not None:
+                    return None
+                position.set_piece(square, code)
+        return position
+
+
+class Tablebase:
+    """Lecture des tables d'un dossier, chacune ouverte en mmap à sa première utilisation."""
+
+    def __init__(self, directory: str = TABLEBASE_PATH, size: int = GRID_SIZE):
+        self._directory = directory
+        self._size = size
+        self._tables: dict[Signature, tuple[Indexer, mmap.mmap] | None] = {}
+        self._max_pieces: int | None = None
+
+    def get_max_pieces(self) -> int:
+        """Nombre de pièces couvert par toutes les tables présentes (0 sans tables)."""
+        if self._max_pieces is None:
+            names = os.listdir(self._directory) if os.path.isdir(self._directory) else []
+            available = {tuple(int(c) for c in name[:4]) for name in names if name.endswith(".egtb")}
+            pieces = 2
+            while all(signature in available for signature in signatures(pieces)):
+                pieces += 1
+            self._max_pieces = pieces - 1 if pieces > 2 else 0
+        return self._max_pieces
+
+    def _table(self, signature: Signature):
+        if signature not in self._tables:
+            path = os.path.join(self._directory, table_name(signature))
+            table = None
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    table = Indexer(signature, self._size), mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._tables[signature] = table
+        return self._tables[signature]
+
+    def probe(self, position: Position, side: int) -> tuple[int, int] | None:
+        """(WIN, DRAW ou LOSS pour `side` au trait, distance en demi-coups), ou None hors des tables."""
+        if not position.get_pieces(side):
+            return LOSS, 0
+        groups = groups_of(position, side)
+        signature = tuple(len(group) for group in groups)
+        table = self._table(signature)
+        if table is None:
+            return None
+        indexer, data = table
+        return decode(data[indexer.index(groups)])
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            if table is not None:
+                table[1].close()
+        self._tables.clear()
+
+
+def signatures(pieces: int) -> list[Signature]:
+    """Matériels d'exactement `pieces` pièces, au moins une de chaque camp."""
+    return [signature for signature in product(range(pieces), repeat=4)
+            if sum(signature) == pieces and signature[0] + signature[1] and signature[2] + signature[3]]
+
+
+def _successors(task) -> tuple[array, array, array, array, array]:
+    """Coups des positions [start, stop) d'une table.
+
+    Pour chaque position : gain le plus court par un coup vers une autre table (0 sans), perte
+    encore possible (aucun coup vers une autre table ne perd ou ne fait nulle pour l'adversaire),
+    distance de cette perte d'après ces coups, nombre de coups qui restent dans les tables résolues
+    ensemble (0xFFFF pour une position impossible), puis la liste de ces coups.
+    """
+    directory, size, signature, offsets, start, stop = task
+    tablebase = Tablebase(directory, size)
+    indexer = Indexer(signature, size)
+    indexers = {sig: Indexer(sig, size) for sig in offsets}
+    best_win, can_lose, longest, counts, targets = array("H"), array("B"), array("H"), array("H"), array("I")
+    for index in range(start, stop):
+        position = indexer.position(index, size)
+        if position is None:
+            best_win.append(0), can_lose.append(0), longest.append(0), counts.append(0xFFFF)
+            continue
+        # sans coup, la position est perdue tout de suite : perte en 0
+        win, lose, loss_distance, count = 0, 1, 0, 0
+        for move in position.legal_moves(WHITE):
+            child = position.play(move)
+            groups = groups_of(child, BLACK)
+            child_signature = tuple(len(group) for group in groups)
+            # ni prise ni promotion : le matériel ne change pas, la position est dans la table symétrique
+            if child_signature in offsets:
+                targets.append(offsets[child_signature] + indexers[child_signature].index(groups))
+                count += 1
+                continue
+            entry = tablebase.probe(child, BLACK)
+            if entry is None:
+                raise FileNotFoundError(f"missing table {table_name(child_signature)} in {directory}")
+            result, distance = entry
+            if result == LOSS:
+                win = distance + 1 if not win else min(win, distance + 1)
+                lose = 0
+            elif result == DRAW:
+                lose = 0
+            else:
+                loss_distance = max(loss_distance, distance + 1)
+        best_win.append(win), can_lose.append(lose), longest.append(loss_distance), counts.append(count)
+    tablebase.close()
+    return best_win, can_lose, longest, counts, targets
+
+
+def _ranges(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """Concaténation des intervalles [starts[i], stops[i])."""
+    lengths = stops - starts
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(lengths.sum()) - offsets
+
+
+def propagate(best_win: np.ndarray, can_lose: np.ndarray, longest: np.ndarray, counts: np.ndarray,
+              targets: np.ndarray) -> np.ndarray:
+    """Analyse rétrograde des positions résolues ensemble (tableaux de _successors mis bout à bout) ;
+    renvoie l'octet de chaque position.
+
+    Les positions sont résolues par couches de distance croissante. Une position résolue à la
+    distance d ne rend ses prédécesseurs gagnants qu'en d + 1 et perdants qu'en au moins d + 1 :
+    toute la couche d est connue avant d'être traitée et se traite d'un bloc avec NumPy.
+    """
+    total = len(counts)
+    valid = counts != 0xFFFF
+    remaining = np.where(valid, counts, 0).astype(np.int32)
+    longest = longest.astype(np.int32)
+    can_lose = can_lose.astype(bool)
+
+    # prédécesseurs de chaque position, au format CSR
+    sources = np.repeat(np.arange(total, dtype=np.uint32), remaining)
+    predecessors = sources[np.argsort(targets, kind="stable")]
+    first = np.zeros(total + 1, dtype=np.int64)
+    np.cumsum(np.bincount(targets, minlength=total), out=first[1:])
+
+    # distance à laquelle chaque position sera résolue, et avec quel résultat
+    unresolved = np.iinfo(np.int32).max
+    candidate = np.full(total, unresolved, dtype=np.int32)
+    result = np.zeros(total, dtype=np.int8)
+    wins = valid & (best_win > 0)
+    candidate[wins], result[wins] = best_win[wins], WIN
+    losses = valid & (remaining == 0) & can_lose & ~wins
+    candidate[losses], result[losses] = longest[losses], LOSS
+
+    values = np.zeros(total, dtype=np.uint8)
+    resolved = np.zeros(total, dtype=bool)
+    pending = np.flatnonzero(candidate != unresolved)
+    while len(pending):
+        distance = candidate[pending].min()
+        # une position peut y être deux fois, si un gain plus court a remplacé son premier candidat
+        layer = np.unique(pending[candidate[pending] == distance])
+        pending = pending[candidate[pending] != distance]
+        resolved[layer] = True
+        capped = min(distance, MAX_DISTANCE)
+        values[layer] = np.where(result[layer] == WIN, capped, LOSS_FLAG + capped)
+
+        # une position perdue rend gagnants tous ses prédécesseurs
+        lost = layer[result[layer] == LOSS]
+        parents = predecessors[_ranges(first[lost], first[lost + 1])]
+        parents = np.unique(parents[~resolved[parents] & (candidate[parents] > distance + 1)])
+        candidate[parents], result[parents] = distance + 1, WIN
+        pending = np.concatenate((pending, parents))
+
+        # une position gagnée retire un coup à chacun de ses prédécesseurs, perdants une fois tous retirés
+        won = layer[result[layer] == WIN]
+        parents = predecessors[_ranges(first[won], first[won + 1])]
+        parents, moves = np.unique(parents[~resolved[parents]], return_counts=True)
+        remaining[parents] -= moves
+        longest[parents] = np.maximum(longest[parents], distance + 1)
+        lost = parents[(remaining[parents] == 0) & can_lose[parents] & (candidate[parents] == unresolved)]
+        candidate[lost], result[lost] = longest[lost], LOSS
+        pending = np.concatenate((pending, lost))
+    return values
+
+
+def solve(signature: Signature, directory: str, size: int, pool: ProcessPoolExecutor, workers: int) -> None:
+    """Résout `signature` et sa table symétrique ensemble, les coups sans prise ni promotion de
+    l'une menant à l'autre."""
+    tables = [signature] if flip(signature) == signature else [signature, flip(signature)]
+    offsets, total = {}, 0
+    for table in tables:
+        offsets[table] = total
+        total += Indexer(table, size).size
+
+    tasks = []
+    for table in tables:
+        table_size = Indexer(table, size).size
+        chunk = max(1, -(-table_size // (workers * 4)))
+        tasks += [(directory, size, table, offsets, start, min(start + chunk, table_size))
+                  for start in range(0, table_size, chunk)]
+
+    best_win, can_lose, longest, counts, targets = array("H"), array("B"), array("H"), array("H"), array("I")
+    for chunk in pool.map(_successors, tasks):
+        for merged, part in zip((best_win, can_lose, longest, counts, targets), chunk):
+            merged.extend(part)
+
+    values = propagate(np.frombuffer(best_win, dtype=np.uint16), np.frombuffer(can_lose, dtype=np.uint8),
+                       np.frombuffer(longest, dtype=np.uint16), np.frombuffer(counts, dtype=np.uint16),
+                       np.frombuffer(targets, dtype=np.uint32))
+
+    for table in tables:
+        start = offsets[table]
+        path = os.path.join(directory, table_name(table))
+        with open(path + ".tmp", "wb") as file:
+            file.write(values[start:start + Indexer(table, size).size].tobytes())
+        os.replace(path + ".tmp", path)
+
+
+def generate(pieces: int, directory: str = TABLEBASE_PATH, size: int = GRID_SIZE, workers: int | None = None) -> None:
+    """Toutes les tables jusqu'à `pieces` pièces ; celles déjà présentes sont gardées."""
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count()
+    # les prises mènent à moins de pièces, les promotions à moins de pions : ces tables passent avant
+    order = sorted((signature for count in range(2, pieces + 1) for signature in signatures(count)),
+                   key=lambda signature: (sum(signature), signature[0] + signature[2], signature))
+    with ProcessPoolExecutor(workers) as pool:
+        for signature in order:
+            if os.path.exists(os.path.join(directory, table_name(signature))):
+                continue
+            start = perf_counter()
+            solve(signature, directory, size, pool, workers)
+            print(f"{table_name(signature)}: {Indexer(signature, size).size} positions, "
+                  f"{perf_counter() - start:.1f}s", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases by retrograde analysis.")
+    parser.add_argument("--pieces", type=int, default=3)
+    parser.add_argument("--output", default=TABLEBASE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    generate(args.pieces, args.output, GRID_SIZE, args.workers)
+
+
+if __name__ == "__main__":
+    main()
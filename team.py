@@ -4,3 +4,7 @@ from enum import Enum
 class Team(Enum):
     WHITE = "White"
     BLACK = "Black"
+
+
+def other_team(team: Team) -> Team:
+    return Team.BLACK if team is Team.WHITE else Team.WHITE
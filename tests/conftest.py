@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# les modules du jeu sont à la racine du dépôt, sans paquet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_state():
+    """État de recherche (comme AI.get_state) pour `strategy` jouant `team` sur la position `init`."""
+    from board import Board
+    from player import AI, Player
+    from team import Team, other_team
+
+    def make(strategy, init: str = "20b10.20w", team: Team = Team.WHITE) -> dict:
+        ai = AI(0, "ai", team, strategy)
+        return {"board": Board(10, init), "self_player": ai, "enemy_player": Player(1, "enemy", other_team(team)),
+                "current_player": ai}
+
+    return make
@@ -0,0 +1,63 @@
+import json
+
+from analyse import Progress, analyse, checkpoint_path, read_positions, resume_progress, save_checkpoint
+
+INPUT = """# positions
+20b10.20w
+11b.4b.b.3b4.w.w.2w.4w.3w.8w b
+
+5.W9.w10.b5.B9.b7. w
+36.b3.b4.w4.
+20b10.19w
+"""
+ENGINE = {"max_depth": 2, "tt_size_mb": 1}
+
+
+def read_results(path) -> list[dict]:
+    with open(path) as file:
+        return sorted((json.loads(line) for line in file), key=lambda result: result["index"])
+
+
+def test_read_positions():
+    assert list(read_positions(INPUT.splitlines())) == [
+        (0, "20b10.20w", "w"), (1, "11b.4b.b.3b4.w.w.2w.4w.3w.8w", "b"), (2, "5.W9.w10.b5.B9.b7.", "w"),
+        (3, "36.b3.b4.w4.", "w"), (4, "20b10.19w", "w")]
+
+
+def test_progress():
+    progress = Progress()
+    for index in (2, 0, 3):
+        progress.add(index)
+    assert (progress.next, progress.done) == (1, {2, 3})
+    progress.add(1)
+    assert (progress.next, progress.done) == (4, set())
+    assert 3 in progress and 4 not in progress
+
+
+def test_analyse(tmp_path):
+    output = str(tmp_path / "analysis.jsonl")
+    assert analyse(INPUT.splitlines(), output, ENGINE, workers=2, max_pending=2) == 5
+    results = read_results(output)
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[0]["depth"] == 2 and results[0]["pv"].startswith(results[0]["move"])
+    assert results[1]["side"] == "b"
+    assert results[3]["move"] is None
+    assert "error" in results[4]
+    with open(checkpoint_path(output)) as file:
+        assert json.load(file)["next"] == 5
+
+
+def test_resume_skips_done_positions_and_drops_a_torn_line(tmp_path):
+    output = tmp_path / "analysis.jsonl"
+    lines = [json.dumps({"index": index}) + "\n" for index in (0, 2, 1)]
+    output.write_text(lines[0])
+    save_checkpoint(checkpoint_path(str(output)), Progress(1), len(lines[0]))
+    # résultats écrits après le point de reprise, puis une ligne coupée par l'arrêt
+    with open(output, "a") as file:
+        file.write(lines[1] + lines[2] + '{"index": 3, "mo')
+    progress = resume_progress(str(output))
+    assert (progress.next, progress.done) == (3, set())
+    assert output.read_text() == "".join(lines)
+
+    assert analyse(INPUT.splitlines(), str(output), ENGINE, resume=True) == 2
+    assert [result["index"] for result in read_results(output)] == [0, 1, 2, 3, 4]
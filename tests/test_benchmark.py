@@ -0,0 +1,34 @@
+import copy
+
+from benchmark import compare, run
+from team import Team
+
+POSITIONS = [("start", "20b10.20w", Team.WHITE, 3), ("kings-endgame", "5.W9.w10.b5.B9.b7.", Team.WHITE, 3)]
+
+
+def test_run_reports_every_position():
+    results = run(POSITIONS, tt_size_mb=1)
+    for name, _, _, depth in POSITIONS:
+        result = results["positions"][name]
+        assert result["depth"] == depth
+        assert result["nodes"] > 0
+        assert list(result["time_to_depth"]) == [str(d) for d in range(1, depth + 1)]
+        # table de transposition exclue : bien moins que ses 1 Mo
+        assert 0 < result["search_memory"] < 1024 * 1024
+    assert results["total"]["nodes"] == sum(r["nodes"] for r in results["positions"].values())
+
+
+def test_search_is_deterministic():
+    first = run(POSITIONS[:1], tt_size_mb=1, memory=False)
+    second = run(POSITIONS[:1], tt_size_mb=1, memory=False)
+    assert first["positions"]["start"]["nodes"] == second["positions"]["start"]["nodes"]
+    assert "search_memory" not in first["positions"]["start"]
+
+
+def test_compare_flags_regressions():
+    baseline = run(POSITIONS[:1], tt_size_mb=1, memory=False)
+    assert compare(baseline, baseline) == []
+    slower = copy.deepcopy(baseline)
+    slower["positions"]["start"]["nps"] *= 0.5
+    assert compare(baseline, slower) == ["start"]
+    assert compare(baseline, slower, threshold=0.6) == []
@@ -0,0 +1,60 @@
+import random
+
+from bitboard import START_POSITION, Position
+from board import Board
+from player import Player
+from team import Team
+
+
+def play_random_game(seed: int, plies: int = 60):
+    rng = random.Random(seed)
+    board = Board(10, START_POSITION)
+    team = Team.WHITE
+    for _ in range(plies):
+        yield board, team
+        moves = [move for _, case_moves in board.find_cases_who_can_play(Player(0, "", team)) for move in case_moves]
+        if not moves:
+            return
+        Player(0, "", team).play_move(board, rng.choice(moves))
+        team = Team.BLACK if team is Team.WHITE else Team.WHITE
+
+
+def test_start_position():
+    position = Position.from_string(START_POSITION)
+    assert position.count(0) == position.count(1) == 20
+    assert len(position.legal_moves(0)) == len(position.legal_moves(1)) == 9
+    assert position.to_string() == START_POSITION
+
+
+def test_board_moves_match_bitboard():
+    for seed in range(5):
+        for board, team in play_random_game(seed):
+            position = board.get_position()
+            side = 0 if team is Team.WHITE else 1
+            square_of = position.get_geometry().square_of
+            board_moves = sorted((tuple(square_of(c) for c in move["move_path"]),
+                                  tuple(square_of(c) for c in move["eaten_pieces"]))
+                                 for _, moves in board.find_cases_who_can_play(Player(0, "", team)) for move in moves)
+            assert sorted((path[:1] + path[-1:], captured) for path, captured in position.legal_moves(side)) \
+                == sorted((path[:1] + path[-1:], captured) for path, captured in board_moves)
+
+
+def test_hash_follows_moves():
+    for board, _ in play_random_game(7):
+        position = board.get_position()
+        assert position.get_hash() == Position.from_string(position.to_string()).get_hash()
+
+
+def test_king_captures_from_a_distance():
+    # dame blanche en 46, pion noir en 28 sur la grande diagonale : la prise est obligatoire
+    position = Position.from_string("27.b17.W4.")
+    assert position.legal_moves(0) and all(captured == (27,) for _, captured in position.legal_moves(0))
+
+
+def test_invalid_init_string():
+    for init in ("20b10.20x", "20b10.19w"):
+        try:
+            Position.from_string(init)
+        except ValueError:
+            continue
+        raise AssertionError(init)
@@ -0,0 +1,60 @@
+from random import Random
+
+from board import Board
+from case import PlayableCase
+from piece import Queen
+from player import Player
+from team import Team, other_team
+
+
+def scan(board: Board, condition) -> list:
+    """Parcours de toute la grille, la référence des index."""
+    return sorted((case for case in board.get_cases(lambda case: isinstance(case, PlayableCase) and condition(case))),
+                  key=lambda case: case.get_square())
+
+
+def test_indexes_match_a_grid_scan():
+    rng = Random(8)
+    board = Board(10, "20b10.20w")
+    team = Team.WHITE
+    for _ in range(60):
+        for side in (Team.WHITE, Team.BLACK):
+            assert board.get_pieces_of_team(side) == scan(board, lambda case: case.contains_piece_of_team(side))
+            assert board.count_pieces(side) == len(board.get_pieces_of_team(side))
+            assert board.count_kings(side) == len(scan(board, lambda case: case.contains_piece_of_team(side)
+                                                              and isinstance(case.get_piece(), Queen)))
+            assert board.count_men(side) + board.count_kings(side) == board.count_pieces(side)
+        player = Player(0, "", team)
+        moves = [move for _, case_moves in board.find_cases_who_can_play(player) for move in case_moves]
+        if not moves:
+            break
+        player.play_move(board, rng.choice(moves))
+        team = other_team(team)
+
+
+def test_selection_and_landing_marks():
+    board = Board(10, "20b10.20w")
+    player = Player(0, "", Team.WHITE)
+    start, moves = board.find_cases_who_can_play(player)[0]
+    start.set_can_play(moves)
+    player.on_click(board, start.get_coordinates())
+    assert board.get_selected_case() is start
+    assert scan(board, PlayableCase.is_selected) == [start]
+    for path in player.get_possible_moves():
+        board.get_playable_case(path[-1]).set_can_land(True)
+    assert board.get_landing_cases()
+    assert sorted(board.get_landing_cases(), key=PlayableCase.get_square) == scan(board, PlayableCase.can_land)
+
+    player.deselect_case()
+    player.clear_possible_moves(board)
+    assert board.get_selected_case() is None
+    assert board.get_landing_cases() == scan(board, PlayableCase.can_land) == []
+
+
+def test_cases_are_views_of_the_position():
+    board = Board(10, "20b10.20w")
+    case = board.get_case_of_square(25)
+    assert case.get_piece() is None
+    board.get_position().set_piece(25, 1)
+    assert isinstance(case.get_piece(), Queen) and case.get_piece().get_team() is Team.WHITE
+    assert board.get_pieces_of_team(Team.WHITE)[0] is case
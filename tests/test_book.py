@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from book import BookBuilder, OpeningBook, import_pdn, parse_pdn, replay
+from board import Board
+from team import Team
+
+# cases numérotées de 1 à 50
+PDN = """[Event "a"]
+1. 32-28 19-23 2. 28x19 14x23 1-0
+[Event "b"] {commentaire} 1. 32-28 (1. 33-28) 18-23 0-1
+[Event "c"] [FEN "W:W31:B20"] 1. 31-26 2-0
+[Event "d"] 1. 31-26 *
+"""
+
+
+def test_parse_pdn():
+    games = list(parse_pdn(PDN))
+    assert games == [(["32-28", "19-23", "28x19", "14x23"], 1.0), (["32-28", "18-23"], 0.0)]
+
+
+def test_replay_stops_at_illegal_move():
+    record = replay(["32-28", "19-23", "28x19", "14x23"])
+    assert [move for _, _, move in record] == [31 << 6 | 27, 18 << 6 | 22, 27 << 6 | 18, 13 << 6 | 22]
+    assert [side for _, side, _ in record] == [0, 1, 0, 1]
+    # 19 est occupée : la prise 28x19 est impossible
+    assert len(replay(["32-28", "18-23", "28x19"])) == 2
+
+
+def test_write_and_probe(tmp_path):
+    record = replay(["32-28", "18-23"])
+    builder = BookBuilder()
+    builder.add_game(record, 1.0)
+    builder.add_game(record, 0.5)
+    builder.add_game(record, 1.0, first_ply=1)
+    path = str(tmp_path / "book.bin")
+    builder.write(path)
+
+    book = OpeningBook(path)
+    assert book.get_size() == 2
+    (key, _, move), (black_key, _, black_move) = record
+    # deux parties pour le coup des blancs (1 et 1/2), trois pour celui des noirs (0, 1/2, 0)
+    assert book.probe(key) == [(move, 2, 0.75)]
+    assert book.probe(black_key) == [(black_move, 3, 1 / 6)]
+    assert book.probe(key + 1) == []
+    book.close()
+
+
+def test_choose_move_filters_by_margin_and_legality(tmp_path):
+    board = Board(10, "20b10.20w")
+    key = board.get_position().hash_key(0)
+    builder = BookBuilder()
+    for _ in range(3):
+        builder.add(key, 31 << 6 | 27, 2)       # 32-28 : toujours gagné
+    builder.add(key, 32 << 6 | 27, 0)           # 33-28 : perdu, hors marge
+    builder.add(key, 0 << 6 | 5, 2)             # coup impossible (collision de hash)
+    path = str(tmp_path / "book.bin")
+    builder.write(path)
+
+    book = OpeningBook(path, rng=random.Random(1))
+    coordinates = board.get_position().get_geometry().coordinates
+    for _ in range(10):
+        assert book.choose_move(board, Team.WHITE) == (coordinates[31], coordinates[27])
+    assert book.choose_move(board, Team.BLACK) is None
+    assert OpeningBook(path, min_games=4).choose_move(board, Team.WHITE) is None
+
+
+def test_merge_and_import(tmp_path):
+    pdn = tmp_path / "games.pdn"
+    pdn.write_text(PDN)
+    builder = BookBuilder()
+    assert import_pdn(builder, str(pdn)) == 2
+    path = str(tmp_path / "book.bin")
+    builder.write(path)
+
+    merged = BookBuilder()
+    merged.merge(path)
+    merged.merge(path)
+    merged.write(path)
+    entries = list(OpeningBook(path).get_entries())
+    assert len(entries) == len(builder)
+    key, move, games, points = entries[0]
+    assert games % 2 == 0 and points % 2 == 0
+
+
+def test_not_a_book(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTABOOK" + bytes(32))
+    with pytest.raises(ValueError):
+        OpeningBook(str(path)).get_size()
+    assert OpeningBook(str(tmp_path / "missing.bin")).probe(1) == []
@@ -0,0 +1,98 @@
+from random import Random
+
+import pytest
+
+from bitboard import BLACK, WHITE, Position, get_geometry
+
+
+def brute_force_captures(position: Position, side: int) -> set:
+    """Rafles maximales sans aucun élagage : (départ, arrivée, pièces prises) de chaque rafle."""
+    geometry = position.get_geometry()
+    opponents = position.get_pieces(1 - side)
+    sequences = []
+
+    def explore(start, current, is_king, occupied, captured):
+        extended = False
+        for direction in range(4):
+            ray = geometry.rays[current][direction]
+            # pion : la pièce adjacente seulement ; dame : la première pièce de la diagonale
+            index = 0
+            while is_king and index < len(ray) and not (occupied >> ray[index]) & 1:
+                index += 1
+            if index >= len(ray):
+                continue
+            victim = ray[index]
+            if not (opponents >> victim) & 1 or victim in captured:
+                continue
+            for landing in geometry.rays[victim][direction]:
+                if (occupied >> landing) & 1:
+                    break
+                extended = True
+                explore(start, landing, is_king, occupied, captured + (victim,))
+                if not is_king:
+                    break
+        if not extended and captured:
+            sequences.append((start, current, frozenset(captured)))
+
+    for square in range(geometry.squares):
+        code = position.get_piece(square)
+        if code is not None and code // 2 == side:
+            explore(square, square, bool(code % 2), position.get_occupied() & ~(1 << square), ())
+    if not sequences:
+        return set()
+    best = max(len(captured) for _, _, captured in sequences)
+    return {sequence for sequence in sequences if len(sequence[2]) == best}
+
+
+def solver_captures(position: Position, side: int) -> set:
+    return {(path[0], path[-1], frozenset(captured)) for path, captured in position.captures(side)}
+
+
+def random_position(rng: Random) -> Position:
+    position = Position(10)
+    for square in rng.sample(range(get_geometry(10).squares), rng.randint(4, 22)):
+        position.set_piece(square, rng.choices(range(4), weights=(4, 1, 4, 1))[0])
+    return position
+
+
+@pytest.mark.parametrize("init", [
+    "20b10.20w",
+    "11b.4b.b.3b4.w.w.2w.4w.3w.8w",
+    ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w.",
+    "3.b4.b3.2b.b5.w5.w2.w5.2w3.w2.w3.B.",
+    # dame blanche au milieu de pions noirs épars : rafles longues, plusieurs chemins
+    "11.b.b2.b4.2b4.W3.2b5.b2.b8.",
+])
+def test_fixed_positions(init):
+    position = Position.from_string(init, 10)
+    for side in (WHITE, BLACK):
+        assert solver_captures(position, side) == brute_force_captures(position, side)
+
+
+def test_random_positions():
+    rng = Random(7)
+    for _ in range(300):
+        position = random_position(rng)
+        for side in (WHITE, BLACK):
+            assert solver_captures(position, side) == brute_force_captures(position, side)
+
+
+def test_no_duplicate_sequences():
+    rng = Random(11)
+    for _ in range(100):
+        position = random_position(rng)
+        moves = [(path[0], path[-1], frozenset(captured)) for path, captured in position.captures(WHITE)]
+        assert len(moves) == len(set(moves))
+
+
+def test_upper_bound():
+    rng = Random(3)
+    for _ in range(100):
+        position = random_position(rng)
+        solver = position.get_geometry().capture_solver
+        for side in (WHITE, BLACK):
+            captures = position.captures(side)
+            if captures:
+                assert len(captures[0][1]) <= solver.upper_bound(position, side)
+                square = captures[0][0][0]
+                assert len(captures[0][1]) <= solver.upper_bound(position, side, square)
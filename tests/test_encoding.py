@@ -0,0 +1,66 @@
+from random import Random
+
+import pytest
+
+from bitboard import BLACK, WHITE, Position, get_geometry
+from board import Board
+from player import Player
+from team import Team
+
+
+def random_position(rng: Random, size: int = 10) -> Position:
+    position = Position(size)
+    for square in rng.sample(range(get_geometry(size).squares), rng.randint(0, 30)):
+        position.set_piece(square, rng.randrange(4))
+    return position
+
+
+def test_binary_round_trip():
+    rng = Random(2)
+    for _ in range(200):
+        position = random_position(rng)
+        for side in (WHITE, BLACK):
+            data = position.encode(side)
+            assert len(data) == get_geometry(10).packed_size == 26
+            decoded, decoded_side = Position.decode(data)
+            assert decoded_side == side
+            assert decoded.to_string() == position.to_string()
+            assert decoded.get_hash() == position.get_hash()
+
+
+def test_encoding_is_a_key():
+    position = Position.from_string("20b10.20w", 10)
+    assert position.encode(WHITE) != position.encode(BLACK)
+    assert position.encode(WHITE) == Position.from_string(position.to_string(), 10).encode(WHITE)
+
+
+def test_string_round_trip():
+    rng = Random(3)
+    for size in (8, 10):
+        for _ in range(100):
+            position = random_position(rng, size)
+            assert Position.from_string(position.to_string(), size).encode(WHITE) == position.encode(WHITE)
+    assert Position.from_string("20b10.20w", 10).to_string() == "20b10.20w"
+
+
+@pytest.mark.parametrize("init", ["19b10.20w", "20b10.20wx", "20b10.20w.", "b"])
+def test_invalid_init_string(init):
+    with pytest.raises(ValueError):
+        Position.from_string(init, 10)
+
+
+def test_board_bytes():
+    board = Board(10, ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w.")
+    copy, team = Board.from_bytes(board.encode(Team.BLACK))
+    assert team is Team.BLACK
+    assert str(copy) == str(board)
+
+    other = Board(10, "20b10.20w")
+    moves = other.find_cases_who_can_play(Player(0, "", Team.WHITE))
+    assert other.load(board.encode(Team.WHITE)) is Team.WHITE
+    assert str(other) == str(board)
+    # le plateau rechargé ne garde rien de l'ancienne position
+    assert other.find_cases_who_can_play(Player(0, "", Team.WHITE)) is not moves
+    for coordinates in get_geometry(10).coordinates:
+        piece, expected = other.get_case(coordinates).get_piece(), board.get_case(coordinates).get_piece()
+        assert (piece and piece.get_team(), type(piece)) == (expected and expected.get_team(), type(expected))
@@ -0,0 +1,95 @@
+import io
+import time
+
+import pytest
+
+from engine import Engine, run
+from strategy import MiniMax
+
+
+@pytest.fixture
+def engine():
+    output = io.StringIO()
+    engine = Engine(output, MiniMax(max_depth=100, tt_size_mb=1))
+    yield engine
+    engine.stop()
+
+
+def lines(engine: Engine) -> list[str]:
+    return engine._output.getvalue().splitlines()
+
+
+def test_hub_pos_board(engine):
+    engine.handle("hub")
+    engine.handle("board")
+    engine.handle("pos init=5.W9.w10.b5.B9.b7. side=b")
+    engine.handle("board")
+    engine.handle("pos start")
+    engine.handle("board")
+    assert lines(engine) == ["id name=jeu-de-dames size=10", "wait", "board init=20b10.20w side=w",
+                             "board init=5.W9.w10.b5.B9.b7. side=b", "board init=20b10.20w side=w"]
+
+
+def test_rejected_commands_leave_the_state_unchanged(engine):
+    engine.handle("pos init=20b10.20w side=b")
+    for command in ("pos init=20b10.19w side=w", "pos side=x", "move 32-27", "move 1-2", "move 12", "frobnicate"):
+        engine.handle(command)
+    engine.handle("board")
+    output = lines(engine)
+    assert all(line.startswith("error ") for line in output[:-1])
+    assert len(output) == 7
+    assert output[-1] == "board init=20b10.20w side=b"
+
+
+def test_moves(engine):
+    engine.handle("move 32-28 19-23 28x19")
+    engine.handle("board")
+    assert lines(engine) == ["board init=18bwb10.w.18w side=b"]
+    # la suite entière est refusée si un coup est illégal
+    engine.handle("move 14x23 46-41")
+    engine.handle("board")
+    assert lines(engine)[-2].startswith("error illegal move")
+    assert lines(engine)[-1] == "board init=18bwb10.w.18w side=b"
+
+
+def test_go_depth(engine):
+    engine.handle("go depth=3")
+    engine.wait()
+    output = lines(engine)
+    assert [line.split()[1] for line in output[:-1]] == ["depth=1", "depth=2", "depth=3"]
+    assert output[-1].startswith("done move=") and "depth=3" in output[-1]
+    # le pv de chaque ligne info commence par le coup choisi à cette profondeur
+    move = output[-1].split()[1].removeprefix("move=")
+    assert output[-2].split('pv="')[1].startswith(move)
+
+
+def test_capture_in_pv(engine):
+    engine.handle("move 32-28 19-23")
+    engine.handle("go depth=2")
+    engine.wait()
+    assert lines(engine)[-1].startswith("done move=28x19")
+    assert 'pv="28x19 ' in lines(engine)[-2]
+
+
+def test_go_infinite_ping_stop(engine):
+    engine.handle("go infinite")
+    time.sleep(0.2)
+    engine.handle("ping")
+    assert lines(engine)[-1] == "pong"
+    engine.handle("pos start")
+    assert lines(engine)[-1] == "error search in progress, send stop first"
+    engine.handle("stop")
+    assert lines(engine)[-1].startswith("done move=")
+
+
+def test_no_moves(engine):
+    engine.handle("pos init=36.b3.b4.w4. side=w")
+    engine.handle("go depth=3")
+    assert lines(engine) == ["done move=none"]
+
+
+def test_run_reads_until_quit():
+    output = io.StringIO()
+    run(io.StringIO("hub\nmove 32-28\nboard\nquit\nboard\n"), output)
+    assert output.getvalue().splitlines() == ["id name=jeu-de-dames size=10", "wait",
+                                              "board init=20b7.w2.w.18w side=b"]
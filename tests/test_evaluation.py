@@ -0,0 +1,79 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from bitboard import BLACK, FORWARD, WHITE, Position, get_geometry, iter_bits
+from evaluation import FEATURES, evaluate_batch, planes, side_features
+from strategy import MiniMax
+
+
+def scalar_features(position: Position, side: int) -> list[int]:
+    """Caractéristiques d'un camp, case par case, sans NumPy."""
+    geometry = position.get_geometry()
+    size = geometry.size
+    occupied = position.get_occupied()
+    men, kings = position.get_men(side), position.get_kings(side)
+    result = dict.fromkeys(FEATURES, 0)
+    for square in iter_bits(men | kings):
+        x, y = geometry.coordinates[square]
+        is_man = bool((men >> square) & 1)
+        result["material"] += 1
+        result["kings"] += not is_man
+        result["centre"] += 2 <= x <= size - 3 and 3 <= y <= size - 4
+        directions = FORWARD[side] if is_man else range(4)
+        result["mobility"] += sum(1 for direction in directions
+                                  if geometry.neighbours[square][direction] is not None
+                                  and not (occupied >> geometry.neighbours[square][direction]) & 1)
+        if is_man:
+            result["advancement"] += size - 1 - y if side == WHITE else y
+            result["back_rank"] += y == (size - 1 if side == WHITE else 0)
+    return [int(result[name]) for name in FEATURES]
+
+
+def random_positions(count: int, seed: int) -> list[Position]:
+    rng = Random(seed)
+    positions = []
+    for _ in range(count):
+        position = Position(10)
+        for square in rng.sample(range(get_geometry(10).squares), rng.randint(1, 40)):
+            position.set_piece(square, rng.randrange(4))
+        positions.append(position)
+    return positions
+
+
+def test_batch_matches_scalar_features():
+    positions = random_positions(200, 1)
+    per_side = side_features(planes(positions))
+    for position, features in zip(positions, per_side):
+        assert features[WHITE].tolist() == scalar_features(position, WHITE)
+        assert features[BLACK].tolist() == scalar_features(position, BLACK)
+
+
+def test_evaluate_batch_is_white_minus_black():
+    positions = random_positions(50, 2)
+    weights = np.array([100, 200, 2, 5, 3, 1])
+    expected = [np.dot(np.subtract(scalar_features(p, WHITE), scalar_features(p, BLACK)), weights) for p in positions]
+    assert evaluate_batch(planes(positions), weights).tolist() == expected
+
+
+def test_evaluate_positions_matches_evaluate(make_state):
+    strategy = MiniMax(max_depth=1, tt_size_mb=1)
+    state = make_state(strategy, ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w.")
+    children = []
+    expected = []
+    for child, _ in strategy.get_childs(state):
+        children.append(child["board"].get_position().copy())
+        expected.append(strategy.evaluate(child))
+    # enfants : noirs au trait, vus des blancs
+    assert strategy.evaluate_positions(children, BLACK, WHITE).tolist() == expected
+
+
+@pytest.mark.parametrize("init", ["20b10.20w", "11b.4b.b.3b4.w.w.2w.4w.3w.8w", "5.W9.w10.b5.B9.b7."])
+def test_batched_leaves_give_the_same_search(make_state, init):
+    results = []
+    for batch_leaves in (False, True):
+        strategy = MiniMax(max_depth=4, tt_size_mb=1, batch_leaves=batch_leaves, quiescence=False)
+        strategy.choose_move(make_state(strategy, init))
+        results.append([iteration["score"] for iteration in strategy.iterations])
+    assert results[0] == results[1]
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+pytest.importorskip("pygame")
+
+from game import Game  # noqa: E402
+from strategy import MiniMax  # noqa: E402
+
+
+@pytest.fixture
+def make_game():
+    games = []
+
+    def make(init_board: str) -> Game:
+        game = Game(init_board=init_board, ponder=False)
+        game.get_player2().strategy = MiniMax(max_depth=2, tt_size_mb=1)
+        game.get_player2().book = None
+        games.append(game)
+        return game
+
+    yield make
+    for game in games:
+        game._worker.cancel()
+
+
+def click_move(game: Game, move: dict) -> None:
+    player, board = game._current_player, game.get_board()
+    player.on_click(board, move["move_path"][0])
+    game.render()
+    assert player.on_click(board, move["move_path"][-1])
+    game.record_move(player)
+    game.switch_current_player()
+    game.render()
+
+
+def test_undo_and_redo_across_the_end_of_the_game(make_game):
+    # le pion blanc prend le dernier pion noir
+    game = make_game("22.b4.w22.")
+    game.render()
+    board = game.get_board()
+    move = next(move for _, moves in board.find_cases_who_can_play(game.get_player1()) for move in moves)
+    click_move(game, move)
+    player1, player2 = game.get_player1(), game.get_player2()
+    assert game._winner is player1
+    assert (player1._points, player2._points) == (1, -1)
+
+    game.undo()
+    assert game._winner is None
+    assert (player1._points, player2._points) == (0, 0)
+    assert game._current_player is player1
+
+    game.redo()
+    assert game._winner is player1
+    assert (player1._points, player2._points) == (1, -1)
+    # partie finie : pas de recherche lancée pour l'IA
+    assert not game._worker.is_thinking()
+
+
+@pytest.fixture
+def display_calls(monkeypatch):
+    """Appels à pg.display.flip (None) et pg.display.update (liste des zones redessinées)."""
+    import pygame as pg
+
+    calls = []
+    monkeypatch.setattr(pg.display, "flip", lambda: calls.append(None))
+    monkeypatch.setattr(pg.display, "update", lambda rects: calls.append(list(rects)))
+    return calls
+
+
+def test_render_sends_only_changed_squares(make_game, display_calls):
+    game = make_game("20b10.20w")
+    game.render()
+    assert display_calls == [None]
+    # rien n'a changé : rien n'est envoyé à l'écran
+    game.render()
+    assert display_calls == [None]
+
+    player, board = game.get_player1(), game.get_board()
+    move = next(move for _, moves in board.find_cases_who_can_play(player) for move in moves)
+    player.on_click(board, move["move_path"][0])
+    game.render()
+    rects = display_calls[-1]
+    # la case sélectionnée, ses cases d'arrivée et les flèches, pas tout le plateau
+    assert rects and len(rects) < len(board.get_playable_cases())
+    assert any(rect.collidepoint(game._cell_rect(move["move_path"][0]).center) for rect in rects)
+
+
+def test_finished_game_is_redrawn_in_full(make_game, display_calls):
+    game = make_game("22.b4.w22.")
+    game.render()
+    move = next(move for _, moves in game.get_board().find_cases_who_can_play(game.get_player1()) for move in moves)
+    click_move(game, move)
+    assert display_calls[-1] is None
+
+
+def test_sprites_are_cached():
+    from piece import Piece, Queen
+    from team import Team
+
+    assert Piece(Team.WHITE).get_sprite(40) is Piece(Team.WHITE).get_sprite(40)
+    assert Queen(Team.WHITE).get_sprite(40) is not Piece(Team.WHITE).get_sprite(40)
+    assert Piece(Team.BLACK).get_sprite(40) is not Piece(Team.WHITE).get_sprite(40)
@@ -0,0 +1,87 @@
+from random import Random
+
+from board import Board
+from history import GameHistory
+from player import Player
+from team import Team, other_team
+
+
+def play_random_game(rng: Random, history: GameHistory, board: Board, team: Team, plies: int) -> list[bytes]:
+    """Joue et enregistre une partie au hasard ; renvoie la forme binaire de chaque position."""
+    positions = [board.encode(team)]
+    for _ in range(plies):
+        player = Player(0, "", team)
+        moves = [move for _, case_moves in board.find_cases_who_can_play(player) for move in case_moves]
+        if not moves:
+            break
+        move = rng.choice(moves)
+        codes = [board.get_case(coordinates).get_piece().get_code() for coordinates in move["eaten_pieces"]]
+        promoted = player.play_move(board, move)
+        team = other_team(team)
+        history.record_move(board, player, move, promoted, codes)
+        positions.append(board.encode(team))
+    return positions
+
+
+def test_undo_redo_round_trip():
+    rng = Random(3)
+    for _ in range(10):
+        board = Board(10, "20b10.20w")
+        history = GameHistory(board, Team.WHITE, checkpoint_interval=7)
+        positions = play_random_game(rng, history, board, Team.WHITE, 150)
+        for index in range(len(positions) - 1, 0, -1):
+            team = history.undo(board)
+            assert board.encode(team) == positions[index - 1]
+        assert history.undo(board) is None
+        for index in range(1, len(positions)):
+            team = history.redo(board)
+            assert board.encode(team) == positions[index]
+        assert history.redo(board) is None
+
+
+def test_position_at():
+    rng = Random(4)
+    board = Board(10, "20b10.20w")
+    history = GameHistory(board, Team.WHITE, checkpoint_interval=5)
+    positions = play_random_game(rng, history, board, Team.WHITE, 80)
+    for index, expected in enumerate(positions):
+        position, side = history.position_at(index)
+        assert position.encode(side) == expected
+
+
+def test_undo_restores_captured_kings_from_the_record():
+    # 34x23x12 prend une dame et un pion : le journal seul sait lequel était une dame
+    board = Board(10, "5.b11.b10.B4.w16.")
+    history = GameHistory(board, Team.WHITE)
+    before = board.encode(Team.WHITE)
+    play_random_game(Random(0), history, board, Team.WHITE, 1)
+    assert history.undo(board) is Team.WHITE
+    assert board.encode(Team.WHITE) == before
+
+
+def test_new_move_after_undo_drops_the_rest():
+    rng = Random(5)
+    board = Board(10, "20b10.20w")
+    history = GameHistory(board, Team.WHITE, checkpoint_interval=2)
+    play_random_game(rng, history, board, Team.WHITE, 6)
+    history.undo(board)
+    history.undo(board)
+    positions = play_random_game(rng, history, board, Team.WHITE, 1)
+    assert len(history) == history.get_cursor() == 5
+    assert not history.can_redo()
+    position, side = history.position_at(5)
+    assert position.encode(side) == positions[-1]
+
+
+def test_setup_entries():
+    board = Board(10, "20b10.20w")
+    history = GameHistory(board, Team.WHITE)
+    before = board.encode(Team.WHITE)
+    board.load(Board(10, "5.W9.w10.b5.B9.b7.").encode(Team.WHITE))
+    history.record_setup(board, Team.BLACK, before)
+    after = board.encode(Team.BLACK)
+    assert history.undo(board) is Team.WHITE and board.encode(Team.WHITE) == before
+    assert history.redo(board) is Team.BLACK and board.encode(Team.BLACK) == after
+    # position inchangée : rien n'est enregistré
+    history.record_setup(board, Team.BLACK, after)
+    assert len(history) == 1
@@ -0,0 +1,38 @@
+import contextlib
+import io
+
+from strategy import MiniMax
+from team import Team
+
+MIDDLEGAME = ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w."
+
+
+def test_search_leaves_the_board_unchanged(make_state):
+    for init, team in (("20b10.20w", Team.WHITE), (MIDDLEGAME, Team.WHITE), (MIDDLEGAME, Team.BLACK)):
+        strategy = MiniMax(max_depth=4, tt_size_mb=1, batch_leaves=False, quiescence=False)
+        state = make_state(strategy, init, team)
+        before = state["board"].encode(team)
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy.choose_move(state)
+        assert state["board"].encode(team) == before
+
+
+def test_children_are_played_and_undone(make_state):
+    strategy = MiniMax(max_depth=2, tt_size_mb=1)
+    state = make_state(strategy, MIDDLEGAME)
+    board = state["board"]
+    before = board.encode(Team.WHITE)
+    seen = set()
+    with contextlib.closing(strategy.get_childs(state)) as childs:
+        for child, move in childs:
+            assert child["current_player"] is state["enemy_player"]
+            seen.add(board.encode(Team.BLACK))
+            assert board.encode(Team.WHITE) != before
+    assert board.encode(Team.WHITE) == before
+    assert len(seen) == len(board.get_position().legal_moves(0))
+
+    # un générateur fermé après le premier enfant (coupure) annule aussi son coup
+    childs = strategy.get_childs(state)
+    next(childs)
+    childs.close()
+    assert board.encode(Team.WHITE) == before
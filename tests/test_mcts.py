@@ -0,0 +1,89 @@
+import random
+from threading import Thread
+from time import perf_counter
+
+from bitboard import BLACK, WHITE, Position
+from mcts import MCTS, Node, rollout, run_playouts
+from team import Team
+from worker import stop_search
+
+
+def test_rollout():
+    rng = random.Random(0)
+    # pion blanc bloqué : les noirs gagnent sans jouer
+    assert rollout(Position.from_string("36.b3.b4.w4.", 10), WHITE, rng) == BLACK
+    # trop long : le matériel décide, une dame vaut trois pions
+    assert rollout(Position.from_string("W19.b10.b18.", 10), WHITE, rng, plies=0) == WHITE
+    assert rollout(Position.from_string("w19.b29.", 10), WHITE, rng, plies=0) is None
+
+
+def test_playout_statistics():
+    root = Node(Position.from_string("20b10.20w", 10), WHITE)
+    count, depth = run_playouts(root, random.Random(1), playouts=300)
+    assert count == root.visits == 300
+    assert sum(child.visits for child in root.children) == 300
+    assert len(root.children) == 9 and not root.untried
+    # victoires de chaque côté : celles des enfants et de la racine se complètent
+    assert sum(child.wins for child in root.children) + root.wins == 300
+    assert depth >= 2
+
+
+def test_finds_a_win_by_blocking(make_state):
+    strategy = MCTS(playouts=300, seed=2)
+    state = make_state(strategy, "37.w4.w3.wb2.")
+    start, end = strategy.choose_move(state)
+    square_of = state["board"].get_position().get_geometry().square_of
+    assert (square_of(start), square_of(end)) == (42, 38)
+    assert strategy.get_stats().score == 1.0
+
+
+def test_tree_is_reused(make_state):
+    strategy = MCTS(playouts=400, seed=3)
+    state = make_state(strategy)
+    board, ai, enemy = state["board"], state["self_player"], state["enemy_player"]
+    start, end = strategy.choose_move(state)
+    ai.play_move(board, next(move for _, moves in board.find_cases_who_can_play(ai) for move in moves
+                             if move["move_path"][0] == start and move["move_path"][-1] == end))
+    reply = strategy._root.children[0].move
+    enemy.play_move(board, board.to_paths([reply])[0])
+    root = strategy._get_root(board, WHITE)
+    assert root.visits > 0 and root.parent is None
+
+
+def test_merge_ignores_unknown_children():
+    root = Node(Position.from_string("20b10.20w", 10), WHITE)
+    root.untried = root.position.legal_moves(WHITE)
+    child = root.position.play(root.untried[0])
+    unknown = Position.from_string("5.W9.w10.b5.B9.b7.", 10)
+    total = MCTS()._merge(root, [(child.encode(BLACK), 10, 4.0), (unknown.encode(BLACK), 5, 1.0)])
+    assert total == root.visits == 10
+    assert len(root.children) == 1 and len(root.untried) == 8
+    assert (root.children[0].visits, root.children[0].wins, root.wins) == (10, 4.0, 6.0)
+
+
+def test_parallel_search_and_stop(make_state):
+    strategy = MCTS(time_limit=0.5, workers=2, seed=4)
+    try:
+        state = make_state(strategy)
+        start = perf_counter()
+        move = strategy.choose_move(state)
+        # démarrage à froid des processus compris dans le budget
+        assert perf_counter() - start < 2.0
+        assert move is not None and strategy.get_stats().playouts > 0
+
+        strategy.time_limit = 30
+        result = []
+        thread = Thread(target=lambda: result.append(strategy.choose_move(make_state(strategy))))
+        thread.start()
+        thread.join(0.3)
+        start = perf_counter()
+        stop_search(strategy, thread)
+        assert perf_counter() - start < 1.0
+        assert result and result[0] is not None
+    finally:
+        strategy.close()
+
+
+def test_no_moves(make_state):
+    strategy = MCTS(playouts=10)
+    assert strategy.choose_move(make_state(strategy, "36.b3.b4.w4.", Team.WHITE)) is None
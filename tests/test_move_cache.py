@@ -0,0 +1,53 @@
+from board import Board
+from move_cache import LegalMovesCache
+from player import Player
+from team import Team
+
+
+def test_lru_bound_and_order():
+    cache = LegalMovesCache(max_size=2)
+    cache.put(1, ["a"])
+    cache.put(2, ["b"])
+    assert cache.get(1) == ["a"]
+    cache.put(3, ["c"])
+    # 2 est la moins récemment utilisée
+    assert cache.get(2) is None
+    assert cache.get(1) == ["a"] and cache.get(3) == ["c"]
+    assert len(cache) == 2
+    assert cache.get_stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_board_reuses_moves_of_the_same_position():
+    board = Board(10, "20b10.20w")
+    white, black = Player(0, "", Team.WHITE), Player(1, "", Team.BLACK)
+    moves = board.find_cases_who_can_play(white)
+    assert board.find_cases_who_can_play(white) is moves
+    # même position, autre camp au trait : autre entrée
+    assert board.find_cases_who_can_play(black) is not moves
+
+    move = moves[0][1][0]
+    promoted = white.play_move(board, move)
+    after = board.find_cases_who_can_play(black)
+    white.undo_move(board, move, promoted)
+    assert board.find_cases_who_can_play(white) is moves
+    white.play_move(board, move)
+    assert board.find_cases_who_can_play(black) is after
+    assert board.get_legal_moves_cache().get_stats()["hits"] >= 3
+
+
+def test_cached_moves_match_a_fresh_board():
+    board = Board(10, "20b10.20w")
+    players = [Player(0, "", Team.WHITE), Player(1, "", Team.BLACK)]
+    for ply in range(20):
+        player = players[ply % 2]
+        moves = board.find_cases_who_can_play(player)
+        fresh = Board(10, str(board)).find_cases_who_can_play(player)
+        assert [(case.get_coordinates(), paths) for case, paths in moves] == \
+            [(case.get_coordinates(), paths) for case, paths in fresh]
+        player.play_move(board, moves[ply % len(moves)][1][0])
+
+
+def test_copy_starts_with_an_empty_cache():
+    board = Board(10, "20b10.20w")
+    board.find_cases_who_can_play(Player(0, "", Team.WHITE))
+    assert len(board.copy().get_legal_moves_cache()) == 0
@@ -0,0 +1,62 @@
+from board import Board
+from move_ordering import MoveOrderer, move_key
+from player import Player
+from team import Team
+
+
+def start_moves(board: Board) -> list[dict]:
+    return [move for _, moves in board.find_cases_who_can_play(Player(0, "", Team.WHITE)) for move in moves]
+
+
+def test_order_keeps_the_moves():
+    board = Board(10, "20b10.20w")
+    moves = start_moves(board)
+    ordered = MoveOrderer().order(board, Team.WHITE, moves)
+    assert sorted(map(move_key, ordered)) == sorted(map(move_key, moves))
+
+
+def test_hash_move_then_killers_then_history():
+    board = Board(10, "20b10.20w")
+    moves = start_moves(board)
+    orderer = MoveOrderer()
+    orderer.record_cutoff(Team.WHITE, moves[3], 2, depth=1, ply=0)
+    orderer.record_cutoff(Team.WHITE, moves[5], 1, depth=1, ply=0)
+    orderer.record_refutation(Team.WHITE, moves[7], depth=4, ply=3)
+
+    ordered = orderer.order(board, Team.WHITE, moves, hash_move=move_key(moves[1]), ply=0)
+    # coup de la table, puis le killer le plus récent, l'autre killer, et l'historique
+    assert list(map(move_key, ordered[:4])) == [move_key(moves[i]) for i in (1, 5, 3, 7)]
+    # killers propres à chaque ply
+    assert orderer.get_killers(3)[0] == move_key(moves[7])
+    assert orderer.get_killers(1) == [None, None]
+    assert orderer.get_stats()["cutoffs"] == 2
+
+
+def test_captures_first_longest_first():
+    board = Board(10, "20b10.20w")
+    quiet = start_moves(board)[0]
+    short = {"move_path": [(1, 6), (3, 4)], "eaten_pieces": [(2, 5)]}
+    long = {"move_path": [(3, 6), (5, 4), (3, 2)], "eaten_pieces": [(4, 5), (4, 3)]}
+    ordered = MoveOrderer().order(board, Team.WHITE, [quiet, short, long])
+    assert ordered == [long, short, quiet]
+
+
+def test_captures_are_not_killers():
+    board = Board(10, "20b10.20w")
+    capture = {"move_path": [(1, 6), (3, 4)], "eaten_pieces": [(2, 5)]}
+    orderer = MoveOrderer()
+    orderer.record_cutoff(Team.WHITE, capture, 0, depth=3, ply=0)
+    assert orderer.get_killers(0) == [None, None]
+    assert orderer.get_stats()["first_move_cutoff_rate"] == 1.0
+
+
+def test_new_search_forgets_killers_and_halves_history():
+    board = Board(10, "20b10.20w")
+    moves = start_moves(board)
+    orderer = MoveOrderer()
+    orderer.record_cutoff(Team.WHITE, moves[2], 1, depth=1, ply=0)
+    orderer.new_search()
+    assert orderer.get_killers(0) == [None, None]
+    assert orderer.get_stats()["cutoffs"] == 0
+    # historique 1 -> 0 : oublié, l'ordre redevient celui d'origine
+    assert orderer.order(board, Team.WHITE, moves) == moves
@@ -0,0 +1,39 @@
+import pytest
+
+from bitboard import BLACK, WHITE, Position
+from perft import START_PERFT, divide, perft
+from team import Team
+
+
+def position_perft(position: Position, side: int, depth: int) -> int:
+    """perft sur les bitboards seuls, sans Board ni cache."""
+    if depth == 0:
+        return 1
+    return sum(position_perft(position.play(move), 1 - side, depth - 1) for move in position.legal_moves(side))
+
+
+@pytest.mark.parametrize("depth", range(1, 7))
+def test_start_position(depth):
+    assert perft("20b10.20w", Team.WHITE, depth, hashed=depth == 6) == START_PERFT[depth]
+
+
+def test_hashed_matches_plain():
+    assert perft("20b10.20w", Team.WHITE, 5, hashed=True) == START_PERFT[5]
+
+
+@pytest.mark.parametrize("init, team", [
+    ("11b.4b.b.3b4.w.w.2w.4w.3w.8w", Team.WHITE),
+    ("3.b4.b3.2b.b5.w5.w2.w5.2w3.w2.w3.B.", Team.BLACK),
+    ("5.W9.w10.b5.B9.b7.", Team.WHITE),
+])
+def test_board_matches_bitboards(init, team):
+    side = WHITE if team is Team.WHITE else BLACK
+    assert perft(init, team, 4) == position_perft(Position.from_string(init, 10), side, 4)
+
+
+def test_divide_sums_to_perft():
+    moves = divide("20b10.20w", Team.WHITE, 4)
+    assert len(moves) == START_PERFT[1]
+    assert sum(nodes for _, nodes in moves) == START_PERFT[4]
+    assert all("-" in notation for notation, _ in moves)
+    assert dict(moves) == dict(divide("20b10.20w", Team.WHITE, 4, workers=2))
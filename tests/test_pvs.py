@@ -0,0 +1,56 @@
+import pytest
+
+from strategy import INF, MiniMax
+
+POSITIONS = ["20b10.20w", "11b.4b.b.3b4.w.w.2w.4w.3w.8w", ".b2.2b2.3b2.2b.3b.3b.2w5.w3.w2.3w2.w.w2.w."]
+
+
+def negamax(strategy: MiniMax, state: dict, depth: int, color: int, ply: int = 0) -> float:
+    """Négamax sans élagage, sans table ni fenêtre : la valeur que PVS doit retrouver."""
+    if depth == 0:
+        return color * strategy.evaluate(state, ply)
+    if strategy.is_leaf(state):
+        return ply - INF
+    return max(-negamax(strategy, child, depth - 1, -color, ply + 1) for child, _ in strategy.get_childs(state))
+
+
+@pytest.mark.parametrize("init", POSITIONS)
+def test_scores_match_plain_negamax(make_state, init):
+    strategy = MiniMax(max_depth=3, tt_size_mb=1, batch_leaves=False, quiescence=False)
+    state = make_state(strategy, init)
+    strategy.choose_move(state)
+    reference = MiniMax(tt_size_mb=1, batch_leaves=False, quiescence=False)
+    for iteration in strategy.iterations:
+        assert iteration["score"] == negamax(reference, make_state(reference, init), iteration["depth"], 1)
+
+
+@pytest.mark.parametrize("init", POSITIONS)
+def test_principal_variation_is_legal(make_state, init):
+    strategy = MiniMax(max_depth=4, tt_size_mb=1)
+    state = make_state(strategy, init)
+    best_move = strategy.choose_move(state)
+    line = strategy.principal_variation
+    assert line[0] == best_move
+    assert len(line) == 4
+    board = state["board"].copy()
+    players = [state["self_player"], state["enemy_player"]]
+    for index, (start, end) in enumerate(line):
+        player = players[index % 2]
+        move = next(move for _, moves in board.find_cases_who_can_play(player) for move in moves
+                    if move["move_path"][0] == start and move["move_path"][-1] == end)
+        player.play_move(board, move)
+    assert len(strategy.format_pv(state["board"], state["current_player"].get_team()).split()) == 4
+
+
+def test_narrow_aspiration_window_gives_the_same_scores(make_state, monkeypatch):
+    init = "11b.4b.b.3b4.w.w.2w.4w.3w.8w"
+    strategy = MiniMax(max_depth=4, tt_size_mb=1)
+    strategy.choose_move(make_state(strategy, init))
+    expected = [iteration["score"] for iteration in strategy.iterations]
+
+    # fenêtre d'un point : presque chaque itération en sort et doit être recherchée à nouveau
+    monkeypatch.setattr("strategy.ASPIRATION_WINDOW", 1)
+    strategy = MiniMax(max_depth=4, tt_size_mb=1)
+    strategy.choose_move(make_state(strategy, init))
+    assert strategy.get_stats().aspiration_fails > 0
+    assert [iteration["score"] for iteration in strategy.iterations] == expected
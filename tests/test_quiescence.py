@@ -0,0 +1,53 @@
+from random import Random
+
+import pytest
+
+from bitboard import BLACK, WHITE, Position, get_geometry
+from strategy import INF, MiniMax
+
+
+def captures_only_negamax(strategy: MiniMax, position: Position, side: int, ply: int = 0) -> float:
+    """Négamax sans élagage sur les seules prises, valeur statique des positions calmes."""
+    captures = position.captures(side)
+    if not captures:
+        return float(strategy.evaluate_positions([position], side, side, ply)[0])
+    return max(-captures_only_negamax(strategy, position.play(move), 1 - side, ply + 1) for move in captures)
+
+
+def capture_positions(count: int, seed: int) -> list[tuple[Position, int]]:
+    rng = Random(seed)
+    result = []
+    while len(result) < count:
+        position = Position(10)
+        for square in rng.sample(range(get_geometry(10).squares), rng.randint(6, 20)):
+            position.set_piece(square, rng.choices(range(4), weights=(5, 1, 5, 1))[0])
+        side = rng.choice((WHITE, BLACK))
+        if position.count(WHITE) and position.count(BLACK) and position.captures(side):
+            result.append((position, side))
+    return result
+
+
+def test_quiesce_matches_captures_only_negamax():
+    strategy = MiniMax(tt_size_mb=1)
+    for position, side in capture_positions(100, 4):
+        expected = captures_only_negamax(strategy, position, side)
+        assert strategy.quiesce(position, side, -INF - 1, INF + 1) == expected
+        # fenêtre nulle autour de la valeur : le bon côté de la coupure
+        assert strategy.quiesce(position, side, expected - 1, expected) >= expected
+        assert strategy.quiesce(position, side, expected, expected + 1) <= expected
+
+
+def test_quiet_position_is_its_static_value():
+    strategy = MiniMax(tt_size_mb=1)
+    position = Position.from_string("20b10.20w", 10)
+    assert strategy.quiesce(position, WHITE, -INF, INF) == strategy.evaluate_positions([position], WHITE, WHITE)[0]
+    assert strategy.stats.quiescence_nodes == 0
+
+
+@pytest.mark.parametrize("batch_leaves", [False, True])
+def test_search_extends_captures_at_the_leaves(make_state, batch_leaves):
+    # position de contact : des prises restent à jouer sous l'horizon, elles sont prolongées
+    strategy = MiniMax(max_depth=2, tt_size_mb=1, batch_leaves=batch_leaves)
+    strategy.choose_move(make_state(strategy, "11b.4b.b.3b4.w.w.2w.4w.3w.8w"))
+    assert strategy.get_stats().quiescence_nodes > 0
+    assert strategy.completed_depth == 2
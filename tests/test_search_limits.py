@@ -0,0 +1,52 @@
+from threading import Thread
+from time import perf_counter
+
+from strategy import MiniMax
+from worker import stop_search
+
+
+def test_full_search_reaches_max_depth(make_state):
+    strategy = MiniMax(max_depth=3, tt_size_mb=1)
+    strategy.choose_move(make_state(strategy))
+    assert strategy.completed_depth == 3
+    assert [iteration["depth"] for iteration in strategy.iterations] == [1, 2, 3]
+    nodes = [iteration["nodes"] for iteration in strategy.iterations]
+    assert nodes == sorted(nodes)
+
+
+def test_node_limit_keeps_last_completed_iteration(make_state):
+    strategy = MiniMax(max_depth=20, tt_size_mb=1, node_limit=2000)
+    move = strategy.choose_move(make_state(strategy))
+    assert move is not None
+    assert strategy.nodes <= 2000 + 1
+    assert strategy.completed_depth < 20
+    assert move == strategy.iterations[-1]["move"]
+
+
+def test_time_limit(make_state):
+    strategy = MiniMax(max_depth=50, tt_size_mb=1, time_limit=0.3)
+    start = perf_counter()
+    assert strategy.choose_move(make_state(strategy)) is not None
+    assert perf_counter() - start < 1.5
+    assert strategy.completed_depth >= 1
+
+
+def test_stop_before_search_is_ignored(make_state):
+    strategy = MiniMax(max_depth=2, tt_size_mb=1)
+    strategy.stop()
+    strategy.choose_move(make_state(strategy))
+    assert strategy.completed_depth == 2
+
+
+def test_stop_from_another_thread(make_state):
+    strategy = MiniMax(max_depth=50, tt_size_mb=1)
+    state = make_state(strategy)
+    result = []
+    thread = Thread(target=lambda: result.append(strategy.choose_move(state)))
+    thread.start()
+    thread.join(0.3)
+    start = perf_counter()
+    stop_search(strategy, thread)
+    assert perf_counter() - start < 1.0
+    assert result and result[0] is not None
+    assert strategy.completed_depth < 50
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from search_stats import SearchStats, profiled
+from strategy import MiniMax
+
+
+def test_counters_of_a_search(make_state):
+    strategy = MiniMax(max_depth=3, tt_size_mb=1, profile=None, trace=None)
+    move = strategy.choose_move(make_state(strategy))
+    stats = strategy.get_stats()
+    assert (stats.depth, stats.move, stats.nodes) == (3, move, strategy.nodes)
+    assert stats.evals > 0 and stats.movegen_calls > 0
+    assert 0 <= stats.tt_hits <= stats.tt_probes
+    assert stats.total_time > 0 and stats.get_nps() > 0
+    # sans chronométrage, aucun temps par phase
+    assert (stats.movegen_time, stats.apply_time, stats.eval_time) == (0.0, 0.0, 0.0)
+    assert stats.profile is None and stats.memory is None
+
+
+def test_timing(make_state):
+    strategy = MiniMax(max_depth=3, tt_size_mb=1, profile=None, trace=None, timing=True)
+    strategy.choose_move(make_state(strategy))
+    stats = strategy.get_stats()
+    assert stats.movegen_time > 0 and stats.eval_time > 0
+    assert stats.movegen_time + stats.apply_time + stats.eval_time <= stats.total_time
+
+
+def test_trace_file(make_state, tmp_path):
+    path = tmp_path / "searches.jsonl"
+    strategy = MiniMax(max_depth=2, tt_size_mb=1, profile=None, trace=str(path))
+    assert strategy.timing
+    state = make_state(strategy)
+    strategy.choose_move(state)
+    strategy.choose_move(state)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]["position"] == "20b10.20w"
+    assert records[1]["depth"] == 2 and records[1]["nodes"] == strategy.nodes
+    assert len(records[0]["pv"].split()) == 2
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "tracemalloc"])
+def test_profile_modes(make_state, mode):
+    strategy = MiniMax(max_depth=2, tt_size_mb=1, profile=mode, trace=None)
+    strategy.choose_move(make_state(strategy))
+    stats = strategy.get_stats()
+    if mode == "cprofile":
+        assert stats.profile and {"function", "calls", "tottime", "cumtime"} <= set(stats.profile[0])
+    else:
+        assert stats.memory["peak"] >= stats.memory["current"] >= 0 and stats.memory["top"]
+
+
+def test_unknown_profile_mode():
+    with pytest.raises(ValueError):
+        MiniMax(profile="perf")
+    with pytest.raises(ValueError):
+        with profiled("perf", SearchStats()):
+            pass
+
+
+def test_to_dict():
+    stats = SearchStats()
+    stats.nodes, stats.total_time = 100, 0.5
+    assert stats.to_dict()["nps"] == 200.0
+    assert json.loads(json.dumps(stats.to_dict()))["nodes"] == 100
@@ -0,0 +1,81 @@
+import pytest
+
+from bitboard import BLACK, WHITE, Position
+from tablebase import DRAW, LOSS, WIN, Indexer, Tablebase, decode, encode, generate, groups_of, signatures
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("egtb"))
+    generate(2, directory, workers=1)
+    tablebase = Tablebase(directory)
+    yield tablebase
+    tablebase.close()
+
+
+def test_encode_decode():
+    for result, distance in ((WIN, 1), (WIN, 127), (LOSS, 0), (LOSS, 40), (DRAW, 0)):
+        assert decode(encode(result, distance)) == (result, distance)
+    assert decode(encode(WIN, 500)) == (WIN, 127)
+
+
+def test_indexer_round_trip():
+    indexer = Indexer((1, 1, 1, 0))
+    for index in range(0, indexer.size, 997):
+        position = indexer.position(index)
+        if position is not None:
+            assert indexer.index(groups_of(position, WHITE)) == index
+
+
+def test_black_to_move_is_the_mirrored_white_position(tablebase):
+    position = Position.from_string("12.W20.b16.", 10)
+    mirrored = Position.from_string("16.w20.B12.", 10)
+    assert tablebase.probe(position, BLACK) == tablebase.probe(mirrored, WHITE)
+
+
+def test_results_agree_with_one_ply_search(tablebase):
+    """Chaque valeur se déduit de celles des positions après un coup (analyse rétrograde exacte)."""
+    assert tablebase.get_max_pieces() == 2
+    for signature in signatures(2):
+        indexer = Indexer(signature)
+        for index in range(indexer.size):
+            position = indexer.position(index)
+            if position is None:
+                continue
+            result, distance = tablebase.probe(position, WHITE)
+            children = [tablebase.probe(position.play(move), BLACK) for move in position.legal_moves(WHITE)]
+            if not children:
+                # bloqué : perdu
+                assert (result, distance) == (LOSS, 0)
+            elif result == WIN:
+                assert distance == 1 + min(d for r, d in children if r == LOSS)
+            elif result == LOSS:
+                assert all(r == WIN for r, _ in children)
+                assert distance == 1 + max(d for _, d in children)
+            else:
+                assert all(r != LOSS for r, _ in children) and any(r == DRAW for r, _ in children)
+
+
+def test_outside_the_tables(tablebase):
+    position = Position.from_string("20b10.20w", 10)
+    assert tablebase.probe(position, WHITE) is None
+    no_white = Position.from_string("b49.", 10)
+    assert tablebase.probe(no_white, WHITE) == (LOSS, 0)
+
+
+@pytest.mark.parametrize("batch_leaves", [False, True])
+@pytest.mark.parametrize("quiescence", [False, True])
+def test_search_scores_a_blocked_side_as_lost(make_state, batch_leaves, quiescence):
+    from strategy import INF, WIN_SCORE, MiniMax
+
+    # 43-39 laisse le pion noir de 48 sans coup : gagné comme dans les tables
+    strategy = MiniMax(max_depth=3, tt_size_mb=1, batch_leaves=batch_leaves, quiescence=quiescence)
+    state = make_state(strategy, "37.w4.w3.wb2.")
+    start, end = strategy.choose_move(state)
+    square_of = state["board"].get_position().get_geometry().square_of
+    assert (square_of(start), square_of(end)) == (42, 38)
+    assert strategy.iterations[-1]["score"] >= WIN_SCORE
+
+    position = state["board"].get_position().play(((42, 38), ()))
+    assert strategy.evaluate_positions([position], BLACK, WHITE).tolist() == [INF]
+    assert strategy.evaluate_positions([position], BLACK, BLACK, ply=3).tolist() == [3 - INF]
@@ -0,0 +1,56 @@
+from strategy import MiniMax, RandomStrategy
+from team import Team
+from tournament import SPRT, MatchStats, make_strategy, parse_engine, play_game, random_openings, run_tournament
+
+
+def test_parse_engine():
+    assert parse_engine("max_depth=4,time_limit=0.5,tablebase=egtb") == \
+        {"max_depth": 4, "time_limit": 0.5, "tablebase": "egtb"}
+    assert parse_engine("") == {}
+    assert isinstance(make_strategy({"strategy": "random"}), RandomStrategy)
+    strategy = make_strategy({"max_depth": 2, "tt_size_mb": 1})
+    assert isinstance(strategy, MiniMax) and strategy.max_depth == 2
+
+
+def test_side_without_moves_loses():
+    # pion blanc bloqué par deux pions noirs alignés : plus de coup, les blancs perdent
+    init = "36.b3.b4.w4."
+    score, reason, plies = play_game({"strategy": "random"}, {"strategy": "random"}, init)
+    assert (score, reason, plies) == (0.0, "no moves", 0)
+
+
+def test_game_is_recorded():
+    record, positions = [], []
+    score, reason, plies = play_game({"max_depth": 1, "tt_size_mb": 1}, {"strategy": "random"}, max_plies=12,
+                                     record=record, positions=positions)
+    assert score in (0.0, 0.5, 1.0)
+    assert len(record) == len(positions) == plies
+    assert [side for _, side, _ in record[:4]] == [0, 1, 0, 1]
+
+
+def test_random_openings_are_reproducible():
+    openings = random_openings(3, 4, seed=5)
+    assert openings == random_openings(3, 4, seed=5)
+    assert all(team is Team.WHITE for _, team in openings)
+
+
+def test_sprt_decides_on_lopsided_results():
+    sprt = SPRT(0, 10)
+    stats = MatchStats()
+    for _ in range(400):
+        stats.add(1.0)
+        stats.add(0.5)
+    assert stats.get_score() == 0.75
+    assert sprt.get_status(stats) == "H1"
+    stats = MatchStats()
+    for _ in range(400):
+        stats.add(0.0)
+        stats.add(0.5)
+    assert sprt.get_status(stats) == "H0"
+
+
+def test_run_tournament():
+    openings = random_openings(1, 2)
+    stats = run_tournament({"strategy": "random"}, {"strategy": "random"}, openings, games=2, workers=1,
+                           max_plies=20)
+    assert stats.get_games() == 2
@@ -0,0 +1,54 @@
+from transposition import ENTRY_SIZE, EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+
+def same_bucket_keys(table: TranspositionTable, count: int) -> list[int]:
+    # clés de même seau : mêmes bits bas, bits hauts différents
+    return [1 + (index << 40) for index in range(count)]
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    assert table.probe(12345) is None
+    table.store(12345, 3, LOWER_BOUND, -17.0, 42)
+    assert table.probe(12345) == (3, LOWER_BOUND, -17.0, 42)
+    table.store(99, 0, EXACT, 5.0)
+    assert table.probe(99) == (0, EXACT, 5.0, None)
+    assert table.get_stats()["hits"] == 2
+
+
+def test_size_is_bounded():
+    table = TranspositionTable(1)
+    assert table.get_memory() <= 1024 * 1024
+    assert table.get_size() * ENTRY_SIZE == table.get_memory()
+    for key in range(10 * table.get_size()):
+        table.store(key * 2654435761, 1, EXACT, 0.0)
+    assert table.get_memory() <= 1024 * 1024
+
+
+def test_depth_preferred_slot_survives_shallow_stores():
+    table = TranspositionTable(1)
+    deep, *shallow = same_bucket_keys(table, 4)
+    table.store(deep, 8, EXACT, 1.0, 7)
+    for key in shallow:
+        table.store(key, 1, UPPER_BOUND, 2.0)
+    # la case "profondeur préférée" garde l'entrée profonde, la case "toujours remplacée" la dernière
+    assert table.probe(deep) == (8, EXACT, 1.0, 7)
+    assert table.probe(shallow[-1]) is not None
+    assert table.probe(shallow[0]) is None
+
+
+def test_old_entries_are_replaced_after_new_search():
+    table = TranspositionTable(1)
+    deep, shallow = same_bucket_keys(table, 2)
+    table.store(deep, 8, EXACT, 1.0)
+    table.new_search()
+    table.store(shallow, 1, EXACT, 2.0)
+    assert table.probe(shallow) == (1, EXACT, 2.0, None)
+    assert table.probe(deep) is None
+
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(5, 2, EXACT, 1.0)
+    table.clear()
+    assert table.probe(5) is None
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from evaluation import DEFAULT_WEIGHTS, FEATURES, load_weights, save_weights
+from tune import Tuner, load_dataset, selfplay
+
+
+def synthetic_dataset(count: int = 2000, seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Résultats tirés d'une sigmoïde de poids connus."""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(-5, 6, size=(count, len(FEATURES))).astype(float)
+    true_weights = np.array([100, 50, 5, 10, 8, 2], dtype=float)
+    probability = 1 / (1 + np.exp(-0.01 * rows @ true_weights))
+    results = (rng.random(count) < probability).astype(float)
+    return rows, results, true_weights
+
+
+def test_weights_file(tmp_path):
+    path = str(tmp_path / "weights.json")
+    assert load_weights(path).tolist() == DEFAULT_WEIGHTS.tolist()
+    save_weights(path, np.array([110, 190.5, 3, 4, 2.25, 1]))
+    assert load_weights(path).tolist() == [110, 190.5, 3, 4, 2.25, 1]
+    (tmp_path / "partial.json").write_text('{"kings": 150}')
+    assert load_weights(str(tmp_path / "partial.json"))[FEATURES.index("kings")] == 150
+    (tmp_path / "bad.json").write_text('{"tempo": 1}')
+    with pytest.raises(ValueError):
+        load_weights(str(tmp_path / "bad.json"))
+
+
+def test_gradient_matches_finite_differences():
+    rows, results, _ = synthetic_dataset(300)
+    tuner = Tuner(rows, results)
+    weights, k = DEFAULT_WEIGHTS.astype(float), 0.01
+    _, gradient = tuner.error(weights, k)
+    for index in range(len(FEATURES)):
+        step = np.zeros_like(weights)
+        step[index] = 1e-3
+        numeric = (tuner.error(weights + step, k)[0] - tuner.error(weights - step, k)[0]) / 2e-3
+        assert gradient[index] == pytest.approx(numeric, rel=1e-4, abs=1e-9)
+
+
+def test_workers_give_the_same_error():
+    rows, results, _ = synthetic_dataset(500)
+    weights = DEFAULT_WEIGHTS.astype(float)
+    single = Tuner(rows, results).error(weights, 0.01)
+    tuner = Tuner(rows, results, workers=2)
+    try:
+        parallel = tuner.error(weights, 0.01)
+    finally:
+        tuner.close()
+    assert parallel[0] == pytest.approx(single[0])
+    assert parallel[1] == pytest.approx(single[1])
+
+
+def test_fit_lowers_the_error(capsys):
+    rows, results, true_weights = synthetic_dataset()
+    tuner = Tuner(rows, results)
+    start = DEFAULT_WEIGHTS.astype(float)
+    k = tuner.fit_k(start)
+    assert 1e-4 < k < 0.1
+    weights = tuner.fit(start, k, iterations=200)
+    assert tuner.error(weights, k)[0] < tuner.error(start, k)[0]
+    # l'ordre des poids appris suit celui des vrais poids sur les plus forts
+    assert np.argmax(weights) == np.argmax(true_weights)
+
+
+def test_selfplay_dataset(tmp_path, capsys):
+    positions, results = selfplay({"strategy": "random"}, games=2, random_plies=2)
+    assert len(positions) == len(results) > 0
+    assert set(results.tolist()) <= {0.0, 0.5, 1.0}
+    path = str(tmp_path / "positions.npz")
+    np.savez_compressed(path, positions=positions, results=results)
+    rows, loaded = load_dataset(path)
+    assert rows.shape == (len(results), len(FEATURES))
+    assert loaded.tolist() == results.tolist()
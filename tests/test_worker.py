@@ -0,0 +1,52 @@
+from threading import Event
+
+from board import Board
+from player import AI, Player
+from strategy import MiniMax
+from team import Team
+from worker import SearchWorker
+
+
+def test_search_runs_on_a_copy():
+    done = Event()
+    board = Board(10, "20b10.20w")
+    before = board.encode(Team.WHITE)
+    ai = AI(0, "ai", Team.WHITE, MiniMax(max_depth=3, tt_size_mb=1))
+    worker = SearchWorker(on_done=done.set)
+    worker.start(ai, Player(1, "enemy", Team.BLACK), board)
+    assert worker.is_thinking() and not worker.is_pondering()
+    assert done.wait(30)
+    move = worker.poll()
+    assert move is not None
+    assert not worker.is_thinking()
+    assert board.encode(Team.WHITE) == before
+
+
+def test_cancel_stops_a_long_search():
+    ai = AI(0, "ai", Team.WHITE, MiniMax(max_depth=50, tt_size_mb=1))
+    worker = SearchWorker()
+    worker.start(ai, Player(1, "enemy", Team.BLACK), Board(10, "20b10.20w"))
+    worker.cancel()
+    assert not worker.is_thinking()
+    assert worker.poll() is None
+
+
+def test_ponder_hit():
+    done = Event()
+    board = Board(10, "20b10.20w")
+    enemy = Player(1, "enemy", Team.BLACK)
+    ai = AI(0, "ai", Team.WHITE, MiniMax(max_depth=50, tt_size_mb=1, time_limit=0.2))
+    ponder_move = next(move for _, moves in board.find_cases_who_can_play(enemy) for move in moves)
+    worker = SearchWorker(on_done=done.set)
+    # le plateau est celui où l'adversaire, au trait, va jouer ponder_move
+    worker.start(ai, enemy, board, ponder_move=ponder_move)
+    assert worker.is_pondering()
+    # ni limite de temps ni résultat tant que l'adversaire n'a pas joué
+    assert not done.wait(0.4)
+    assert worker.poll() is None
+
+    enemy.play_move(board, ponder_move)
+    assert worker.is_ponder_hit(board)
+    worker.ponderhit()
+    assert done.wait(5)
+    assert worker.poll() is not None
@@ -0,0 +1,296 @@
+"""Match sans interface entre deux réglages du moteur, en parallèle sur plusieurs processus.
+
+    python tournament.py --engine-a max_depth=4 --engine-b max_depth=5 --games 200 --workers 32
+    python tournament.py --engine-a time_limit=0.1 --engine-b time_limit=0.1,tt_size_mb=64 --sprt 0 10
+
+Un réglage est une liste `clé=valeur` séparée par des virgules, passée à MiniMax (`clock` et
+`increment` donnent une pendule GameClock, `tablebase` le dossier des tables de finales,
+`weights` un fichier de poids de l'évaluation, `strategy=random` un RandomStrategy, `strategy=mcts`
+un MCTS réglé par `time_limit`, `playouts`, `workers`...). Chaque ouverture est jouée deux fois,
+couleurs inversées.
+N'importe pas pygame.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from bitboard import SIDES, START_POSITION
+from board import Board
+from clock import GameClock
+from config import GRID_SIZE
+from evaluation import load_weights
+from mcts import MCTS
+from piece import Queen
+from player import AI, Player
+from strategy import MiniMax, RandomStrategy, Strategy
+from tablebase import Tablebase
+from team import Team, other_team
+
+MAX_PLIES = 300
+# 25 coups de chaque camp sans prise ni mouvement de pion : nulle
+NO_PROGRESS_PLIES = 50
+
+
+def parse_engine(spec: str) -> dict:
+    config = {}
+    for item in filter(None, spec.split(",")):
+        name, value = item.split("=", 1)
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                pass
+        config[name.strip()] = value
+    return config
+
+
+def make_strategy(config: dict) -> Strategy:
+    config = dict(config)
+    name = config.pop("strategy", "minimax")
+    if name == "random":
+        return RandomStrategy()
+    if "tablebase" in config:
+        config["tablebase"] = Tablebase(config["tablebase"])
+    if "weights" in config:
+        config["weights"] = load_weights(config["weights"])
+    clock = config.pop("clock", None)
+    increment = config.pop("increment", 0)
+    if clock is not None:
+        config["clock"] = GameClock(clock, increment)
+    if name == "mcts":
+        return MCTS(**config)
+    return MiniMax(**config)
+
+
+def play_game(white: dict, black: dict, init_board: str = START_POSITION, first: Team = Team.WHITE,
+              max_plies: int = MAX_PLIES, no_progress_plies: int = NO_PROGRESS_PLIES,
+              record: list | None = None, positions: list | None = None) -> tuple[float, str, int]:
+    """Joue une partie et renvoie (score des blancs, raison de la fin, nombre de demi-coups).
+
+    `record` reçoit, pour chaque demi-coup, (hash de la position, camp au trait, coup joué) où le
+    coup est codé `départ << 6 | arrivée` en numéros de case ; `positions` reçoit la forme
+    binaire (Board.encode) de chaque position jouée.
+    """
+    board = Board(GRID_SIZE, init_board)
+    players = {
+        Team.WHITE: AI(0, "White", Team.WHITE, make_strategy(white)),
+        Team.BLACK: AI(1, "Black", Team.BLACK, make_strategy(black)),
+    }
+    current, other = players[first], players[other_team(first)]
+    quiet_plies = 0
+    seen = {}
+
+    try:
+        # MiniMax affiche son évaluation à chaque coup
+        with contextlib.redirect_stdout(io.StringIO()):
+            for ply in range(max_plies):
+                cases_who_can_play = board.find_cases_who_can_play(current)
+                if not cases_who_can_play:
+                    return (0.0 if current.get_team() is Team.WHITE else 1.0), "no moves", ply
+
+                key = board.get_position().hash_key(SIDES[current.get_team()])
+                seen[key] = seen.get(key, 0) + 1
+                if seen[key] >= 3:
+                    return 0.5, "repetition", ply
+
+                state = {"board": board, "self_player": current, "enemy_player": other, "current_player": current}
+                current.strategy.update(state)
+                start, end = current.strategy.choose_move(state)
+                move = next(move for _, moves in cases_who_can_play for move in moves
+                            if move["move_path"][0] == start and move["move_path"][-1] == end)
+
+                if positions is not None:
+                    positions.append(board.encode(current.get_team()))
+                if record is not None:
+                    square_of = board.get_position().get_geometry().square_of
+                    record.append((key, SIDES[current.get_team()], square_of(start) << 6 | square_of(end)))
+                progress = move["eaten_pieces"] or not isinstance(board.get_case(start).get_piece(), Queen)
+                current.play_move(board, move)
+                quiet_plies = 0 if progress else quiet_plies + 1
+                if quiet_plies >= no_progress_plies:
+                    return 0.5, "no progress", ply + 1
+                current, other = other, current
+        return 0.5, "max plies", max_plies
+    finally:
+        # MCTS garde des processus de playouts entre deux coups
+        for player in players.values():
+            player.strategy.close()
+
+
+def _run_game(task) -> tuple[int, float, str, int]:
+    index, engine_a, engine_b, (init_board, first), a_is_white, max_plies, no_progress_plies = task
+    white, black = (engine_a, engine_b) if a_is_white else (engine_b, engine_a)
+    score, reason, plies = play_game(white, black, init_board, first, max_plies, no_progress_plies)
+    return index, score if a_is_white else 1.0 - score, reason, plies
+
+
+def random_openings(count: int, plies: int, seed: int = 0) -> list[tuple[str, Team]]:
+    """Positions obtenues par `plies` demi-coups au hasard depuis la position de départ."""
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        board = Board(GRID_SIZE, START_POSITION)
+        team = Team.WHITE
+        for _ in range(plies):
+            player = Player(0, "", team)
+            moves = [move for _, case_moves in board.find_cases_who_can_play(player) for move in case_moves]
+            if not moves:
+                break
+            player.play_move(board, rng.choice(moves))
+            team = other_team(team)
+        else:
+            openings.append((str(board), team))
+    return openings
+
+
+def load_openings(path: str) -> list[tuple[str, Team]]:
+    """Une position par ligne : chaîne d'init du Board, suivie de `w` ou `b` pour le trait (blancs par défaut)."""
+    openings = []
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            first = Team.BLACK if len(fields) > 1 and fields[1].lower() == "b" else Team.WHITE
+            openings.append((fields[0], first))
+    return openings
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_of_score(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class MatchStats:
+    def __init__(self):
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def add(self, score: float) -> None:
+        if score == 1.0:
+            self.wins += 1
+        elif score == 0.0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def get_games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def get_score(self) -> float:
+        return (self.wins + self.draws / 2) / self.get_games()
+
+    def get_variance(self) -> float:
+        """Variance du score d'une partie."""
+        games = self.get_games()
+        return (self.wins + self.draws / 4) / games - self.get_score() ** 2
+
+    def get_elo(self) -> tuple[float, float]:
+        """Différence Elo et demi-largeur de l'intervalle de confiance à 95 %."""
+        score = self.get_score()
+        error = 1.96 * math.sqrt(self.get_variance() / self.get_games())
+        return elo_of_score(score), (elo_of_score(score + error) - elo_of_score(score - error)) / 2
+
+
+class SPRT:
+    """Test séquentiel H0 : elo = elo0 contre H1 : elo = elo1 (approximation normale du score)."""
+
+    def __init__(self, elo0: float, elo1: float, alpha: float = 0.05, beta: float = 0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def get_llr(self, stats: MatchStats) -> float:
+        games = stats.get_games()
+        if not games or stats.get_variance() <= 0:
+            return 0.0
+        s0, s1 = expected_score(self.elo0), expected_score(self.elo1)
+        return games * (s1 - s0) * (2 * stats.get_score() - s0 - s1) / (2 * stats.get_variance())
+
+    def get_status(self, stats: MatchStats) -> str | None:
+        llr = self.get_llr(stats)
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+
+def report(stats: MatchStats, sprt: SPRT | None) -> str:
+    line = f"Games {stats.get_games()}: +{stats.wins} ={stats.draws} -{stats.losses}"
+    if stats.get_variance() > 0:
+        elo, error = stats.get_elo()
+        line += f"  Elo {elo:+.1f} +/- {error:.1f}"
+    if sprt is not None:
+        line += f"  LLR {sprt.get_llr(stats):.2f} ({sprt.lower:.2f}, {sprt.upper:.2f})"
+    return line
+
+
+def run_tournament(engine_a: dict, engine_b: dict, openings: list[tuple[str, Team]], games: int,
+                   workers: int, sprt: SPRT | None = None, max_plies: int = MAX_PLIES,
+                   no_progress_plies: int = NO_PROGRESS_PLIES) -> MatchStats:
+    tasks = ((index, engine_a, engine_b, openings[(index // 2) % len(openings)], index % 2 == 0,
+              max_plies, no_progress_plies) for index in range(games))
+    stats = MatchStats()
+    with ProcessPoolExecutor(workers) as pool:
+        # quelques parties d'avance par processus, pas tout le match en file d'attente
+        pending = {pool.submit(_run_game, task) for _, task in zip(range(workers * 2), tasks)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, score, reason, plies = future.result()
+                stats.add(score)
+                print(f"game {index} ({reason}, {plies} plies): {score}  {report(stats, sprt)}", flush=True)
+            status = sprt.get_status(stats) if sprt is not None else None
+            if status is not None:
+                print(f"SPRT: {status} accepted")
+                for future in pending:
+                    future.cancel()
+                break
+            for _, task in zip(done, tasks):
+                pending.add(pool.submit(_run_game, task))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless engine match with colours swapped.")
+    parser.add_argument("--engine-a", default="max_depth=3", type=parse_engine)
+    parser.add_argument("--engine-b", default="max_depth=3", type=parse_engine)
+    parser.add_argument("--openings", help="file of Board init strings, one per line, optional w/b side to move")
+    parser.add_argument("--random-openings", type=int, default=16)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--no-progress", type=int, default=NO_PROGRESS_PLIES)
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"))
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.openings:
+        openings = load_openings(args.openings)
+    else:
+        openings = random_openings(args.random_openings, args.opening_plies, args.seed)
+    sprt = SPRT(*args.sprt, args.alpha, args.beta) if args.sprt else None
+    stats = run_tournament(args.engine_a, args.engine_b, openings, args.games, args.workers, sprt,
+                           args.max_plies, args.no_progress)
+    print(report(stats, sprt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from array import array
+
+from config import TT_SIZE_MB
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Une entrée = clé (8 octets) + données compactées (8 octets) + score (8 octets)
+ENTRY_SIZE = 24
+# Chaque seau a une case "profondeur préférée" et une case "toujours remplacée"
+BUCKET_SIZE = 2 * ENTRY_SIZE
+
+
+class TranspositionTable:
+    """Table de transposition de taille fixe (`size_mb`), indexée par le hash Zobrist.
+
+    Données compactées : âge de la recherche, profondeur + 1 (0 : case vide), type de borne, coup + 1.
+    """
+
+    def __init__(self, size_mb: float = TT_SIZE_MB):
+        buckets = 1
+        while buckets * 2 * BUCKET_SIZE <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self._mask = buckets - 1
+        self._keys = array('Q', bytes(8 * 2 * buckets))
+        self._data = array('q', bytes(8 * 2 * buckets))
+        self._scores = array('d', bytes(8 * 2 * buckets))
+        self._age = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def get_size(self) -> int:
+        """Nombre d'entrées de la table."""
+        return len(self._keys)
+
+    def get_memory(self) -> int:
+        """Octets occupés par les entrées."""
+        return self.get_size() * ENTRY_SIZE
+
+    def new_search(self) -> None:
+        """Les entrées des recherches précédentes deviennent remplaçables quelle que soit leur profondeur."""
+        self._age = (self._age + 1) & 0xFF
+
+    def clear(self) -> None:
+        for table in (self._keys, self._data, self._scores):
+            table[:] = array(table.typecode, bytes(8 * len(table)))
+        self.hits = self.misses = self.collisions = self.stores = self.overwrites = 0
+
+    def probe(self, key: int) -> tuple[int, int, float, int | None] | None:
+        """(profondeur, borne, score, coup) gardés pour `key`, ou None."""
+        index = (key & self._mask) * 2
+        occupied = False
+        for slot in (index, index + 1):
+            data = self._data[slot]
+            if not data:
+                continue
+            if self._keys[slot] == key:
+                self.hits += 1
+                move = data >> 18
+                return ((data >> 8) & 0xFF) - 1, (data >> 16) & 0b11, self._scores[slot], move - 1 if move else None
+            occupied = True
+        if occupied:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: float, move: int | None = None) -> None:
+        index = (key & self._mask) * 2
+        data = self._data[index]
+        if not data or self._keys[index] == key or (data & 0xFF) != self._age or depth >= ((data >> 8) & 0xFF) - 1:
+            slot = index
+        else:
+            slot = index + 1
+        if self._data[slot] and self._keys[slot] != key:
+            self.overwrites += 1
+        self._keys[slot] = key
+        self._data[slot] = self._age | (depth + 1) << 8 | bound << 16 | (0 if move is None else move + 1) << 18
+        self._scores[slot] = score
+        self.stores += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "size": self.get_size(),
+        }
@@ -0,0 +1,189 @@
+"""Réglage des poids de l'évaluation à la Texel, sur des positions de parties jouées sans interface.
+
+    python tune.py selfplay --engine max_depth=3 --games 400 --workers 8 --output positions.npz
+    python tune.py fit positions.npz --output weights.json --workers 8
+
+`selfplay` garde les positions calmes (sans prise pour le camp au trait) de chaque partie avec son
+résultat. `fit` cherche les poids qui prédisent le mieux ces résultats : l'évaluation passe dans
+une sigmoïde dont l'échelle K est d'abord ajustée sur les poids de départ, puis l'erreur
+quadratique moyenne est minimisée par Adam. Les gradients sont calculés par tranches de positions
+sur un pool de processus. N'importe pas pygame.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from bitboard import Position
+from config import GRID_SIZE, WEIGHTS_PATH
+from evaluation import FEATURES, features, load_weights, planes_of_bytes, save_weights
+from tournament import parse_engine, play_game, random_openings
+
+# premiers demi-coups ignorés : trop loin du résultat pour l'expliquer
+SKIP_PLIES = 4
+# positions converties en caractéristiques à la fois
+CHUNK = 65536
+
+
+def _selfplay_game(task) -> tuple[list[bytes], float]:
+    engine, random_plies, seed = task
+    init_board, first = random_openings(1, random_plies, seed)[0]
+    positions = []
+    score, _, _ = play_game(engine, engine, init_board, first, positions=positions)
+    quiet = []
+    for data in positions[SKIP_PLIES:]:
+        position, side = Position.decode(data, GRID_SIZE)
+        if not any(captured for _, captured in position.legal_moves(side)):
+            quiet.append(data)
+    return quiet, score
+
+
+def selfplay(engine: dict, games: int, random_plies: int = 4, workers: int = 1,
+             seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """(formes binaires (n, octets), score des blancs (n,)) des positions calmes de `games` parties."""
+    rng = random.Random(seed)
+    tasks = [(engine, rng.randint(0, random_plies), rng.getrandbits(32)) for _ in range(games)]
+    positions, results = [], []
+    with ProcessPoolExecutor(workers) as pool:
+        for index, (quiet, score) in enumerate(pool.map(_selfplay_game, tasks)):
+            positions += quiet
+            results += [score] * len(quiet)
+            print(f"game {index + 1}/{games}: {score} ({len(quiet)} positions), {len(positions)} total", flush=True)
+    data = np.frombuffer(b"".join(positions), dtype=np.uint8).reshape(len(positions), -1)
+    return data, np.array(results, dtype=np.float32)
+
+
+def load_dataset(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """(caractéristiques (n, len(FEATURES)), score des blancs (n,)) d'un fichier de selfplay."""
+    with np.load(path) as data:
+        positions, results = data["positions"], data["results"]
+    squares = GRID_SIZE * GRID_SIZE // 2
+    rows = [features(planes_of_bytes(positions[start:start + CHUNK], squares))
+            for start in range(0, len(positions), CHUNK)]
+    return np.concatenate(rows).astype(float), results.astype(float)
+
+
+def sigmoid(scores: np.ndarray, k: float) -> np.ndarray:
+    return 1 / (1 + np.exp(-k * scores))
+
+
+# tranche de positions de chaque processus, envoyée une seule fois par l'initialiseur
+_features = _results = None
+
+
+def _init_worker(feature_rows: np.ndarray, results: np.ndarray) -> None:
+    global _features, _results
+    _features, _results = feature_rows, results
+
+
+def _gradient(task) -> tuple[float, np.ndarray]:
+    """Somme des erreurs quadratiques et de leur gradient sur une tranche."""
+    start, stop, weights, k = task
+    rows, results = _features[start:stop], _results[start:stop]
+    predicted = sigmoid(rows @ weights, k)
+    error = predicted - results
+    return float(error @ error), rows.T @ (2 * error * predicted * (1 - predicted) * k)
+
+
+class Tuner:
+    """Erreur et gradient sur tout le jeu de positions, par tranches réparties sur `workers` processus."""
+
+    def __init__(self, feature_rows: np.ndarray, results: np.ndarray, workers: int = 1):
+        self._size = len(results)
+        self._pool = None
+        if workers > 1:
+            self._pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(feature_rows, results))
+        else:
+            _init_worker(feature_rows, results)
+        step = -(-self._size // max(workers, 1))
+        self._chunks = [(start, min(start + step, self._size)) for start in range(0, self._size, step)]
+
+    def error(self, weights: np.ndarray, k: float) -> tuple[float, np.ndarray]:
+        """(erreur quadratique moyenne, gradient par rapport aux poids)."""
+        tasks = [(start, stop, weights, k) for start, stop in self._chunks]
+        parts = self._pool.map(_gradient, tasks) if self._pool is not None else map(_gradient, tasks)
+        total, gradient = 0.0, np.zeros_like(weights)
+        for part_error, part_gradient in parts:
+            total += part_error
+            gradient += part_gradient
+        return total / self._size, gradient / self._size
+
+    def fit_k(self, weights: np.ndarray, low: float = 1e-4, high: float = 0.1, steps: int = 40) -> float:
+        """Échelle de la sigmoïde qui minimise l'erreur des poids de départ (section dorée)."""
+        ratio = (5 ** 0.5 - 1) / 2
+        for _ in range(steps):
+            left, right = high - ratio * (high - low), low + ratio * (high - low)
+            if self.error(weights, left)[0] < self.error(weights, right)[0]:
+                high = right
+            else:
+                low = left
+        return (low + high) / 2
+
+    def fit(self, weights: np.ndarray, k: float, iterations: int = 300, rate: float = 1.0,
+            report: int = 50) -> np.ndarray:
+        """Adam sur l'erreur quadratique moyenne ; `rate` est le pas en unités de poids."""
+        weights = weights.astype(float)
+        moment, velocity = np.zeros_like(weights), np.zeros_like(weights)
+        beta1, beta2 = 0.9, 0.999
+        for iteration in range(1, iterations + 1):
+            error, gradient = self.error(weights, k)
+            moment = beta1 * moment + (1 - beta1) * gradient
+            velocity = beta2 * velocity + (1 - beta2) * gradient ** 2
+            weights -= rate * (moment / (1 - beta1 ** iteration)) / (np.sqrt(velocity / (1 - beta2 ** iteration)) + 1e-12)
+            if iteration % report == 0 or iteration == iterations:
+                print(f"iteration {iteration}: error {error:.6f}", flush=True)
+        return weights
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the evaluation weights.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("selfplay", help="collect quiet positions and results from engine games")
+    generate.add_argument("--engine", default="max_depth=3", type=parse_engine)
+    generate.add_argument("--games", type=int, default=200)
+    generate.add_argument("--random-plies", type=int, default=4, help="at most this many random plies per game")
+    generate.add_argument("--workers", type=int, default=os.cpu_count())
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--output", default="positions.npz")
+    fit = commands.add_parser("fit", help="fit the weights to the collected results")
+    fit.add_argument("dataset")
+    fit.add_argument("--weights", default=WEIGHTS_PATH, help="starting weights (defaults if missing)")
+    fit.add_argument("--output", default=WEIGHTS_PATH)
+    fit.add_argument("--iterations", type=int, default=300)
+    fit.add_argument("--rate", type=float, default=1.0)
+    fit.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.command == "selfplay":
+        positions, results = selfplay(args.engine, args.games, args.random_plies, args.workers, args.seed)
+        np.savez_compressed(args.output, positions=positions, results=results)
+        print(f"{len(results)} positions written to {args.output}")
+        return
+
+    start = perf_counter()
+    feature_rows, results = load_dataset(args.dataset)
+    weights = load_weights(args.weights)
+    tuner = Tuner(feature_rows, results, args.workers)
+    try:
+        k = tuner.fit_k(weights)
+        print(f"{len(results)} positions, K = {k:.6f}, error {tuner.error(weights, k)[0]:.6f}")
+        weights = tuner.fit(weights, k, args.iterations, args.rate)
+    finally:
+        tuner.close()
+    for name, weight in zip(FEATURES, weights):
+        print(f"{name:12} {weight:8.2f}")
+    save_weights(args.output, weights)
+    print(f"weights written to {args.output} in {perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from threading import Thread
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from board import Board
+    from player import AI, Player
+    from strategy import Strategy
+
+# secondes entre deux demandes d'arrêt à une recherche qui ne s'est pas encore arrêtée
+STOP_POLL = 0.05
+
+
+def stop_search(strategy: Strategy, thread: Thread) -> None:
+    """Arrête la recherche de `thread` et attend sa fin.
+
+    La recherche remet le drapeau d'arrêt à zéro en démarrant : un stop() arrivé entre le lancement
+    du thread et ce moment serait perdu, il est donc répété tant que le thread tourne.
+    """
+    while thread.is_alive():
+        strategy.stop()
+        thread.join(STOP_POLL)
+
+
+class SearchWorker:
+    """Fait réfléchir une IA dans un thread pour que la boucle pygame continue de tourner.
+
+    La recherche travaille sur sa propre copie du plateau et des joueurs. En mode ponder, la copie
+    contient déjà le coup prévu de l'adversaire ; si c'est bien ce coup qui est joué, la recherche
+    continue avec `ponderhit()` au lieu de repartir de zéro.
+    """
+
+    def __init__(self, on_done: Callable[[], None] | None = None):
+        # appelé depuis le thread de recherche quand elle se termine, pour réveiller la boucle d'affichage
+        self._on_done = on_done
+        self._thread: Thread | None = None
+        self._ai: AI | None = None
+        self._result = None
+        self._done = False
+        self._pondering = False
+        self._ponder_hash: int | None = None
+
+    def start(self, ai: AI, enemy: Player, board: Board, ponder_move: dict | None = None) -> None:
+        self.cancel()
+        board = board.copy()
+        self_player = deepcopy(ai)
+        enemy_player = deepcopy(enemy)
+        self._pondering = ponder_move is not None
+        if self._pondering:
+            enemy_player.play_move(board, ponder_move)
+            self._ponder_hash = board.get_position().get_hash()
+        state = {
+            "board": board,
+            "self_player": self_player,
+            "enemy_player": enemy_player,
+            "current_player": self_player,
+        }
+        self._ai = ai
+        self._result = None
+        self._done = False
+        self._thread = Thread(target=self._run, args=(state, self._pondering), daemon=True)
+        self._thread.start()
+
+    def _run(self, state, ponder: bool) -> None:
+        if ponder:
+            self._result = self._ai.strategy.choose_move(state, ponder=True)
+        else:
+            self._result = self._ai.strategy.choose_move(state)
+        self._done = True
+        if self._on_done is not None:
+            self._on_done()
+
+    def is_thinking(self) -> bool:
+        """Vrai pendant la recherche du coup de l'IA (hors ponder), jusqu'à ce que poll le rende."""
+        return self._thread is not None and not self._pondering
+
+    def is_pondering(self) -> bool:
+        return self._thread is not None and self._pondering
+
+    def is_ponder_hit(self, board: Board) -> bool:
+        """Vrai si `board` est la position sur laquelle on réfléchit."""
+        return self.is_pondering() and board.get_position().get_hash() == self._ponder_hash
+
+    def ponderhit(self) -> None:
+        self._pondering = False
+        self._ai.strategy.ponderhit()
+
+    def poll(self):
+        """Coup trouvé (départ, arrivée) une fois la recherche finie, sinon None."""
+        if self._thread is None or not self._done or self._pondering:
+            return None
+        self._thread.join()
+        self._thread = None
+        return self._result
+
+    def cancel(self) -> None:
+        if self._thread is None:
+            return
+        stop_search(self._ai.strategy, self._thread)
+        self._thread = None
+        self._pondering = False